@@ -0,0 +1,191 @@
+"""
+Article extraction benchmark: the lxml engine against newspaper3k.
+
+Runs both engines over the saved pages in `pages/` and compares them with the
+hand-labeled text and metadata in `corpus.json`:
+
+- import time (in a fresh interpreter) and parse time per page,
+- text fidelity: word-level precision, recall and F1 of the extracted text
+  against the labeled article text,
+- metadata: share of pages with the right published date and authors, and
+  share with a non-empty summary.
+
+    python -m benchmarks.extraction.run
+    python -m benchmarks.extraction.run --repeat 50 --json results.json
+
+The lxml engine is loaded straight from `extractor_agent/extraction.py`, so
+the agent package (and ADK) isn't imported and timed along with it.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(BENCHMARK_DIR))
+CORPUS_PATH = os.path.join(BENCHMARK_DIR, "corpus.json")
+PAGES_DIR = os.path.join(BENCHMARK_DIR, "pages")
+ENGINE_PATH = os.path.join(REPO_DIR, "extractor_agent", "extraction.py")
+WORD = re.compile(r"[a-z0-9]+")
+
+LOAD_ENGINE = (
+    "import importlib.util\n"
+    f"spec = importlib.util.spec_from_file_location('extraction', {ENGINE_PATH!r})\n"
+    "engine = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(engine)\n"
+)
+IMPORTS = {"lxml": LOAD_ENGINE, "newspaper3k": "import newspaper\n"}
+
+
+def load_engine():
+    spec = importlib.util.spec_from_file_location("extraction", ENGINE_PATH)
+    engine = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(engine)
+    return engine
+
+
+def extract_lxml(engine, html: str, url: str) -> dict:
+    article = engine.extract_article(html, url)
+    return {
+        "text": article["text"],
+        "published_date": article["published_date"],
+        "authors": article["authors"],
+        "summary": article["summary"],
+    }
+
+
+def extract_newspaper(html: str, url: str) -> dict:
+    from newspaper import Article
+
+    article = Article(url)
+    article.download(input_html=html)
+    article.parse()
+    return {
+        "text": article.text,
+        "published_date": article.publish_date.date().isoformat() if article.publish_date else "",
+        "authors": article.authors,
+        "summary": article.summary,
+    }
+
+
+def import_seconds(engine: str, runs: int = 3) -> float:
+    """Median time to import an engine in a fresh interpreter."""
+    code = (
+        "import time\n"
+        "started = time.perf_counter()\n"
+        + IMPORTS[engine]
+        + "print(time.perf_counter() - started)\n"
+    )
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        )
+        times.append(float(output.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def word_f1(extracted: str, expected: str) -> tuple[float, float, float]:
+    got = Counter(WORD.findall(extracted.lower()))
+    want = Counter(WORD.findall(expected.lower()))
+    overlap = sum((got & want).values())
+    if not overlap:
+        return 0.0, 0.0, 0.0
+    precision = overlap / sum(got.values())
+    recall = overlap / sum(want.values())
+    return precision, recall, 2 * precision * recall / (precision + recall)
+
+
+def run_engine(extract, corpus: list[dict], pages: dict, repeat: int) -> dict:
+    parse_ms, precision, recall, f1 = [], [], [], []
+    dates = authors = summaries = 0
+    for item in corpus:
+        html = pages[item["file"]]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = extract(html, item["url"])
+            timings.append((time.perf_counter() - started) * 1000)
+        parse_ms.append(statistics.median(timings))
+        p, r, f = word_f1(result["text"], item["text"])
+        precision.append(p)
+        recall.append(r)
+        f1.append(f)
+        dates += result["published_date"] == item["published_date"]
+        authors += sorted(result["authors"]) == sorted(item["authors"])
+        summaries += bool(result["summary"].strip())
+    pages_count = len(corpus)
+    return {
+        "parse_ms_mean": round(statistics.mean(parse_ms), 2),
+        "parse_ms_max": round(max(parse_ms), 2),
+        "precision": round(statistics.mean(precision), 3),
+        "recall": round(statistics.mean(recall), 3),
+        "f1": round(statistics.mean(f1), 3),
+        "date_accuracy": round(dates / pages_count, 3),
+        "author_accuracy": round(authors / pages_count, 3),
+        "summary_rate": round(summaries / pages_count, 3),
+    }
+
+
+def print_table(results: dict):
+    columns = (
+        ("import_s", "import s"),
+        ("parse_ms_mean", "parse ms"),
+        ("parse_ms_max", "max ms"),
+        ("precision", "prec"),
+        ("recall", "recall"),
+        ("f1", "F1"),
+        ("date_accuracy", "dates"),
+        ("author_accuracy", "authors"),
+        ("summary_rate", "summary"),
+    )
+    width = max(len("engine"), *(len(name) for name in results))
+    print(f"{'engine':<{width}} " + " ".join(f"{label:>8}" for _, label in columns))
+    for name, result in results.items():
+        print(f"{name:<{width}} " + " ".join(f"{str(result[key]):>8}" for key, _ in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks article extraction engines.")
+    parser.add_argument("--repeat", type=int, default=20, help="parses per page")
+    parser.add_argument("--engine", action="append", choices=sorted(IMPORTS),
+                        help="engine to run (repeatable; default: both)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = json.load(f)
+    engine = load_engine()
+    # Pages are decoded the way the fetcher decodes them, for both engines.
+    pages = {}
+    for item in corpus:
+        with open(os.path.join(PAGES_DIR, item["file"]), "rb") as f:
+            pages[item["file"]] = engine.decode_html(f.read())
+
+    extractors = {
+        "lxml": lambda html, url: extract_lxml(engine, html, url),
+        "newspaper3k": extract_newspaper,
+    }
+    results = {}
+    for name in args.engine or IMPORTS:
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = {
+            "import_s": round(import_seconds(name), 3),
+            **run_engine(extractors[name], corpus, pages, args.repeat),
+        }
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Schema benchmark: `shared/schemas.py` against the Pydantic round trips.
+
+For each structured output the stages hand each other (`ExtractedClaims`,
+`SourcesOutput`, `SourceProfilerOutput`, `ClaimsOutput`), builds a payload of
+realistic size and times, per payload:
+
+- decode: JSON text to a validated object (`model_validate_json` against
+  `loads` + `validate`),
+- dump: the object to dicts and lists for session state (`model_dump`
+  against `to_builtins`),
+- encode: the object to JSON text (`model_dump_json` against `dumps`),
+- round trip: all three in a row, as a stage reading and writing state does.
+
+The `json` rows are the standard library calls the stages made on their own
+(`json.loads`, `json.dumps`), without any validation, for reference.
+
+Before timing, it checks that both paths read the payload into the same data
+and reject the same invalid payloads.
+
+    python -m benchmarks.schemas.run
+    python -m benchmarks.schemas.run --claims 20 --sources 30 --json results.json
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import timeit
+
+from evaluator_agent.agent import SourceProfilerOutput
+from extractor_agent.agent import ExtractedClaims
+from fact_checker_agent.agent import ClaimsOutput
+from retrieval_agent.agent import SourcesOutput
+from shared import schemas
+
+WORDS = (
+    "the senator said federal spending on rural hospitals rose by percent last year "
+    "according to a report from the health department while critics argued that "
+    "inflation erased most of the gains for patients in the state"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def payloads(claims: int, sources: int, seed: int = 0) -> dict:
+    """One realistic payload per schema, keyed by schema name."""
+    rng = random.Random(seed)
+    domains = [f"news{i}.example.com" for i in range(sources)]
+    return {
+        "ExtractedClaims": {"claims": [sentence(rng, 18) for _ in range(claims)]},
+        "SourcesOutput": {
+            "sources": [
+                {
+                    "domain": domain,
+                    "retrieved_quote": sentence(rng, 40),
+                    "published_date": f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+                    "retrieving_agent": rng.choice(
+                        ["positive_search_agent", "negative_search_agent", "neutral_search_agent"]
+                    ),
+                }
+                for domain in domains
+            ]
+        },
+        "SourceProfilerOutput": {
+            "source_profiles": [
+                {
+                    "source_url": domain,
+                    "retrieved_quote": sentence(rng, 40),
+                    "retrieving_agent": rng.choice(schemas.RETRIEVING_AGENTS),
+                    "credibility_rating": rng.choice(schemas.CREDIBILITY_RATINGS),
+                    "bias_rating": rng.choice(schemas.BIAS_RATINGS),
+                }
+                for domain in domains
+            ]
+        },
+        "ClaimsOutput": {
+            "claims": [
+                {
+                    "claim_text": sentence(rng, 18),
+                    "confidence": round(rng.random(), 2),
+                    "bias_score": "neutral",
+                    "justification": sentence(rng, 60),
+                    "sources": rng.sample(domains, min(4, len(domains))),
+                    "partial_evidence": False,
+                    "spans": [
+                        {"start": 120 * i, "end": 120 * i + 95, "text": sentence(rng, 16), "score": 0.92}
+                    ],
+                }
+                for i in range(claims)
+            ]
+        },
+    }
+
+
+MODELS = {
+    "ExtractedClaims": (ExtractedClaims, schemas.ExtractedClaims),
+    "SourcesOutput": (SourcesOutput, schemas.SourcesOutput),
+    "SourceProfilerOutput": (SourceProfilerOutput, schemas.SourceProfilerOutput),
+    "ClaimsOutput": (ClaimsOutput, schemas.ClaimsOutput),
+}
+# Invalid payloads both paths must reject.
+INVALID = {
+    "ExtractedClaims": {"claims": ["fine", 3]},
+    "SourcesOutput": {"sources": [{"domain": "a.com"}]},
+    "SourceProfilerOutput": {
+        "source_profiles": [
+            {
+                "source_url": "a.com",
+                "retrieved_quote": "",
+                "retrieving_agent": "Supporting Researcher",
+                "credibility_rating": "Excellent",
+                "bias_rating": "Center",
+            }
+        ]
+    },
+    "ClaimsOutput": {"claims": [{"claim_text": "x", "confidence": "high"}]},
+}
+
+
+def check_agreement(name: str, data: dict):
+    model, record_type = MODELS[name]
+    text = json.dumps(data)
+    expected = model.model_validate_json(text).model_dump()
+    got = schemas.to_builtins(schemas.validate(record_type, schemas.loads(text)))
+    if got != expected:
+        raise SystemExit(f"{name}: the fast path reads the payload differently than Pydantic")
+    invalid = json.dumps(INVALID[name])
+    try:
+        model.model_validate_json(invalid)
+    except ValueError:
+        pass
+    else:
+        raise SystemExit(f"{name}: Pydantic accepted the invalid payload")
+    try:
+        schemas.validate(record_type, schemas.loads(invalid))
+    except schemas.SchemaError:
+        pass
+    else:
+        raise SystemExit(f"{name}: the fast path accepted the invalid payload")
+
+
+def time_us(function, repeat: int) -> float:
+    """Median microseconds per call over `repeat` runs."""
+    number = 200
+    runs = timeit.repeat(function, number=number, repeat=repeat)
+    return statistics.median(runs) / number * 1e6
+
+
+def run_schema(name: str, data: dict, repeat: int) -> dict:
+    model, record_type = MODELS[name]
+    text = json.dumps(data)
+    instance = model.model_validate_json(text)
+    record = schemas.validate(record_type, schemas.loads(text))
+
+    def pydantic_round_trip():
+        decoded = model.model_validate_json(text)
+        decoded.model_dump()
+        return decoded.model_dump_json()
+
+    def fast_round_trip():
+        decoded = schemas.validate(record_type, schemas.loads(text))
+        schemas.to_builtins(decoded)
+        return schemas.dumps(decoded)
+
+    timings = {
+        "pydantic": {
+            "decode": time_us(lambda: model.model_validate_json(text), repeat),
+            "dump": time_us(instance.model_dump, repeat),
+            "encode": time_us(instance.model_dump_json, repeat),
+            "round_trip": time_us(pydantic_round_trip, repeat),
+        },
+        "fast": {
+            "decode": time_us(lambda: schemas.validate(record_type, schemas.loads(text)), repeat),
+            "dump": time_us(lambda: schemas.to_builtins(record), repeat),
+            "encode": time_us(lambda: schemas.dumps(record), repeat),
+            "round_trip": time_us(fast_round_trip, repeat),
+        },
+        "json": {
+            "decode": time_us(lambda: json.loads(text), repeat),
+            "dump": None,
+            "encode": time_us(lambda: json.dumps(data), repeat),
+            "round_trip": time_us(lambda: json.dumps(json.loads(text)), repeat),
+        },
+    }
+    for path in timings.values():
+        for step, value in path.items():
+            path[step] = None if value is None else round(value, 2)
+    timings["speedup"] = round(timings["pydantic"]["round_trip"] / timings["fast"]["round_trip"], 2)
+    timings["bytes"] = len(text)
+    return timings
+
+
+def print_table(results: dict):
+    steps = ("decode", "dump", "encode", "round_trip")
+    width = max(len("schema"), *(len(name) for name in results))
+    header = " ".join(f"{f'{step} us':>14}" for step in steps)
+    print(f"{'schema':<{width}} {'path':<8} {'bytes':>6} {header} {'speedup':>8}")
+    for name, result in results.items():
+        for path in ("pydantic", "json", "fast"):
+            row = " ".join(f"{str(result[path][step] or '-'):>14}" for step in steps)
+            speedup = f"{result['speedup']}x" if path == "fast" else ""
+            print(f"{name:<{width}} {path:<8} {result['bytes']:>6} {row} {speedup:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the pipeline schemas' fast path.")
+    parser.add_argument("--claims", type=int, default=8, help="claims per payload")
+    parser.add_argument("--sources", type=int, default=15, help="sources per payload")
+    parser.add_argument("--repeat", type=int, default=7, help="timing runs per step")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if schemas.orjson is None:
+        print("orjson is not installed; timing the standard library JSON path.", file=sys.stderr)
+    results = {}
+    for name, data in payloads(args.claims, args.sources).items():
+        check_agreement(name, data)
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = run_schema(name, data, args.repeat)
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Pipeline configurations compared by the evaluation suite.
+
+Each configuration is a set of environment overrides applied to a fresh
+worker process, since most settings are read when the agents are imported.
+"""
+
+CONFIGS = {
+    "baseline": {},
+    "single_pass": {"FACT_CHECK_MAX_ITERATIONS": "1"},
+    "fewer_sources": {"MAX_SOURCES": "6"},
+    "overlapped": {"PIPELINED_EXTRACTION": "true", "OVERLAPPED_PROFILING": "true"},
+    "lite_analyst": {
+        "MODEL_OVERRIDES": "chief_analyst_agent=gemini-2.0-flash-lite,"
+        "final_adjudicator_agent=gemini-2.0-flash-lite"
+    },
+    "tight_budget": {"MAX_REQUEST_MODEL_CALLS": "20", "MAX_REQUEST_TOKENS": "100000"},
+}
@@ -0,0 +1,198 @@
+"""
+Recorded model and search responses for offline evaluation.
+
+`install("record")` routes every `gemini-*` call through the real Gemini API
+and keeps each response; `install("replay")` answers from the recordings and
+fails loudly on a request that was never recorded. Requests are keyed by
+model, instruction, tools and conversation contents. Contents are compared as
+a set, because events from parallel branches can arrive in any order.
+
+Recorded latencies are replayed too, scaled by EVAL_LATENCY_SCALE (0 to run
+as fast as possible), so configurations can be compared on wall-clock time.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import AsyncGenerator, ClassVar
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+
+from shared.config import env_float
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+MODEL_RECORDINGS = os.path.join(RECORDINGS_DIR, "model.json")
+SEARCH_RECORDINGS = os.path.join(RECORDINGS_DIR, "search.json")
+EVAL_LATENCY_SCALE = env_float("EVAL_LATENCY_SCALE", 1.0)
+
+
+class MissingRecordingError(Exception):
+    """Raised in replay mode for a model request that was never recorded."""
+
+
+def _load(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(path: str, data: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _without_ids(value):
+    # Function call IDs are generated per run.
+    if isinstance(value, dict):
+        return {k: _without_ids(v) for k, v in value.items() if k != "id"}
+    if isinstance(value, list):
+        return [_without_ids(v) for v in value]
+    return value
+
+
+def request_key(model: str, llm_request: LlmRequest) -> str:
+    config = llm_request.config
+    instruction = config.system_instruction if config else None
+    if hasattr(instruction, "model_dump"):
+        instruction = instruction.model_dump(mode="json", exclude_none=True)
+    contents = sorted(
+        json.dumps(_without_ids(content.model_dump(mode="json", exclude_none=True)), sort_keys=True)
+        for content in llm_request.contents
+    )
+    payload = json.dumps(
+        {
+            "model": model,
+            "instruction": instruction,
+            "tools": sorted(llm_request.tools_dict),
+            "contents": contents,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Recordings:
+    """Model responses by request key, with the latency each one took."""
+
+    def __init__(self, path: str = MODEL_RECORDINGS):
+        self.path = path
+        self.entries = _load(path)
+        self.recorded = 0
+
+    def get(self, key: str) -> dict | None:
+        return self.entries.get(key)
+
+    def put(self, key: str, model: str, response: dict, latency: float):
+        self.entries[key] = {"model": model, "response": response, "latency": round(latency, 3)}
+        self.recorded += 1
+
+    def save(self):
+        _save(self.path, self.entries)
+
+
+class ReplayLlm(BaseLlm):
+    """Records or replays every `gemini-*` call, and counts calls and tokens."""
+
+    mode: ClassVar[str] = "replay"
+    recordings: ClassVar[Recordings | None] = None
+    calls: ClassVar[int] = 0
+    tokens: ClassVar[int] = 0
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"gemini-.*"]
+
+    @classmethod
+    def _count(cls, response: LlmResponse):
+        cls.calls += 1
+        # ADK 0.3.0's `LlmResponse` has no usage field.
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            cls.tokens += usage.total_token_count or 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key(self.model, llm_request)
+        if self.mode == "record":
+            started = time.monotonic()
+            final = None
+            async for response in Gemini(model=self.model).generate_content_async(
+                llm_request, stream=stream
+            ):
+                if not response.partial:
+                    final = response
+                yield response
+            if final is not None:
+                self._count(final)
+                self.recordings.put(
+                    key,
+                    self.model,
+                    final.model_dump(mode="json", exclude_none=True),
+                    time.monotonic() - started,
+                )
+            return
+
+        entry = self.recordings.get(key)
+        if entry is None:
+            raise MissingRecordingError(
+                f"No recorded response for a {self.model} request ({key[:12]}). "
+                "Re-record with `python -m evals.run --record`."
+            )
+        if EVAL_LATENCY_SCALE:
+            await asyncio.sleep(entry["latency"] * EVAL_LATENCY_SCALE)
+        response = LlmResponse.model_validate(entry["response"])
+        self._count(response)
+        yield response
+
+
+class RecordingSearchBackend:
+    """Wraps a search backend and keeps every result, in the local fixture format."""
+
+    def __init__(self, backend, path: str = SEARCH_RECORDINGS):
+        self.backend = backend
+        self.path = path
+        self.results = _load(path)
+        if hasattr(backend, "search_batch"):
+            self.search_batch = self._search_batch
+
+    async def search(self, query: str) -> list[dict]:
+        results = await self.backend.search(query)
+        self.results[query] = results
+        return results
+
+    async def _search_batch(self, queries: list[str]) -> dict:
+        found = await self.backend.search_batch(queries)
+        for query in queries:
+            self.results[query] = found.get(query, [])
+        return found
+
+    def save(self):
+        _save(self.path, self.results)
+
+
+def install(mode: str) -> Recordings:
+    """
+    Routes model calls through `ReplayLlm`. In replay mode searches come from
+    the recorded fixtures; call before any agent module is imported.
+    """
+    if mode == "replay":
+        os.environ["SEARCH_BACKEND"] = "local"
+        os.environ["SEARCH_FIXTURES"] = SEARCH_RECORDINGS
+        if not os.path.exists(SEARCH_RECORDINGS):
+            _save(SEARCH_RECORDINGS, {})
+    ReplayLlm.mode = mode
+    ReplayLlm.recordings = Recordings()
+    LLMRegistry.register(ReplayLlm)
+    LLMRegistry.resolve.cache_clear()
+    return ReplayLlm.recordings
@@ -0,0 +1,181 @@
+"""
+Accuracy-versus-latency evaluation of pipeline configurations.
+
+Runs the labeled claims in `corpus.json` through the full pipeline under each
+configuration in `configs.py`, from recorded model and search responses, and
+reports per configuration:
+
+- verdict accuracy: a labeled claim counts as correct when the pipeline
+  checked a matching claim and its confidence is on the right side of 0.5,
+- calibration: expected calibration error (ECE) and Brier score of the
+  confidences against the labels,
+- model calls, tokens and latency per article.
+
+    python -m evals.run                      # replay every configuration
+    python -m evals.run --config single_pass
+    python -m evals.run --record             # re-record (needs API keys)
+
+Recording calls the real Gemini and search APIs for every request the
+configurations make that isn't recorded yet, and adds them to
+`evals/recordings/`.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from evals.configs import CONFIGS
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_PATH = os.path.join(REPO_DIR, "evals", "corpus.json")
+# Minimum word overlap (Jaccard) for a returned claim to match a labeled one.
+MIN_CLAIM_MATCH = 0.3
+CALIBRATION_BINS = 10
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str) -> set[str]:
+    return set(WORD.findall(text.lower()))
+
+
+def match_claim(labeled: str, returned: list[dict]) -> dict | None:
+    """Returns the returned claim that best matches a labeled claim, if any does."""
+    target = _words(labeled)
+    best, best_score = None, MIN_CLAIM_MATCH
+    for claim in returned:
+        words = _words(claim.get("claim_text", ""))
+        score = len(target & words) / len(target | words) if target | words else 0.0
+        if score >= best_score:
+            best, best_score = claim, score
+    return best
+
+
+def expected_calibration_error(pairs: list[tuple[float, bool]]) -> float:
+    """ECE of confidences (probability the claim is true) against labels."""
+    if not pairs:
+        return 0.0
+    bins = [[] for _ in range(CALIBRATION_BINS)]
+    for confidence, label in pairs:
+        bins[min(int(confidence * CALIBRATION_BINS), CALIBRATION_BINS - 1)].append(
+            (confidence, label)
+        )
+    error = 0.0
+    for members in bins:
+        if members:
+            mean_confidence = statistics.mean(c for c, _ in members)
+            accuracy = statistics.mean(float(label) for _, label in members)
+            error += len(members) / len(pairs) * abs(mean_confidence - accuracy)
+    return error
+
+
+def score(corpus: list[dict], rows: list[dict]) -> dict:
+    by_id = {row["id"]: row for row in rows}
+    correct = missed = 0
+    pairs = []
+    for article in corpus:
+        row = by_id.get(article["id"]) or {}
+        returned = (row.get("result") or {}).get("claims", [])
+        for labeled in article["claims"]:
+            claim = match_claim(labeled["claim_text"], returned)
+            if claim is None or not isinstance(claim.get("confidence"), (int, float)):
+                missed += 1
+                continue
+            confidence = min(max(float(claim["confidence"]), 0.0), 1.0)
+            pairs.append((confidence, labeled["label"]))
+            correct += (confidence >= 0.5) == labeled["label"]
+    total = sum(len(article["claims"]) for article in corpus)
+    seconds = [row["seconds"] for row in rows]
+    return {
+        "accuracy": round(correct / total, 3) if total else 0.0,
+        "missed_claims": missed,
+        "ece": round(expected_calibration_error(pairs), 3),
+        "brier": round(statistics.mean((c - l) ** 2 for c, l in pairs), 3) if pairs else None,
+        "failed_articles": sum(row["error"] is not None for row in rows),
+        "model_calls": round(statistics.mean(row["model_calls"] for row in rows), 1),
+        "tokens": round(statistics.mean(row["tokens"] for row in rows)),
+        "latency_p50": round(statistics.median(seconds), 2),
+        "latency_max": round(max(seconds), 2),
+    }
+
+
+def run_config(name: str, record: bool) -> list[dict]:
+    """Runs the corpus under one configuration in a fresh worker process."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as output:
+        path = output.name
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "evals.worker", "--output", path]
+            + (["--record"] if record else []),
+            cwd=REPO_DIR,
+            env={**os.environ, **CONFIGS[name]},
+            check=True,
+        )
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.unlink(path)
+
+
+def print_table(scores: dict):
+    columns = (
+        ("accuracy", "acc"),
+        ("missed_claims", "missed"),
+        ("ece", "ECE"),
+        ("brier", "Brier"),
+        ("model_calls", "calls"),
+        ("tokens", "tokens"),
+        ("latency_p50", "p50 s"),
+        ("latency_max", "max s"),
+        ("failed_articles", "failed"),
+    )
+    width = max(len("config"), *(len(name) for name in scores))
+    print(f"{'config':<{width}} " + " ".join(f"{label:>8}" for _, label in columns))
+    for name, result in scores.items():
+        print(f"{name:<{width}} " + " ".join(f"{str(result[key]):>8}" for key, _ in columns))
+
+
+def recommend(scores: dict, tolerance: float) -> str | None:
+    """The fastest configuration within `tolerance` of the best accuracy."""
+    best = max(result["accuracy"] for result in scores.values())
+    eligible = [
+        name
+        for name, result in scores.items()
+        if result["accuracy"] >= best - tolerance and not result["failed_articles"]
+    ]
+    return min(eligible, key=lambda name: scores[name]["latency_p50"], default=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares pipeline configurations.")
+    parser.add_argument("--config", action="append", choices=sorted(CONFIGS),
+                        help="configuration to run (repeatable; default: all)")
+    parser.add_argument("--record", action="store_true",
+                        help="call the real APIs and add new responses to the recordings")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="accuracy a recommended configuration may give up")
+    parser.add_argument("--json", help="also write the scores to this file")
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = json.load(f)
+    scores = {}
+    for name in args.config or CONFIGS:
+        print(f"Running {name}...", file=sys.stderr)
+        scores[name] = score(corpus, run_config(name, args.record))
+
+    print_table(scores)
+    choice = recommend(scores, args.tolerance)
+    if choice:
+        print(f"\nFastest configuration within {args.tolerance} of the best accuracy: {choice}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(scores, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
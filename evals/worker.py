@@ -0,0 +1,104 @@
+"""
+Runs the labeled corpus through `master_agent` under one configuration.
+
+Started by `evals/run.py` in a fresh process with the configuration's
+environment already applied. Writes one result per article as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+
+from evals import replay
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.json")
+APP_NAME = "evals"
+USER_ID = "evals"
+
+
+async def run_corpus(corpus: list[dict], record: bool) -> list[dict]:
+    # Imported only now, after `replay.install` has swapped in the model.
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    from master_agent.agent import root_agent
+    from retrieval_agent.search import search_layer
+    from shared.state import parse_json_state
+
+    if record:
+        search_layer.backend = replay.RecordingSearchBackend(search_layer.backend)
+    session_service = InMemorySessionService()
+    runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=session_service)
+
+    rows = []
+    try:
+        for article in corpus:
+            session_id = uuid.uuid4().hex
+            session_service.create_session(
+                app_name=APP_NAME,
+                user_id=USER_ID,
+                session_id=session_id,
+                state={
+                    "client_content": {
+                        "url": article["url"],
+                        "text": article["text"],
+                        "image_urls": [],
+                    }
+                },
+            )
+            calls, tokens = replay.ReplayLlm.calls, replay.ReplayLlm.tokens
+            started = time.monotonic()
+            final_text, error = None, None
+            try:
+                async for event in runner.run_async(
+                    user_id=USER_ID,
+                    session_id=session_id,
+                    new_message=types.Content(
+                        role="user", parts=[types.Part(text=article["url"])]
+                    ),
+                ):
+                    if event.content and event.content.parts and event.content.parts[0].text:
+                        final_text = event.content.parts[0].text
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            result = parse_json_state(final_text)
+            rows.append(
+                {
+                    "id": article["id"],
+                    "result": result if isinstance(result, dict) else None,
+                    "error": error or (None if isinstance(result, dict) else final_text),
+                    "seconds": round(time.monotonic() - started, 3),
+                    "model_calls": replay.ReplayLlm.calls - calls,
+                    "tokens": replay.ReplayLlm.tokens - tokens,
+                }
+            )
+    finally:
+        if record:
+            replay.ReplayLlm.recordings.save()
+            search_layer.backend.save()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the eval corpus once.")
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    replay.install("record" if args.record else "replay")
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = json.load(f)
+    rows = asyncio.run(run_corpus(corpus, args.record))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(rows, f)
+    failed = sum(row["error"] is not None for row in rows)
+    print(f"{len(rows) - failed}/{len(rows)} articles completed.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,9 @@ class SourceProfile(BaseModel):
     bias_rating: Literal[
         "Left", "Leans Left", "Center", "Leans Right", "Right", "N/A"
     ] = Field(..., description="The bias of the source.")
+    claims: List[str] = Field(
+        default_factory=list, description="The claims the source is evidence for."
+    )
 
 
 class SourceProfilerOutput(BaseModel):
@@ -72,6 +75,10 @@ You are a senior intelligence analyst. Your job is to take the raw research summ
 2.  **Synthesize**: Based on the summary, determine the final ratings for credibility, bias, factual reporting, and ownership.
 3.  **Structure**: Set the `profiler_method` to "Real-Time Research" and use the `notes` field to summarize the key evidence.
 4.  **Format**: Ensure your final output is a single, valid JSON object that perfectly matches the `SourceProfilerOutput` schema.
+5.  **Claims**: Copy each source's `claims` list from the sources below unchanged.
+
+Sources:
+{sources_output}
 
 Raw Data:
 {raw_research_data}
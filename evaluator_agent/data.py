@@ -1,231 +0,0 @@
-# This file contains the analytics data for news sources.
-# Data is derived from Ad Fontes Media.
-# Bias: Negative = Left, Positive = Right.
-# Credibility: Reliability score normalized to a 0.0 to 1.0 scale.
-
-SOURCE_ANALYTICS_DB = {
-    "abc15.com": {"bias_label": -0.63, "credibility_score": 0.80},
-    "cnn.com": {"bias_label": -11.40, "credibility_score": 0.61},
-    "bbc.com": {"bias_label": -2.30, "credibility_score": 0.77},
-    "reuters.com": {"bias_label": -2.79, "credibility_score": 0.80},
-    "upi.com": {"bias_label": -0.51, "credibility_score": 0.76},
-    "patch.com": {"bias_label": -5.64, "credibility_score": 0.76},
-    "post-gazette.com": {"bias_label": -0.48, "credibility_score": 0.76},
-    "seattletimes.com": {"bias_label": -1.55, "credibility_score": 0.76},
-    "jsonline.com": {"bias_label": -6.87, "credibility_score": 0.75},
-    "oregonlive.com": {"bias_label": -2.65, "credibility_score": 0.75},
-    "pbs.org": {"bias_label": -6.48, "credibility_score": 0.75},
-    "orlandosentinel.com": {"bias_label": -4.66, "credibility_score": 0.75},
-    "npr.org": {"bias_label": -4.85, "credibility_score": 0.75},
-    "triblive.com": {"bias_label": -1.68, "credibility_score": 0.75},
-    "al.com": {"bias_label": -2.65, "credibility_score": 0.75},
-    "latimes.com": {"bias_label": -7.69, "credibility_score": 0.74},
-    "nj.com": {"bias_label": -3.67, "credibility_score": 0.74},
-    "newsday.com": {"bias_label": -4.69, "credibility_score": 0.74},
-    "syracuse.com": {"bias_label": -2.48, "credibility_score": 0.74},
-    "sltrib.com": {"bias_label": -2.0, "credibility_score": 0.74},
-    "nola.com": {"bias_label": -3.11, "credibility_score": 0.74},
-    "snopes.com": {"bias_label": -0.78, "credibility_score": 0.73},
-    "wsj.com": {"bias_label": 4.91, "credibility_score": 0.73},
-    "cleveland.com": {"bias_label": -0.67, "credibility_score": 0.73},
-    "miamiherald.com": {"bias_label": -4.31, "credibility_score": 0.73},
-    "detroitnews.com": {"bias_label": -1.79, "credibility_score": 0.73},
-    "tampabay.com": {"bias_label": -5.34, "credibility_score": 0.73},
-    "nbcnews.com": {"bias_label": -8.58, "credibility_score": 0.72},
-    "sfchronicle.com": {"bias_label": -6.28, "credibility_score": 0.72},
-    "sfgate.com": {"bias_label": -1.48, "credibility_score": 0.72},
-    "techcrunch.com": {"bias_label": -0.29, "credibility_score": 0.72},
-    "nytimes.com": {"bias_label": -8.6, "credibility_score": 0.72},
-    "sun-sentinel.com": {"bias_label": -1.34, "credibility_score": 0.72},
-    "usnews.com": {"bias_label": -3.15, "credibility_score": 0.71},
-    "usatoday.com": {"bias_label": -5.6, "credibility_score": 0.71},
-    "smithsonianmag.com": {"bias_label": -3.72, "credibility_score": 0.71},
-    "popsci.com": {"bias_label": -1.93, "credibility_score": 0.71},
-    "thehill.com": {"bias_label": -0.9, "credibility_score": 0.71},
-    "metro.co.uk": {"bias_label": -1.6, "credibility_score": 0.71},
-    "politico.com": {"bias_label": -8.25, "credibility_score": 0.71},
-    "aljazeera.com": {"bias_label": -7.45, "credibility_score": 0.70},
-    "theverge.com": {"bias_label": -5.0, "credibility_score": 0.70},
-    "sacbee.com": {"bias_label": -9.36, "credibility_score": 0.70},
-    "stltoday.com": {"bias_label": -6.67, "credibility_score": 0.70},
-    "kansascity.com": {"bias_label": -5.74, "credibility_score": 0.69},
-    "theguardian.com": {"bias_label": -10.28, "credibility_score": 0.69},
-    "wired.com": {"bias_label": -6.67, "credibility_score": 0.69},
-    "nydailynews.com": {"bias_label": -5.07, "credibility_score": 0.69},
-    "marketwatch.com": {"bias_label": -6.0, "credibility_score": 0.69},
-    "people.com": {"bias_label": -7.13, "credibility_score": 0.69},
-    "time.com": {"bias_label": -10.25, "credibility_score": 0.68},
-    "qz.com": {"bias_label": -7.28, "credibility_score": 0.68},
-    "msnbc.com": {"bias_label": -13.52, "credibility_score": 0.68},
-    "theconversation.com": {"bias_label": -4.91, "credibility_score": 0.67},
-    "rollingstone.com": {"bias_label": -9.7, "credibility_score": 0.67},
-    "nymag.com": {"bias_label": -9.32, "credibility_score": 0.66},
-    "washingtonpost.com": {"bias_label": -8.38, "credibility_score": 0.66},
-    "independent.co.uk": {"bias_label": -10.7, "credibility_score": 0.66},
-    "theatlantic.com": {"bias_label": -10.12, "credibility_score": 0.66},
-    "talkingpointsmemo.com": {"bias_label": -8.77, "credibility_score": 0.65},
-    "scmp.com": {"bias_label": -5.36, "credibility_score": 0.65},
-    "variety.com": {"bias_label": -7.69, "credibility_score": 0.64},
-    "vogue.com": {"bias_label": -12.16, "credibility_score": 0.63},
-    "mashable.com": {"bias_label": -10.23, "credibility_score": 0.63},
-    "newyorker.com": {"bias_label": -12.32, "credibility_score": 0.62},
-    "mediaite.com": {"bias_label": -11.74, "credibility_score": 0.62},
-    "vox.com": {"bias_label": -12.01, "credibility_score": 0.61},
-    "vice.com": {"bias_label": -12.89, "credibility_score": 0.60},
-    "tmz.com": {"bias_label": -9.93, "credibility_score": 0.60},
-    "motherjones.com": {"bias_label": -15.48, "credibility_score": 0.60},
-    "realclearpolitics.com": {"bias_label": 13.07, "credibility_score": 0.57},
-    "thedailybeast.com": {"bias_label": -17.11, "credibility_score": 0.56},
-    "huffpost.com": {"bias_label": -13.68, "credibility_score": 0.56},
-    "salon.com": {"bias_label": -19.18, "credibility_score": 0.56},
-    "newsweek.com": {"bias_label": -12.69, "credibility_score": 0.56},
-    "vanityfair.com": {"bias_label": -18.71, "credibility_score": 0.55},
-    "nypost.com": {"bias_label": 14.04, "credibility_score": 0.54},
-    "refinery29.com": {"bias_label": -11.62, "credibility_score": 0.54},
-    "foxnews.com": {"bias_label": 16.44, "credibility_score": 0.52},
-    "nationalreview.com": {"bias_label": 17.18, "credibility_score": 0.52},
-    "slate.com": {"bias_label": -18.75, "credibility_score": 0.52},
-    "rawstory.com": {"bias_label": -17.86, "credibility_score": 0.51},
-    "inquisitr.com": {"bias_label": -7.16, "credibility_score": 0.51},
-    "washingtonexaminer.com": {"bias_label": 16.33, "credibility_score": 0.51},
-    "theweek.com": {"bias_label": -14.71, "credibility_score": 0.50},
-    "rt.com": {"bias_label": 14.21, "credibility_score": 0.48},
-    "theroot.com": {"bias_label": -20.56, "credibility_score": 0.46},
-    "theblaze.com": {"bias_label": 16.08, "credibility_score": 0.46},
-    "westernjournal.com": {"bias_label": 21.01, "credibility_score": 0.46},
-    "zerohedge.com": {"bias_label": 13.84, "credibility_score": 0.45},
-    "washingtontimes.com": {"bias_label": 16.1, "credibility_score": 0.43},
-    "newsmax.com": {"bias_label": 18.44, "credibility_score": 0.43},
-    "jezebel.com": {"bias_label": -20.58, "credibility_score": 0.43},
-    "townhall.com": {"bias_label": 21.19, "credibility_score": 0.42},
-    "thefederalist.com": {"bias_label": 22.39, "credibility_score": 0.38},
-    "redstate.com": {"bias_label": 24.57, "credibility_score": 0.33},
-    "pjmedia.com": {"bias_label": 23.97, "credibility_score": 0.30},
-    "theepochtimes.com": {"bias_label": 22.71, "credibility_score": 0.28},
-    "twitchy.com": {"bias_label": 21.58, "credibility_score": 0.27},
-    "thegatewaypundit.com": {"bias_label": 25.95, "credibility_score": 0.27},
-    "palmerreport.com": {"bias_label": -28.1, "credibility_score": 0.26},
-    "infowars.com": {"bias_label": 26.69, "credibility_score": 0.23},
-    "wnd.com": {"bias_label": 23.34, "credibility_score": 0.33},
-    "scarymommy.com": {"bias_label": -14.97, "credibility_score": 0.51},
-    "theadvocate.com": {"bias_label": -17.59, "credibility_score": 0.52},
-    "ocregister.com": {"bias_label": -1.72, "credibility_score": 0.75},
-    "oann.com": {"bias_label": 20.17, "credibility_score": 0.39},
-    "propublica.org": {"bias_label": -7.17, "credibility_score": 0.74},
-    "tennessean.com": {"bias_label": -2.06, "credibility_score": 0.76},
-    "indystar.com": {"bias_label": -2.36, "credibility_score": 0.75},
-    "sky.com": {"bias_label": -2.9, "credibility_score": 0.70},
-    "dw.com": {"bias_label": -4.72, "credibility_score": 0.69},
-    "theintercept.com": {"bias_label": -16.36, "credibility_score": 0.62},
-    "newser.com": {"bias_label": -6.43, "credibility_score": 0.69},
-    "reason.com": {"bias_label": 7.42, "credibility_score": 0.59},
-    "sputniknews.com": {"bias_label": 8.21, "credibility_score": 0.57},
-    "rushlimbaugh.com": {"bias_label": 27.43, "credibility_score": 0.26},
-    "radiotimes.com": {"bias_label": 0.0, "credibility_score": 0.62},
-    "thenation.com": {"bias_label": -19.16, "credibility_score": 0.54},
-    "westword.com": {"bias_label": -2.26, "credibility_score": 0.69},
-    "stripes.com": {"bias_label": 0.43, "credibility_score": 0.79},
-    "newrepublic.com": {"bias_label": -18.68, "credibility_score": 0.53},
-    "thestranger.com": {"bias_label": -19.27, "credibility_score": 0.56},
-    "teenvogue.com": {"bias_label": -14.81, "credibility_score": 0.62},
-    "newsbusters.org": {"bias_label": 21.14, "credibility_score": 0.44},
-    "mic.com": {"bias_label": -16.21, "credibility_score": 0.62},
-    "voanews.com": {"bias_label": -3.78, "credibility_score": 0.74},
-    "tucson.com": {"bias_label": -2.27, "credibility_score": 0.72},
-    "seattlepi.com": {"bias_label": -3.96, "credibility_score": 0.70},
-    "thegrio.com": {"bias_label": -11.27, "credibility_score": 0.59},
-    "judicialwatch.org": {"bias_label": 25.01, "credibility_score": 0.45},
-    "phoenixnewtimes.com": {"bias_label": -6.23, "credibility_score": 0.71},
-    "naturalnews.com": {"bias_label": 32.34, "credibility_score": 0.11},
-    "phillyvoice.com": {"bias_label": -2.42, "credibility_score": 0.71},
-    "politicususa.com": {"bias_label": -16.38, "credibility_score": 0.48},
-    "lifesitenews.com": {"bias_label": 20.01, "credibility_score": 0.34},
-    "upworthy.com": {"bias_label": -3.94, "credibility_score": 0.62},
-    "rollcall.com": {"bias_label": -3.14, "credibility_score": 0.75},
-    "laweekly.com": {"bias_label": -3.64, "credibility_score": 0.72},
-    "jacobinmag.com": {"bias_label": -22.83, "credibility_score": 0.46},
-    "theamericanconservative.com": {"bias_label": 12.63, "credibility_score": 0.51},
-    "wonkette.com": {"bias_label": -28.83, "credibility_score": 0.25},
-    "secondnexus.com": {"bias_label": -21.95, "credibility_score": 0.36},
-    "pinknews.co.uk": {"bias_label": -11.68, "credibility_score": 0.64},
-    "washingtonian.com": {"bias_label": -2.75, "credibility_score": 0.68},
-    "laist.com": {"bias_label": -6.48, "credibility_score": 0.72},
-    "lgbtqnation.com": {"bias_label": -10.26, "credibility_score": 0.61},
-    "ozy.com": {"bias_label": -9.96, "credibility_score": 0.64},
-    "airforcetimes.com": {"bias_label": 1.32, "credibility_score": 0.72},
-    "therightscoop.com": {"bias_label": 23.35, "credibility_score": 0.31},
-    "ncregister.com": {"bias_label": 8.0, "credibility_score": 0.60},
-    "ijr.com": {"bias_label": 5.18, "credibility_score": 0.65},
-    "truepundit.com": {"bias_label": 8.05, "credibility_score": 0.58},
-    "truthout.org": {"bias_label": -21.55, "credibility_score": 0.40},
-    "prageru.com": {"bias_label": 19.67, "credibility_score": 0.35},
-    "wvgazettemail.com": {"bias_label": -2.11, "credibility_score": 0.73},
-    "metro.us": {"bias_label": -0.2, "credibility_score": 0.71},
-    "lifezette.com": {"bias_label": 23.71, "credibility_score": 0.32},
-    "theskimm.com": {"bias_label": -14.21, "credibility_score": 0.60},
-    "mises.org": {"bias_label": 16.1, "credibility_score": 0.47},
-    "spectator.org": {"bias_label": 25.21, "credibility_score": 0.30},
-    "khn.org": {"bias_label": -2.33, "credibility_score": 0.71},
-    "the-scientist.com": {"bias_label": -0.05, "credibility_score": 0.73},
-    "wattsupwiththat.com": {"bias_label": 11.17, "credibility_score": 0.48},
-    "newsandguts.com": {"bias_label": -14.99, "credibility_score": 0.50},
-    "lifenews.com": {"bias_label": 23.32, "credibility_score": 0.37},
-    "poynter.org": {"bias_label": -8.31, "credibility_score": 0.63},
-    "trendingpolitics.com": {"bias_label": 17.45, "credibility_score": 0.36},
-    "hillreporter.com": {"bias_label": -15.03, "credibility_score": 0.57},
-    "nationalenquirer.com": {"bias_label": 8.87, "credibility_score": 0.16},
-    "frontpagemag.com": {"bias_label": 23.71, "credibility_score": 0.29},
-    "afp.com": {"bias_label": -2.15, "credibility_score": 0.75},
-    "quillette.com": {"bias_label": 11.73, "credibility_score": 0.60},
-    "thecollegefix.com": {"bias_label": 9.35, "credibility_score": 0.62},
-    "washingtonmonthly.com": {"bias_label": -17.81, "credibility_score": 0.46},
-    "laconiadailysun.com": {"bias_label": 0.4, "credibility_score": 0.71},
-    "stream.org": {"bias_label": 21.54, "credibility_score": 0.39},
-    "prospect.org": {"bias_label": -15.46, "credibility_score": 0.49},
-    "sfexaminer.com": {"bias_label": -4.92, "credibility_score": 0.69},
-    "spectator.us": {"bias_label": 9.41, "credibility_score": 0.51},
-    "rightwingwatch.org": {"bias_label": -18.98, "credibility_score": 0.43},
-    "thebulwark.com": {"bias_label": -9.26, "credibility_score": 0.53},
-    "themarshallproject.org": {"bias_label": -5.52, "credibility_score": 0.72},
-    "washingtonblade.com": {"bias_label": -7.25, "credibility_score": 0.67},
-    "justthenews.com": {"bias_label": 6.84, "credibility_score": 0.59},
-    "nowthisnews.com": {"bias_label": -7.86, "credibility_score": 0.64},
-    "presstelegram.com": {"bias_label": -2.12, "credibility_score": 0.73},
-    "policemag.com": {"bias_label": 2.19, "credibility_score": 0.70},
-    "thenewamerican.com": {"bias_label": 22.56, "credibility_score": 0.28},
-    "nationalfile.com": {"bias_label": 23.1, "credibility_score": 0.27},
-    "insideclimatenews.org": {"bias_label": -8.95, "credibility_score": 0.71},
-    "sojo.net": {"bias_label": -11.79, "credibility_score": 0.59},
-    "inthesetimes.com": {"bias_label": -19.69, "credibility_score": 0.53},
-    "calmatters.org": {"bias_label": -5.27, "credibility_score": 0.72},
-    "mintpressnews.com": {"bias_label": -12.79, "credibility_score": 0.55},
-    "theappeal.org": {"bias_label": -10.88, "credibility_score": 0.67},
-    "newsy.com": {"bias_label": -4.23, "credibility_score": 0.76},
-    "yesmagazine.org": {"bias_label": -14.75, "credibility_score": 0.62},
-    "newspunch.com": {"bias_label": 27.35, "credibility_score": 0.23},
-    "thetrace.org": {"bias_label": -6.64, "credibility_score": 0.72},
-    "therealnews.com": {"bias_label": -19.64, "credibility_score": 0.61},
-    "freespeech.org": {"bias_label": -21.87, "credibility_score": 0.40},
-    "thedispatch.com": {"bias_label": 3.91, "credibility_score": 0.67},
-    "thehayride.com": {"bias_label": 17.84, "credibility_score": 0.31},
-    "progressive.org": {"bias_label": -19.21, "credibility_score": 0.49},
-    "msmagazine.com": {"bias_label": -13.33, "credibility_score": 0.61},
-    "colorlines.com": {"bias_label": -10.88, "credibility_score": 0.67},
-    "nysun.com": {"bias_label": 12.71, "credibility_score": 0.51},
-    "thefiscaltimes.com": {"bias_label": 1.42, "credibility_score": 0.68},
-    "newstarget.com": {"bias_label": 28.44, "credibility_score": 0.12},
-    "suffolknewsherald.com": {"bias_label": -0.27, "credibility_score": 0.69},
-    "join1440.com": {"bias_label": -0.25, "credibility_score": 0.72},
-    "whowhatwhy.org": {"bias_label": -12.85, "credibility_score": 0.57},
-    "thegrayzone.com": {"bias_label": -23.81, "credibility_score": 0.45},
-    "popular.info": {"bias_label": -15.3, "credibility_score": 0.63},
-    "shadowproof.com": {"bias_label": -24.15, "credibility_score": 0.59},
-    "rebelnews.com": {"bias_label": 5.92, "credibility_score": 0.66},
-    "newsnationnow.com": {"bias_label": -0.57, "credibility_score": 0.71},
-    "realchangenews.org": {"bias_label": -9.18, "credibility_score": 0.65},
-    "montanafreepress.org": {"bias_label": -3.04, "credibility_score": 0.73},
-    "theeveningtimes.com": {"bias_label": 1.48, "credibility_score": 0.65},
-    "meidastouch.com": {"bias_label": -21.01, "credibility_score": 0.42},
-    "mainernews.com": {"bias_label": -13.31, "credibility_score": 0.62},
-    "publishedreporter.com": {"bias_label": 7.49, "credibility_score": 0.55},
-}
\ No newline at end of file
@@ -0,0 +1,389 @@
+"""
+Credibility and bias profiles for source domains.
+
+Domains in the source reputation dataset (`reputation.py`) are profiled from
+the data directly. Unknown domains are researched with a grounded Gemini
+agent, and the findings are cached for REPUTATION_TTL seconds.
+
+Research is batched across sessions. A `ReputationBatcher` collects the
+unknown domains that in-flight sessions ask for over a short window. It
+researches them together in one call, each domain once.
+
+A `SourceProfiler` collects domains from each search branch as soon as the
+branch finishes, so profiling overlaps retrieval. At the end, the profiles are
+joined with the formatted sources into `SourceProfilerOutput`.
+"""
+
+import asyncio
+import re
+
+from google.adk.agents import Agent
+from google.adk.tools import google_search
+
+from evaluator_agent.reputation import source_db
+from shared.budget import install_budget_callbacks
+from shared.cancellation import current_scope, install_cancel_callbacks
+from shared.config import env_int
+from shared.keys import normalize_domain
+from shared.one_shot import OneShotAgent
+from shared.schemas import (
+    BIAS_RATINGS,
+    CREDIBILITY_RATINGS,
+    SourceItem,
+    SourceProfile,
+    SourceProfilerOutput,
+)
+from shared.state import parse_json_state
+from shared.store import get_store
+
+# Lower bounds of each credibility rating on the normalized reliability scale.
+CREDIBILITY_THRESHOLDS = [(0.75, "Very High"), (0.6, "High"), (0.45, "Mixed"), (0.3, "Low")]
+# Upper bounds of each bias rating on the Ad Fontes bias scale (-42 to +42).
+BIAS_THRESHOLDS = [(-18, "Left"), (-6, "Leans Left"), (6, "Center"), (18, "Leans Right")]
+COMMON_SUFFIXES = (".com", ".org", ".gov", ".net", ".co.uk")
+
+REPUTATION_TTL = env_int("REPUTATION_TTL", 7 * 24 * 60 * 60)
+# How long to collect unknown domains from concurrent sessions before
+# researching them, and the most domains researched in one model call.
+REPUTATION_BATCH_WINDOW_MS = env_int("REPUTATION_BATCH_WINDOW_MS", 100)
+REPUTATION_BATCH_SIZE = env_int("REPUTATION_BATCH_SIZE", 12)
+DOMAIN_LINE = re.compile(r"^\W*Domain\W*:[\s*_`]*([^\s*`]+)", re.IGNORECASE | re.MULTILINE)
+
+
+def lookup_domain(domain: str) -> str | None:
+    """
+    Returns the dataset domain a domain, subdomain or bare outlet
+    name ("BBC") belongs to, if any.
+    """
+    domain = normalize_domain(domain)
+    if "." not in domain:
+        candidates = [domain + suffix for suffix in COMMON_SUFFIXES]
+    else:
+        labels = domain.split(".")
+        candidates = [".".join(labels[i:]) for i in range(len(labels) - 1)]
+    dataset = source_db.current()
+    return next((c for c in candidates if c in dataset), None)
+
+
+def credibility_rating(score: float) -> str:
+    return next((rating for bound, rating in CREDIBILITY_THRESHOLDS if score >= bound), "Very Low")
+
+
+def bias_rating(bias: float) -> str:
+    return next((rating for bound, rating in BIAS_THRESHOLDS if bias < bound), "Right")
+
+
+def profile_from_db(domain: str) -> dict | None:
+    key = lookup_domain(domain)
+    if key is None:
+        return None
+    dataset = source_db.current()
+    entry = dataset.get(key)
+    return {
+        "domain": key,
+        "credibility_rating": credibility_rating(entry["credibility_score"]),
+        "bias_rating": bias_rating(entry["bias_label"]),
+        "profiler_method": "Database",
+        "dataset_version": dataset.version,
+    }
+
+
+def database_profiles(domains) -> dict:
+    """Profiles domains from the database alone; unknown ones get a neutral profile."""
+    profiles = {}
+    for domain in domains:
+        domain = normalize_domain(domain)
+        profiles[domain] = profile_from_db(domain) or unknown_profile(domain)
+    return profiles
+
+
+def domains_in_results(text: str) -> list[str]:
+    """Returns the domains named in a search branch's "Domain: ..." lines."""
+    return [normalize_domain(d) for d in DOMAIN_LINE.findall(text or "")]
+
+
+REPUTATION_RESEARCH_PROMPT = """
+You are a research assistant. For each news domain you are given, use the google_search tool to research its credibility and political bias (e.g. `"domain" media bias`, `"domain" factual reporting`). Call the tool for all domains at the same time.
+
+Output only a JSON array with one object per domain and nothing else:
+[{"domain": "example.com", "credibility_rating": "Very High" | "High" | "Mixed" | "Low" | "Very Low", "bias_rating": "Left" | "Leans Left" | "Center" | "Leans Right" | "Right" | "N/A"}]
+"""
+
+reputation_research_agent = Agent(
+    name="reputation_research_agent",
+    model="gemini-2.0-flash",
+    instruction=REPUTATION_RESEARCH_PROMPT,
+    tools=[google_search],
+)
+install_cancel_callbacks(reputation_research_agent)
+install_budget_callbacks(reputation_research_agent)
+reputation_researcher = OneShotAgent(reputation_research_agent)
+
+
+def unknown_profile(domain: str) -> dict:
+    return {
+        "domain": domain,
+        "credibility_rating": "Mixed",
+        "bias_rating": "N/A",
+        "profiler_method": "Unknown",
+    }
+
+
+reputations = get_store("reputation")
+
+
+async def research_batch(domains: list[str]) -> dict:
+    """Researches unknown domains in one model call; returns profiles by domain."""
+    profiles = {}
+    text = await reputation_researcher.run("Domains: " + ", ".join(domains))
+    for item in parse_json_state(text, []):
+        if not isinstance(item, dict):
+            continue
+        domain = normalize_domain(str(item.get("domain", "")))
+        if domain in domains:
+            profiles[domain] = {
+                "domain": domain,
+                "credibility_rating": item.get("credibility_rating")
+                if item.get("credibility_rating") in CREDIBILITY_RATINGS
+                else "Mixed",
+                "bias_rating": item.get("bias_rating")
+                if item.get("bias_rating") in BIAS_RATINGS
+                else "N/A",
+                "profiler_method": "Real-Time Research",
+            }
+            reputations.set(domain, profiles[domain], ttl=REPUTATION_TTL)
+    return profiles
+
+
+class ReputationBatcher:
+    """
+    Researches unknown domains for every session in the process together.
+
+    Domains asked for within REPUTATION_BATCH_WINDOW_MS of the first one are
+    collected, deduplicated and researched in one model call per
+    REPUTATION_BATCH_SIZE domains. A domain already waiting for a batch or
+    being researched isn't asked for again; its callers wait on the same
+    result.
+
+    A batch counts against the budget of the run that started it. It isn't
+    cancelled with that run, but once no caller waits on any of its domains.
+    Counts requests, domains, cache hits, shared domains, batches and
+    cancelled batches.
+    """
+
+    def __init__(self, research=research_batch, window: float = REPUTATION_BATCH_WINDOW_MS / 1000,
+                 max_batch: int = REPUTATION_BATCH_SIZE):
+        self.research = research
+        self.window = window
+        self.max_batch = max(max_batch, 1)
+        self._loop = None
+        self._waiting: dict[str, asyncio.Future] = {}
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._waiters: dict[str, int] = {}
+        self._timer = None
+        self._tasks = set()
+        self.counts = {
+            "requests": 0,
+            "domains": 0,
+            "cache_hits": 0,
+            "shared": 0,
+            "batches": 0,
+            "cancelled": 0,
+        }
+
+    def _reset_for_loop(self):
+        # Futures belong to one event loop; start over if a new one is running.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._waiting.clear()
+            self._in_flight.clear()
+            self._waiters.clear()
+            self._timer = None
+            self._tasks.clear()
+
+    async def research_domains(self, domains: list[str]) -> dict:
+        """Returns profiles by domain for those the research found."""
+        self._reset_for_loop()
+        self.counts["requests"] += 1
+        profiles, futures = {}, {}
+        for domain in dict.fromkeys(domains):
+            self.counts["domains"] += 1
+            cached = reputations.get(domain)
+            if cached is not None:
+                self.counts["cache_hits"] += 1
+                profiles[domain] = cached
+                continue
+            future = self._in_flight.get(domain) or self._waiting.get(domain)
+            if future is not None:
+                self.counts["shared"] += 1
+            else:
+                future = self._waiting[domain] = self._loop.create_future()
+            futures[domain] = future
+        if len(self._waiting) >= self.max_batch:
+            self._flush()
+        elif self._waiting and self._timer is None:
+            self._timer = self._loop.call_later(self.window, self._flush)
+
+        for domain in futures:
+            self._waiters[domain] = self._waiters.get(domain, 0) + 1
+        try:
+            for domain, future in futures.items():
+                # Shielded: a caller that gives up doesn't cancel the others' result.
+                profile = await asyncio.shield(future)
+                if profile is not None:
+                    profiles[domain] = profile
+        finally:
+            for domain, future in futures.items():
+                self._release(domain, future)
+        return profiles
+
+    def _release(self, domain: str, future: asyncio.Future):
+        """Drops a caller's wait on a domain; the last one out cancels it."""
+        self._waiters[domain] -= 1
+        if self._waiters[domain]:
+            return
+        del self._waiters[domain]
+        if not future.done():
+            future.cancel()
+            if self._waiting.get(domain) is future:
+                del self._waiting[domain]
+            if self._in_flight.get(domain) is future:
+                del self._in_flight[domain]
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        waiting = list(self._waiting.items())
+        self._waiting.clear()
+        for start in range(0, len(waiting), self.max_batch):
+            batch = dict(waiting[start : start + self.max_batch])
+            self._in_flight.update(batch)
+            task = self._loop.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+            def cancel_when_unwanted(_, batch=batch, task=task):
+                if all(future.cancelled() for future in batch.values()) and not task.done():
+                    self.counts["cancelled"] += 1
+                    task.cancel()
+
+            for future in batch.values():
+                future.add_done_callback(cancel_when_unwanted)
+
+    async def _run_batch(self, batch: dict[str, asyncio.Future]):
+        self.counts["batches"] += 1
+        # Other sessions may wait on this batch too; it is cancelled through
+        # its futures, not with the run whose scope it was started in.
+        current_scope.set(None)
+        try:
+            found = await self.research(list(batch))
+        except Exception:
+            # Callers fall back to an "unknown" profile.
+            found = {}
+        finally:
+            for domain, future in batch.items():
+                if self._in_flight.get(domain) is future:
+                    del self._in_flight[domain]
+        for domain, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(domain))
+
+    def stats(self) -> dict:
+        counts = dict(self.counts)
+        domains = counts["domains"] or 1
+        return {
+            **counts,
+            "cache_hit_rate": round(counts["cache_hits"] / domains, 3),
+            "shared_rate": round(counts["shared"] / domains, 3),
+            "domains_per_batch": round(
+                (counts["domains"] - counts["cache_hits"] - counts["shared"])
+                / (counts["batches"] or 1),
+                2,
+            ),
+        }
+
+
+reputation_batcher = ReputationBatcher()
+
+
+async def research_domains(domains: list[str]) -> dict:
+    """
+    Researches unknown domains, batched with those of other in-flight
+    sessions; returns profiles by domain.
+    """
+    return await reputation_batcher.research_domains(domains)
+
+
+def retrieving_agent_label(retrieving_agent: str) -> str:
+    """Maps a retrieval branch name onto the `SourceProfile` researcher labels."""
+    name = retrieving_agent.lower()
+    if "pos" in name or "support" in name:
+        return "Supporting Researcher"
+    if "neg" in name or "refut" in name:
+        return "Refuting Researcher"
+    return "Contextual Researcher"
+
+
+class SourceProfiler:
+    """Profiles domains as they turn up, deduplicated across branches."""
+
+    def __init__(self):
+        self.profiles = {}
+        self.tasks = []
+
+    def add_domains(self, domains, research: bool = True):
+        """
+        Profiles new domains from the database, and starts researching the
+        unknown ones unless `research` is off, in which case they get a
+        neutral "unknown" profile.
+        """
+        unknown = []
+        for domain in domains:
+            domain = normalize_domain(domain)
+            if not domain or domain in self.profiles:
+                continue
+            profile = profile_from_db(domain)
+            if profile is None and not research:
+                profile = unknown_profile(domain)
+            self.profiles[domain] = profile
+            if profile is None:
+                unknown.append(domain)
+        if unknown:
+            self.tasks.append(asyncio.create_task(self._research(unknown)))
+
+    async def _research(self, domains: list[str]):
+        try:
+            found = await research_domains(domains)
+        except Exception:
+            found = {}
+        for domain in domains:
+            self.profiles[domain] = found.get(domain) or unknown_profile(domain)
+
+    async def finish(self) -> dict:
+        await asyncio.gather(*self.tasks)
+        return self.profiles
+
+    def cancel(self):
+        for task in self.tasks:
+            task.cancel()
+
+
+def build_evidence_packets(sources: list[SourceItem], profiles: dict) -> SourceProfilerOutput:
+    """Joins formatted sources with their domain profiles into `SourceProfilerOutput`."""
+    packets = []
+    for source in sources:
+        domain = normalize_domain(source.domain)
+        profile = profiles.get(domain) or unknown_profile(domain)
+        packets.append(
+            SourceProfile(
+                source_url=source.domain,
+                retrieved_quote=source.retrieved_quote,
+                retrieving_agent=retrieving_agent_label(source.retrieving_agent),
+                credibility_rating=profile["credibility_rating"],
+                bias_rating=profile["bias_rating"],
+                claims=list(source.claims),
+            )
+        )
+    return SourceProfilerOutput(packets)
@@ -0,0 +1,256 @@
+"""
+The source reputation dataset: bias and credibility scores by domain.
+
+The data ships as a compact, versioned binary file that is memory-mapped and
+searched in place, so startup time and memory stay flat however many domains
+it holds. The layout (all integers and floats little-endian):
+
+    header       magic, entry count, metadata length, domain blob length
+    metadata     JSON: version, source, built_at
+    offsets      uint32 x (count + 1), where each domain starts in the blob
+    bias         float64 x count (negative = left, positive = right)
+    credibility  float64 x count (0.0 to 1.0)
+    domains      the domains, UTF-8, sorted, concatenated
+
+`sources.csv` next to the binary file is the editable source of record.
+Rebuild the binary file after changing it:
+
+    python -m evaluator_agent.reputation build evaluator_agent/data/sources.csv \\
+        evaluator_agent/data/sources.rep --version 2024.2
+
+`write_dataset` replaces the file atomically, and running servers pick up the
+new file on their next lookup (checked at most every RELOAD_CHECK_SECONDS).
+Deploy new files the same way, by renaming over the old one; a file rewritten
+in place would change under the servers' mappings.
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from shared.config import env_float
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SOURCE_DATASET = os.environ.get("SOURCE_DATASET", os.path.join(DATA_DIR, "sources.rep"))
+RELOAD_CHECK_SECONDS = env_float("RELOAD_CHECK_SECONDS", 1.0)
+
+MAGIC = b"SRCREP01"
+HEADER = struct.Struct("<8sIII")
+OFFSET = struct.Struct("<I")
+SCORE = struct.Struct("<d")
+
+
+def _align(position: int) -> int:
+    return (position + 7) // 8 * 8
+
+
+class ReputationDataset:
+    """A read-only, memory-mapped dataset file, searched without loading it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is truncated.")
+        magic, self.count, meta_length, blob_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a source reputation dataset.")
+        position = HEADER.size
+        self.metadata = json.loads(self._map[position : position + meta_length])
+        position = _align(position + meta_length)
+        self._offsets = position
+        self._bias = _align(self._offsets + OFFSET.size * (self.count + 1))
+        self._credibility = self._bias + SCORE.size * self.count
+        self._domains = self._credibility + SCORE.size * self.count
+        if self._domains + blob_length > len(self._map):
+            raise ValueError(f"{path} is truncated.")
+
+    @property
+    def version(self) -> str:
+        return self.metadata.get("version", "unknown")
+
+    def __len__(self):
+        return self.count
+
+    def _domain(self, index: int) -> bytes:
+        (start,) = OFFSET.unpack_from(self._map, self._offsets + OFFSET.size * index)
+        (end,) = OFFSET.unpack_from(self._map, self._offsets + OFFSET.size * (index + 1))
+        return self._map[self._domains + start : self._domains + end]
+
+    def _index(self, domain: str) -> int | None:
+        key = domain.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._domain(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._domain(low) == key:
+            return low
+        return None
+
+    def __contains__(self, domain: str) -> bool:
+        return self._index(domain) is not None
+
+    def get(self, domain: str) -> dict | None:
+        """Returns `{"bias_label", "credibility_score"}` for a domain, if listed."""
+        index = self._index(domain)
+        if index is None:
+            return None
+        (bias,) = SCORE.unpack_from(self._map, self._bias + SCORE.size * index)
+        (credibility,) = SCORE.unpack_from(self._map, self._credibility + SCORE.size * index)
+        return {"bias_label": bias, "credibility_score": credibility}
+
+    def items(self):
+        for index in range(self.count):
+            domain = self._domain(index).decode("utf-8")
+            yield domain, self.get(domain)
+
+
+class ReloadingDataset:
+    """
+    The current `ReputationDataset` for a path, reopened when the file changes.
+
+    Lookups in progress keep the dataset they started with; the swap to a new
+    file is a single reference assignment.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dataset = None
+        self._stat = None
+        self._checked_at = 0.0
+
+    def _file_stat(self):
+        stat = os.stat(self.path)
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def current(self) -> ReputationDataset:
+        if self._dataset is None:
+            with self._lock:
+                if self._dataset is None:
+                    self._stat = self._file_stat()
+                    self._dataset = ReputationDataset(self.path)
+                    self._checked_at = time.monotonic()
+        elif time.monotonic() - self._checked_at >= RELOAD_CHECK_SECONDS:
+            self._maybe_reload()
+        return self._dataset
+
+    def _maybe_reload(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = self._file_stat()
+                if stat != self._stat:
+                    self._dataset = ReputationDataset(self.path)
+                    self._stat = stat
+            except (OSError, ValueError, struct.error):
+                # Keep serving the last good dataset.
+                pass
+
+    def __contains__(self, domain: str) -> bool:
+        return domain in self.current()
+
+    def get(self, domain: str) -> dict | None:
+        return self.current().get(domain)
+
+    def provenance(self) -> dict:
+        """Describes the dataset in use, for inclusion in results."""
+        dataset = self.current()
+        return {
+            "version": dataset.version,
+            "source": dataset.metadata.get("source", ""),
+            "built_at": dataset.metadata.get("built_at", ""),
+            "domains": len(dataset),
+        }
+
+
+def write_dataset(path: str, entries: dict, version: str, source: str = ""):
+    """Writes `{domain: {"bias_label", "credibility_score"}}` to `path` atomically."""
+    domains = sorted(entries, key=lambda domain: domain.encode("utf-8"))
+    encoded = [domain.encode("utf-8") for domain in domains]
+    metadata = json.dumps(
+        {
+            "version": version,
+            "source": source,
+            "built_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        }
+    ).encode("utf-8")
+    blob = b"".join(encoded)
+
+    out = bytearray(HEADER.pack(MAGIC, len(domains), len(metadata), len(blob)))
+    out += metadata
+    out += b"\0" * (_align(len(out)) - len(out))
+    position = 0
+    for domain in [b""] + encoded:
+        position += len(domain)
+        out += OFFSET.pack(position)
+    out += b"\0" * (_align(len(out)) - len(out))
+    for domain in domains:
+        out += SCORE.pack(float(entries[domain]["bias_label"]))
+    for domain in domains:
+        out += SCORE.pack(float(entries[domain]["credibility_score"]))
+    out += blob
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".sources-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(out)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_csv(path: str) -> dict:
+    """Reads `domain,bias_label,credibility_score` rows into dataset entries."""
+    entries = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            domain = row["domain"].strip().lower()
+            if domain:
+                entries[domain] = {
+                    "bias_label": float(row["bias_label"]),
+                    "credibility_score": float(row["credibility_score"]),
+                }
+    return entries
+
+
+source_db = ReloadingDataset(SOURCE_DATASET)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds the source reputation dataset.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile a CSV file into a dataset file")
+    build.add_argument("csv_path")
+    build.add_argument("dataset_path")
+    build.add_argument("--version", required=True)
+    build.add_argument("--source", default="")
+    show = commands.add_parser("show", help="print a dataset file's metadata")
+    show.add_argument("dataset_path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        entries = read_csv(args.csv_path)
+        write_dataset(args.dataset_path, entries, args.version, args.source)
+        print(f"Wrote {len(entries)} domains to {args.dataset_path} (version {args.version}).")
+    else:
+        dataset = ReputationDataset(args.dataset_path)
+        print(json.dumps({**dataset.metadata, "domains": len(dataset)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
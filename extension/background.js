@@ -2,12 +2,8 @@
 
 // --- Configuration ---
 const HOST = 'http://localhost:8000';
-// const AGENT_NAME = 'extractor_agent';
-const AGENT_NAME = 'master_agent';
-const USER_ID = 'user_123';
-
-// Session ID will be stored here. A more robust solution would use chrome.storage.
-let sessionId = null;
+const POLL_INTERVAL_MS = 1500;
+const MAX_REMEMBERED_RESULTS = 20;
 // --- End Configuration ---
 
 chrome.runtime.onInstalled.addListener(() => {
@@ -45,93 +41,142 @@ chrome.action.onClicked.addListener(async (tab) => {
 	}
 });
 
+// Analyses in progress, by tab: { controller, jobId }
+const activeAnalyses = new Map();
+
 // Handle messages from the content script
 chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
 	if (message.type === 'ANALYZE_PAGE') {
 		console.log(`Received ANALYZE_PAGE dispatch req for URL: ${message.url}`);
-		analyzePage(message.url)
+		analyzePage(message.url, message.page, sender.tab?.id)
 			.then((results) => {
 				sendResponse({ success: true, data: results });
 			})
 			.catch((error) => {
+				if (error.name === 'AbortError') {
+					sendResponse({ success: false, cancelled: true });
+					return;
+				}
 				console.error('API call failed:', error);
 				sendResponse({ success: false, error: error.message });
 			});
 		return true; // Indicates that the response is sent asynchronously
 	}
+	if (message.type === 'CANCEL_ANALYSIS') {
+		cancelAnalysis(sender.tab?.id);
+	}
 });
 
-// Generates a simple unique ID
-function generateUUID() {
-	return (
-		'ext-' + Date.now() + '-' + Math.random().toString(36).substring(2, 15)
-	);
-}
+// Nobody will read the result once the tab is closed or navigates away.
+chrome.tabs.onRemoved.addListener((tabId) => cancelAnalysis(tabId));
+chrome.tabs.onUpdated.addListener((tabId, changeInfo) => {
+	if (changeInfo.url) cancelAnalysis(tabId);
+});
 
-async function analyzePage(url) {
-	// 1. Ensure a session exists
-	if (!sessionId) {
-		sessionId = generateUUID();
-		const sessionUrl = `${HOST}/apps/${AGENT_NAME}/users/${USER_ID}/sessions/${sessionId}`;
-		console.log(`Creating new session: ${sessionId}`);
+// Stops polling for a tab's analysis and withdraws its job on the server.
+// The server cancels the job once no other request is waiting for it.
+function cancelAnalysis(tabId) {
+	const analysis = activeAnalyses.get(tabId);
+	if (!analysis) return;
+	activeAnalyses.delete(tabId);
+	analysis.controller.abort();
+	if (analysis.jobId) {
+		fetch(`${HOST}/jobs/${analysis.jobId}`, {
+			method: 'DELETE',
+			keepalive: true,
+		}).catch((error) => console.warn('Job cancellation failed:', error));
+	}
+}
 
-		const sessionResponse = await fetch(sessionUrl, {
-			method: 'POST',
-			headers: { 'Content-Type': 'application/json' },
+const sleep = (ms, signal) =>
+	new Promise((resolve, reject) => {
+		const timer = setTimeout(resolve, ms);
+		signal?.addEventListener('abort', () => {
+			clearTimeout(timer);
+			reject(new DOMException('Analysis cancelled', 'AbortError'));
 		});
+	});
 
-		if (!sessionResponse.ok) {
-			// If session exists, server might return an error. We can ignore it
-			// unless it's a server error.
-			if (sessionResponse.status !== 400) {
-				const errorText = await sessionResponse.text();
-				throw new Error(
-					`Session creation failed with status ${sessionResponse.status}: ${errorText}`
-				);
-			}
-			console.log('Session likely already exists, proceeding.');
-		}
+async function analyzePage(url, page, tabId) {
+	// Replaces any analysis still running in the same tab.
+	cancelAnalysis(tabId);
+	const analysis = { controller: new AbortController(), jobId: null };
+	activeAnalyses.set(tabId, analysis);
+	const { signal } = analysis.controller;
+
+	try {
+		return await runAnalysis(url, page, analysis, signal);
+	} finally {
+		if (activeAnalyses.get(tabId) === analysis) activeAnalyses.delete(tabId);
 	}
+}
 
-	// 2. Run the Agent
-	const runUrl = `${HOST}/run`;
-	const runData = {
-		app_name: AGENT_NAME,
-		user_id: USER_ID,
-		session_id: sessionId,
-		new_message: {
-			role: 'user',
-			parts: [
-				{
-					text: `${url}`,
-				},
-			],
-		},
-	};
-
-	console.log('Sending prompt to agent...');
-	const runResponse = await fetch(runUrl, {
+async function runAnalysis(url, page, analysis, signal) {
+	// 1. Submit an analysis job. The page content captured by the content
+	// script is sent along, so the server can skip downloading the page.
+	// Identical requests from other users join the same job on the server.
+	console.log('Submitting analysis job...');
+	const submitResponse = await fetch(`${HOST}/jobs`, {
 		method: 'POST',
-		headers: {
-			'Content-Type': 'application/json',
-		},
-		body: JSON.stringify(runData),
+		headers: { 'Content-Type': 'application/json' },
+		body: JSON.stringify({
+			url,
+			text: page?.text || null,
+			image_urls: page?.image_urls || [],
+		}),
+		signal,
 	});
 
-	if (!runResponse.ok) {
-		const errorText = await runResponse.text();
+	if (!submitResponse.ok) {
+		const errorText = await submitResponse.text();
 		throw new Error(
-			`API request failed with status ${runResponse.status}: ${errorText}`
+			`Job submission failed with status ${submitResponse.status}: ${errorText}`
 		);
 	}
 
-	const events = await runResponse.json();
+	const job = await submitResponse.json();
+	analysis.jobId = job.job_id;
+	console.log(`Job ${job.job_id} is ${job.status}`);
+
+	// 2. Poll the job's result-only view until it's done. It answers 202
+	// while the job runs, then the result alone, gzipped. A result identical to
+	// the one kept from the last analysis of this page comes back as an empty
+	// 304. The server cancels jobs that stop being polled, so an abandoned
+	// analysis doesn't run to the end.
+	const previous = lastResults.get(url);
+	while (true) {
+		await sleep(POLL_INTERVAL_MS, signal);
+		const pollResponse = await fetch(`${HOST}/jobs/${job.job_id}/result`, {
+			headers: previous ? { 'If-None-Match': previous.etag } : {},
+			cache: 'no-store',
+			signal,
+		});
+		if (pollResponse.status === 202) continue;
+		if (pollResponse.status === 304) return previous.result;
+
+		const body = await pollResponse.json().catch(() => ({}));
+		if (pollResponse.status === 409) throw new Error('The analysis was cancelled.');
+		if (!pollResponse.ok) {
+			throw new Error(
+				body.error ||
+					body.detail ||
+					`Job result request failed with status ${pollResponse.status}`
+			);
+		}
+		// 3. Keep the result for the next analysis of the page
+		const etag = pollResponse.headers.get('ETag');
+		if (etag) rememberResult(url, etag, body);
+		return body;
+	}
+}
+
+// The last result for each page, with its ETag, most recent last.
+const lastResults = new Map();
 
-	// 3. Process the final result
-	if (Array.isArray(events) && events.length > 0) {
-		const finalEvent = events[events.length - 1];
-		return finalEvent.content;
-	} else {
-		throw new Error('Received an empty or invalid response from the agent.');
+function rememberResult(url, etag, result) {
+	lastResults.delete(url);
+	lastResults.set(url, { etag, result });
+	if (lastResults.size > MAX_REMEMBERED_RESULTS) {
+		lastResults.delete(lastResults.keys().next().value);
 	}
 }
@@ -1,5 +1,10 @@
 // contentScript.js - Expandable overlay widget
 
+// Limits on the page content sent along with an analysis request. The server
+// enforces its own limits as well.
+const MAX_PAGE_TEXT_CHARS = 100000;
+const MAX_PAGE_IMAGES = 10;
+
 class FactCheckerWidget {
 	constructor() {
 		this.isExpanded = false;
@@ -67,7 +72,13 @@ class FactCheckerWidget {
 
 		// Close button
 		const closeBtn = this.widget.querySelector('#widget-close');
-		closeBtn.addEventListener('click', () => this.minimize());
+		closeBtn.addEventListener('click', () => {
+			this.minimize();
+			this.cancelAnalysis();
+		});
+
+		// Leaving the page abandons its analysis
+		window.addEventListener('pagehide', () => this.cancelAnalysis());
 
 		// Analyze button
 		const analyzeBtn = this.widget.querySelector('#widget-analyze-btn');
@@ -92,6 +103,12 @@ class FactCheckerWidget {
 		this.widget.querySelector('#widget-expanded').style.display = 'none';
 	}
 
+	// Tells the background worker to stop the analysis in progress, if any.
+	cancelAnalysis() {
+		if (!this.isAnalyzing) return;
+		chrome.runtime.sendMessage({ type: 'CANCEL_ANALYSIS' }).catch(() => {});
+	}
+
 	async analyzeCurrentPage() {
 		if (this.isAnalyzing) return;
 
@@ -111,17 +128,16 @@ class FactCheckerWidget {
 			const response = await chrome.runtime.sendMessage({
 				type: 'ANALYZE_PAGE',
 				url: window.location.href,
+				page: this.capturePageContent(),
 			});
 
 			console.log('Analysis response:', response);
-			const textResponse = response.data.parts[0]?.text || '';
-			const data = JSON.parse(textResponse);
-
-			console.log('Parsed analysis data:', data);
 
 			if (response.success) {
-				this.renderResults(data);
+				this.renderResults(response.data);
 				status.textContent = 'Analysis complete';
+			} else if (response.cancelled) {
+				status.textContent = 'Analysis cancelled';
 			} else throw new Error(response.error || 'Unknown error');
 		} catch (error) {
 			console.error('Analysis failed:', error);
@@ -135,6 +151,30 @@ class FactCheckerWidget {
 		}
 	}
 
+	// Captures the visible article text and its main images so the server
+	// doesn't have to download the page again.
+	capturePageContent() {
+		const root =
+			document.querySelector('article') ||
+			document.querySelector('main') ||
+			document.body;
+
+		let text = root.innerText || '';
+		if (root.contains(this.widget)) {
+			text = text.replace(this.widget.innerText, '');
+		}
+
+		const imageUrls = Array.from(root.querySelectorAll('img'))
+			.filter((img) => img.naturalWidth >= 200 && img.naturalHeight >= 150)
+			.map((img) => img.currentSrc || img.src)
+			.filter((src) => src.startsWith('http'));
+
+		return {
+			text: text.trim().slice(0, MAX_PAGE_TEXT_CHARS),
+			image_urls: [...new Set(imageUrls)].slice(0, MAX_PAGE_IMAGES),
+		};
+	}
+
 	async simulateAnalysis() {
 		// Simulate API delay
 		await new Promise((resolve) => setTimeout(resolve, 2000));
@@ -163,9 +203,65 @@ class FactCheckerWidget {
 		};
 	}
 
+	// Maps the page's visible text, with whitespace collapsed and lowercased,
+	// back to the text nodes it came from, so spans of it can be highlighted.
+	buildPageText() {
+		const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, {
+			acceptNode: (node) =>
+				this.widget.contains(node) ||
+				['SCRIPT', 'STYLE', 'NOSCRIPT'].includes(node.parentElement?.tagName)
+					? NodeFilter.FILTER_REJECT
+					: NodeFilter.FILTER_ACCEPT,
+		});
+		const chars = [];
+		const positions = []; // [node, offset] of each character in `chars`
+		let lastWasSpace = true;
+		for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+			const value = node.nodeValue;
+			for (let i = 0; i < value.length; i++) {
+				const isSpace = /\s/.test(value[i]);
+				if (isSpace && lastWasSpace) continue;
+				chars.push(isSpace ? ' ' : value[i].toLowerCase());
+				positions.push([node, i]);
+				lastWasSpace = isSpace;
+			}
+		}
+		return { text: chars.join(''), positions };
+	}
+
+	// Returns a Range over the first occurrence of `quote` in the page.
+	findRange(pageText, quote) {
+		const target = quote.replace(/\s+/g, ' ').trim().toLowerCase();
+		const start = target ? pageText.text.indexOf(target) : -1;
+		if (start < 0) return null;
+		const [startNode, startOffset] = pageText.positions[start];
+		const [endNode, endOffset] = pageText.positions[start + target.length - 1];
+		const range = document.createRange();
+		range.setStart(startNode, startOffset);
+		range.setEnd(endNode, endOffset + 1);
+		return range;
+	}
+
+	// Highlights the text each claim was taken from (the server's `spans`)
+	// without changing the page's DOM, and returns the ranges by claim.
+	highlightClaims(claims) {
+		if (!window.CSS?.highlights) return [];
+		const pageText = this.buildPageText();
+		const highlight = new Highlight();
+		const ranges = claims.map((claim) =>
+			(claim.spans || [])
+				.map((span) => this.findRange(pageText, span.text))
+				.filter(Boolean)
+		);
+		ranges.flat().forEach((range) => highlight.add(range));
+		CSS.highlights.set('fact-check-claim', highlight);
+		return ranges;
+	}
+
 	renderResults(data) {
 		const results = this.widget.querySelector('#widget-results');
 		results.innerHTML = '';
+		window.CSS?.highlights?.delete('fact-check-claim');
 
 		if (!data || !data.claims || data.claims.length === 0) {
 			results.innerHTML = `
@@ -177,6 +273,8 @@ class FactCheckerWidget {
 			return;
 		}
 
+		const claimRanges = this.highlightClaims(data.claims);
+
 		data.claims.forEach((claim, index) => {
 			const claimCard = document.createElement('div');
 			let confidencePercentage = parseFloat(claim.confidence) * 100;
@@ -218,6 +316,18 @@ class FactCheckerWidget {
                 </div>
             `;
 
+			// Clicking a claim scrolls to where it appears on the page.
+			const range = claimRanges[index]?.[0];
+			if (range) {
+				claimCard.classList.add('claim-located');
+				claimCard.querySelector('.claim-title').addEventListener('click', () =>
+					range.startContainer.parentElement?.scrollIntoView({
+						behavior: 'smooth',
+						block: 'center',
+					})
+				);
+			}
+
 			results.appendChild(claimCard);
 		});
 	}
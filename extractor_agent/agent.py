@@ -7,17 +7,21 @@ from google.genai import types
 
 from pydantic import BaseModel, Field
 import sys
-import re
 
 sys.path.append("../")
 from extractor_agent.prompt import MULTIMODAL_AGENT_PROMPT
-from extractor_agent.article_reader import article_read_tool
+from extractor_agent.client_content import finish_server_fetch, use_client_content
+from extractor_agent.incremental import skip_redundant_extraction
+from extractor_agent.router import FetchRouterAgent
 from fact_checker_agent.agent import root_agent as fact_checker_agent
+from shared.deadlines import (
+    EXTRACTION_DEADLINE_SECONDS,
+    FETCH_DEADLINE_SECONDS,
+    DeadlineAgent,
+)
 from retrieval_agent.agent import root_agent as retrieval_agent
 
 import dotenv
-import tweepy
-import os
 
 dotenv.load_dotenv()
 
@@ -30,61 +34,11 @@ class ExtractedClaims(BaseModel):
     )
 
 
-def x_post_fetcher_tool(url: str):
-    # We use this as a simple tool, not multimodal, for the SequentialAgent to pass text
-    match = re.search(r"status/(\d+)", url)
-    post_id = None
-    if match:
-        post_id = match.group(1)
-    else:
-        raise ValueError("Invalid X URL provided.")
-
-    bearer_token = os.environ.get("X_BEARER_TOKEN")
-    if not bearer_token:
-        raise EnvironmentError("X_BEARER_TOKEN not found in environment variables.")
-
-    client = tweepy.Client(bearer_token)
-    post_data = {}
-    try:
-        response = client.get_tweet(
-            id=post_id,
-            tweet_fields=["text"],
-            expansions=["attachments.media_keys"],
-            media_fields=["url"],
-        )
-
-        post_data = {"text": None, "media_urls": []}
-
-        if response.data:
-            post_data["text"] = response.data["text"]
-
-        if "media" in response.includes:
-            for media in response.includes["media"]:
-                if "url" in media:
-                    post_data["media_urls"].append(media["url"])
-
-    except Exception as e:
-        return {"status": "error", "error": f"An error occurred: {e}"}
-
-    if "error" in post_data:
-        return {
-            "status": "error",
-        }
-
-    content_parts = []
-    return {
-        "status": "success",
-        "content": post_data,
-    }
-
-
-fetcher_agent = Agent(
-    model="gemini-2.0-flash",
+fetcher_agent = FetchRouterAgent(
     name="FetcherAgent",
-    description="An agent that fetches content from a URL, using the appropriate tool for a news article or social media post.",
-    instruction=" If the URL is from X (formerly Twitter), use the `x_post_fetcher` tool. If the URL is from an authoritative source (news agent, governmental agencies), use the `article_reader` tool. Do not make any assumptions about the content of the URL; always use the tools provided.\n\nOutput only the fetched content verbatim, without any additional commentary or explanation.",
-    tools=[article_read_tool, x_post_fetcher_tool],
-    output_key="fetched_content",  # Saves the raw text here
+    description="Fetches content from a URL, using the appropriate backend for a news article or social media post.",
+    before_agent_callback=use_client_content,
+    after_agent_callback=finish_server_fetch,
 )
 
 multimodal_reasoning_agent = Agent(
@@ -94,13 +48,29 @@ multimodal_reasoning_agent = Agent(
     instruction=MULTIMODAL_AGENT_PROMPT + "Extract claims from {fetched_content}.",
     output_schema=ExtractedClaims,
     output_key="claims",
+    before_agent_callback=skip_redundant_extraction,
 )
 
 root_agent = SequentialAgent(
     name="RootAgent",
     sub_agents=[
-        fetcher_agent,
-        multimodal_reasoning_agent,
+        DeadlineAgent(
+            name="FetcherDeadline",
+            agent=fetcher_agent,
+            stage="fetch",
+            seconds=FETCH_DEADLINE_SECONDS,
+            fallback_state={
+                "fetch_error": f"timed out after {FETCH_DEADLINE_SECONDS:g}s",
+                "fetched_content": "",
+            },
+        ),
+        DeadlineAgent(
+            name="ExtractionDeadline",
+            agent=multimodal_reasoning_agent,
+            stage="extraction",
+            seconds=EXTRACTION_DEADLINE_SECONDS,
+            fallback_state={"claims": {"claims": []}},
+        ),
     ],
     # output_schema=ExtractedClaims,
 )
@@ -0,0 +1,168 @@
+"""
+Alignment of extracted claims with the page text they were taken from.
+
+Claims are usually lightly reworded sentences of the article, so each one is
+aligned with the text word by word:
+
+1. The text's words are indexed once by position, with their character
+   offsets.
+2. A claim's word trigrams (looked up through their rarest word) and its
+   words that are rare in the text, for claims reworded too much to share a
+   trigram, vote for the diagonal (text position minus claim position) they
+   fall on; the best-supported diagonals are the candidate locations.
+3. Around each candidate, a banded edit distance over words (within
+   ALIGNMENT_BAND of the diagonal, free start and end in the text) finds the
+   stretch of text that matches the claim best.
+
+Alignments scoring at least MIN_ALIGNMENT_SCORE become the claim's `spans`:
+character offsets into the text plus the matched text, which the extension
+highlights on the page. Indexing is linear in the text length and each claim
+costs about claim words x band per candidate, so even long articles align in
+a few milliseconds.
+"""
+
+import re
+from collections import Counter, defaultdict
+
+WORD = re.compile(r"\w+")
+NGRAM = 3
+# Words of drift allowed either side of a candidate diagonal.
+ALIGNMENT_BAND = 8
+# Share of the claim's words that must line up (1 - edit distance / claim words).
+MIN_ALIGNMENT_SCORE = 0.5
+# Other spans are kept if they score within this much of the best one.
+SPAN_SCORE_MARGIN = 0.1
+MAX_CANDIDATES = 3
+# Single words that occur more often than this don't vote for a location.
+MAX_WORD_OCCURRENCES = 20
+# Words sharing a prefix this long count as half a match ("rise", "rises").
+STEM_CHARS = 4
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+
+
+def _substitution_cost(a: str, b: str) -> float:
+    if a == b:
+        return 0.0
+    if len(a) >= STEM_CHARS and a[:STEM_CHARS] == b[:STEM_CHARS]:
+        return 0.5
+    return 1.0
+
+
+class TextIndex:
+    """The words of a text, with their character offsets, indexed for alignment."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.words = [word.lower() for word in WORD.findall(text)]
+        self.offsets = [match.span() for match in WORD.finditer(text)]
+        self.positions = defaultdict(list)
+        for position, word in enumerate(self.words):
+            self.positions[word].append(position)
+
+    def _ngram_positions(self, ngram: tuple) -> list[int]:
+        """Positions of `ngram` in the text, found through its rarest word."""
+        rarest = min(range(NGRAM), key=lambda i: len(self.positions.get(ngram[i], ())))
+        found = []
+        for position in self.positions.get(ngram[rarest], ()):
+            start = position - rarest
+            if start >= 0 and tuple(self.words[start : start + NGRAM]) == ngram:
+                found.append(start)
+        return found
+
+    def _candidates(self, words: list[str]) -> list[int]:
+        """Returns the most-voted diagonals, bucketed by ALIGNMENT_BAND."""
+        votes = Counter()
+        for i in range(len(words) - NGRAM + 1):
+            ngram = tuple(words[i : i + NGRAM])
+            if all(word in STOPWORDS for word in ngram):
+                continue
+            for position in self._ngram_positions(ngram):
+                votes[(position - i) // ALIGNMENT_BAND] += NGRAM
+        for i, word in enumerate(words):
+            positions = self.positions.get(word, ())
+            if word not in STOPWORDS and len(positions) <= MAX_WORD_OCCURRENCES:
+                for position in positions:
+                    votes[(position - i) // ALIGNMENT_BAND] += 1
+        ranked = votes.most_common(MAX_CANDIDATES)
+        # Weakly supported locations are rarely the claim's source.
+        return [
+            bucket * ALIGNMENT_BAND + ALIGNMENT_BAND // 2
+            for bucket, count in ranked
+            if count * 2 >= ranked[0][1]
+        ]
+
+    def _align_at(self, words: list[str], diagonal: int) -> tuple[float, int, int]:
+        """
+        Banded edit distance of `words` against the text around `diagonal`,
+        with free start and end in the text. Returns (distance, first word,
+        end word) of the best alignment.
+        """
+        n, band = len(self.words), ALIGNMENT_BAND
+        width = 2 * band + 1
+        inf = float("inf")
+        # Row i, slot k holds text position j = diagonal + i + k - band.
+        distance = [0.0 if 0 <= diagonal + k - band <= n else inf for k in range(width)]
+        start = [diagonal + k - band for k in range(width)]
+        for i in range(1, len(words) + 1):
+            word = words[i - 1]
+            row, row_start = [inf] * width, [0] * width
+            for k in range(width):
+                j = diagonal + i + k - band
+                if j < 0 or j > n:
+                    continue
+                # Claim word left out of the text: same j, one slot over in the row above.
+                best = distance[k + 1] + 1 if k + 1 < width else inf
+                best_start = start[k + 1] if k + 1 < width else 0
+                if j > 0:
+                    # Claim word matched or substituted against text word j - 1.
+                    cost = distance[k] + _substitution_cost(word, self.words[j - 1])
+                    if cost < best:
+                        best, best_start = cost, start[k]
+                    # Extra text word j - 1: previous slot in this row.
+                    if k > 0 and row[k - 1] + 1 < best:
+                        best, best_start = row[k - 1] + 1, row_start[k - 1]
+                row[k], row_start[k] = best, best_start
+            distance, start = row, row_start
+        k = min(range(width), key=distance.__getitem__)
+        return distance[k], start[k], diagonal + len(words) + k - band
+
+    def align(self, claim: str) -> list[dict]:
+        """Returns the spans of the text that `claim` matches, in text order."""
+        words = [word.lower() for word in WORD.findall(claim)]
+        if not words or not self.words:
+            return []
+        found = []
+        for diagonal in self._candidates(words):
+            distance, first, end = self._align_at(words, diagonal)
+            score = 1 - distance / len(words)
+            if score >= MIN_ALIGNMENT_SCORE and end > first:
+                found.append((score, first, end))
+        if not found:
+            return []
+        best = max(score for score, _, _ in found)
+        spans, taken = [], []
+        for score, first, end in sorted(found, reverse=True):
+            if score < best - SPAN_SCORE_MARGIN:
+                break
+            if any(first < other_end and other_first < end for other_first, other_end in taken):
+                continue
+            taken.append((first, end))
+            char_start, char_end = self.offsets[first][0], self.offsets[end - 1][1]
+            spans.append(
+                {
+                    "start": char_start,
+                    "end": char_end,
+                    "text": self.text[char_start:char_end],
+                    "score": round(score, 2),
+                }
+            )
+        return sorted(spans, key=lambda span: span["start"])
+
+
+def add_claim_spans(claims: list[dict], text: str) -> list[dict]:
+    """Returns the `ClaimsOutput` claims with the `spans` of `text` they came from."""
+    index = TextIndex(text or "")
+    return [{**claim, "spans": index.align(claim.get("claim_text", ""))} for claim in claims]
@@ -1,8 +1,4 @@
-from newspaper import Article, Config
-
-user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36"
-config = Config()
-config.browser_user_agent = user_agent
+from extractor_agent.extraction import read_article
 
 
 def article_read_tool(url: str):
@@ -10,11 +6,18 @@ def article_read_tool(url: str):
     Params:
     url : str The URL of the article to extract. Must be a valid, reachable HTTP/HTTPS URL.
 
-    Extract and parse an article from a URL. Returns a dictionary with the article summary and full text.
+    Extract and parse an article from a URL. Returns a dictionary with the article summary,
+    full text and metadata (title, published date, authors, canonical URL and lead image).
     """
 
-    article = Article(url, config=config)
-    article.download()
-    article.parse()
+    article = read_article(url)
 
-    return {"article_summary": article.summary, "article_full_text": article.text}
+    return {
+        "article_summary": article["summary"],
+        "article_full_text": article["text"],
+        "title": article["title"],
+        "published_date": article["published_date"],
+        "authors": article["authors"],
+        "canonical_url": article["canonical_url"],
+        "image_url": article["image_url"],
+    }
@@ -0,0 +1,78 @@
+"""
+Page content supplied by the browser extension.
+
+The extension captures the visible article text and image URLs of the page the
+user has open and sends them along with the URL. They reach the pipeline in
+the session's initial state under `client_content`, set either by the job API
+in `server.py` or by any client creating its own session. When it's present
+the fetcher is skipped entirely: there is no download and no tool-selection
+model call, and the text goes straight to claim extraction as
+`fetched_content`.
+"""
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from extractor_agent.incremental import prepare_incremental_extraction
+from shared.blobs import resolve
+from shared.config import env_int
+from shared.keys import canonical_url, content_hash
+from shared.state import extract_url
+
+MAX_CLIENT_TEXT_CHARS = env_int("MAX_CLIENT_TEXT_CHARS", 100_000)
+MAX_CLIENT_IMAGES = env_int("MAX_CLIENT_IMAGES", 10)
+
+
+def format_client_content(client_content: dict) -> str:
+    """Returns the client-supplied text, truncated, with image URLs appended."""
+    text = (client_content.get("text") or "").strip()[:MAX_CLIENT_TEXT_CHARS]
+    image_urls = [
+        url
+        for url in client_content.get("image_urls") or []
+        if isinstance(url, str) and url.startswith(("http://", "https://"))
+    ][:MAX_CLIENT_IMAGES]
+    if image_urls:
+        text += "\n\nImages on the page:\n" + "\n".join(image_urls)
+    return text
+
+
+def use_client_content(callback_context: CallbackContext):
+    """
+    Runs before the fetcher. Feeds client-supplied page content into
+    `fetched_content` and skips the fetcher, or does nothing if the client
+    only sent a URL.
+    """
+    state = callback_context.state
+    client_content = state.get("client_content")
+    if not isinstance(client_content, dict) or not client_content.get("text"):
+        return None
+    # Content captured for one page must not be reused for another URL later
+    # in the same session.
+    requested_url = extract_url(callback_context.user_content)
+    client_url = client_content.get("url") or requested_url
+    if requested_url and canonical_url(requested_url) != canonical_url(client_url):
+        return None
+
+    state["fetched_content"] = format_client_content(client_content)
+    state["source_url"] = client_url
+    state["source_kind"] = "client"
+    state["article_metadata"] = {}
+    state["fetch_error"] = None
+    finish_fetch(callback_context)
+    return types.Content(
+        role="model",
+        parts=[types.Part(text="Using the page content supplied by the client.")],
+    )
+
+
+def finish_server_fetch(callback_context: CallbackContext):
+    """Runs after the fetcher has downloaded the page itself."""
+    callback_context.state["source_url"] = extract_url(callback_context.user_content)
+    return finish_fetch(callback_context)
+
+
+def finish_fetch(callback_context: CallbackContext):
+    """Records the content hash and plans an incremental re-check, if enabled."""
+    state = callback_context.state
+    state["content_hash"] = content_hash(resolve(state.get("fetched_content")) or "")
+    return prepare_incremental_extraction(callback_context)
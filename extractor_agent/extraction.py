@@ -0,0 +1,537 @@
+"""
+Article extraction from HTML, built on lxml.
+
+Replaces newspaper3k, which was slow to import and parse and never produced a
+summary. `extract_article` returns:
+
+- `text`: the main article text, found readability-style. Paragraphs are scored
+  by length and commas, the scores are credited to their parent and
+  grandparent, and the best-scoring container, discounted by its link
+  density, is kept with any siblings that score well too. Navigation,
+  comments, share bars and similar boilerplate are dropped first.
+- metadata from JSON-LD, meta tags and markup: `title`, `published_date`
+  (YYYY-MM-DD), `authors`, `canonical_url` and `image_url`.
+- `summary`: the SUMMARY_SENTENCES highest-scoring sentences, scored by the
+  frequency of their content words in the article, overlap with the title
+  and position, in article order.
+
+`benchmarks/extraction/` compares its speed and text fidelity with
+newspaper3k on a corpus of saved pages.
+"""
+
+import json
+import re
+import urllib.request
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml.etree import ParserError
+from lxml.html.clean import Cleaner
+
+from shared.config import env_int
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36"
+)
+FETCH_TIMEOUT = 15
+MAX_HTML_BYTES = env_int("MAX_HTML_BYTES", 5_000_000)
+SUMMARY_SENTENCES = 3
+MIN_PARAGRAPH_CHARS = 25
+
+# Class/id patterns of boilerplate, unless they also look like content.
+UNLIKELY = re.compile(
+    r"combx|comment|community|disqus|extra|foot|header|menu|nav|remark|rss|shoutbox|"
+    r"sidebar|sponsor|share|social|related|recommend|promo|advert|\bads?\b|banner|"
+    r"cookie|newsletter|subscribe|popup|modal|breadcrumb|outbrain|taboola|pagination",
+    re.I,
+)
+MAYBE_CONTENT = re.compile(r"and|article|body|column|content|main|shadow|story|entry", re.I)
+POSITIVE = re.compile(
+    r"article|body|content|entry|hentry|main|page|post|story|text|blog", re.I
+)
+NEGATIVE = re.compile(
+    r"comment|com-|contact|foot|footer|footnote|masthead|media|meta|outbrain|promo|"
+    r"related|scroll|shoutbox|sidebar|sponsor|shopping|tags|tool|widget|nav|share|social",
+    re.I,
+)
+# Elements kept as blocks of the extracted text.
+BLOCK_TAGS = ("p", "pre", "blockquote", "li", "h2", "h3", "h4")
+BOILERPLATE_LINE = re.compile(
+    r"^(advertisement|read more|continue reading|share this|sign up|subscribe|"
+    r"click here|related:|recommended|follow us)\b",
+    re.I,
+)
+ARTICLE_TYPES = {
+    "Article",
+    "NewsArticle",
+    "ReportageNewsArticle",
+    "AnalysisNewsArticle",
+    "OpinionNewsArticle",
+    "BackgroundNewsArticle",
+    "BlogPosting",
+    "Report",
+    "WebPage",
+}
+DATE_META = (
+    "article:published_time",
+    "og:published_time",
+    "published_time",
+    "pubdate",
+    "publishdate",
+    "publish-date",
+    "publish_date",
+    "date",
+    "dc.date",
+    "dc.date.issued",
+    "dcterms.created",
+    "sailthru.date",
+    "parsely-pub-date",
+    "article.published",
+)
+ISO_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+URL_DATE = re.compile(r"/(20\d{2}|19\d{2})/(\d{1,2})/(\d{1,2})(?:/|$)")
+WRITTEN_DATE = re.compile(
+    r"\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?\s+(\d{1,2}),?\s+(\d{4})\b"
+)
+DATELINE_CLASS = re.compile(r"date|time|posted|published", re.I)
+# How far into the page to look for a written publication date.
+DATELINE_CHARS = 400
+BYLINE = re.compile(r"^\s*by\s+", re.I)
+NAME_PARTICLES = frozenset("de da del der di du la le van von bin al".split())
+SENTENCE = re.compile(r"(?<=[.!?])[\"')\]]?\s+(?=[\"'(\[]?[A-Z0-9])")
+WORD = re.compile(r"[a-z0-9']+")
+STOPWORDS = frozenset(
+    "a about after all also an and any are as at be been before being but by can could "
+    "did do does for from had has have he her his i if in into is it its more most "
+    "new no not of on one or our out over said says she so some than that the their "
+    "them then there these they this to up was we were what when which who will with "
+    "would you".split()
+)
+
+cleaner = Cleaner(
+    scripts=True,
+    javascript=True,
+    comments=True,
+    style=True,
+    inline_style=True,
+    forms=True,
+    embedded=True,
+    frames=True,
+    meta=False,
+    page_structure=False,
+    links=False,
+    remove_unknown_tags=False,
+    safe_attrs_only=False,
+    kill_tags=["nav", "aside", "footer", "noscript", "figure", "button", "svg", "template"],
+)
+
+
+# ---------------------------------------------------------------------------
+# Fetching
+# ---------------------------------------------------------------------------
+
+
+def decode_html(body: bytes, charset: str | None = None) -> str:
+    """Decodes a page by its HTTP charset, its <meta charset>, or as UTF-8."""
+    if not charset:
+        match = re.search(rb"<meta[^>]+charset=[\"']?([\w-]+)", body[:4096], re.I)
+        charset = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def fetch_html(url: str) -> tuple[str, str]:
+    """Downloads a page. Returns its HTML and the final URL after redirects."""
+    request = urllib.request.Request(
+        url,
+        headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+    )
+    with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+        body = response.read(MAX_HTML_BYTES)
+        return decode_html(body, response.headers.get_content_charset()), response.geturl()
+
+
+# ---------------------------------------------------------------------------
+# Metadata
+# ---------------------------------------------------------------------------
+
+
+def _text(element) -> str:
+    return " ".join(element.text_content().split())
+
+
+def _meta(doc, *names: str) -> str:
+    """The first non-empty <meta> content among `names` (by name, property or itemprop)."""
+    wanted = {name.lower() for name in names}
+    found = {}
+    for meta in doc.iter("meta"):
+        key = (meta.get("property") or meta.get("name") or meta.get("itemprop") or "").lower()
+        content = (meta.get("content") or "").strip()
+        if key in wanted and content and key not in found:
+            found[key] = content
+    for name in names:
+        if name.lower() in found:
+            return found[name.lower()]
+    return ""
+
+
+def _json_ld(doc) -> list[dict]:
+    """Article-like objects in the page's JSON-LD."""
+    objects = []
+    for script in doc.xpath('//script[@type="application/ld+json"]'):
+        try:
+            data = json.loads(script.text or "")
+        except ValueError:
+            continue
+        stack = data if isinstance(data, list) else [data]
+        while stack:
+            item = stack.pop(0)
+            if not isinstance(item, dict):
+                continue
+            stack.extend(item.get("@graph") or [])
+            types = item.get("@type")
+            types = set(types) if isinstance(types, list) else {types}
+            if types & ARTICLE_TYPES:
+                objects.append(item)
+    # Prefer the most specific type: an Article over its WebPage.
+    objects.sort(key=lambda item: item.get("@type") == "WebPage")
+    return objects
+
+
+def normalize_date(value: str) -> str:
+    """Reduces an ISO timestamp or a written date to YYYY-MM-DD, or ""."""
+    value = (value or "").strip()
+    match = ISO_DATE.search(value)
+    if match:
+        candidate = "-".join(match.groups())
+    else:
+        match = WRITTEN_DATE.search(value)
+        if not match:
+            return ""
+        month, day, year = match.groups()
+        try:
+            candidate = datetime.strptime(f"{month[:3]} {day} {year}", "%b %d %Y").date().isoformat()
+        except ValueError:
+            return ""
+    try:
+        return datetime.strptime(candidate, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        return ""
+
+
+def find_published_date(doc, ld: list[dict], url: str) -> str:
+    for item in ld:
+        date = normalize_date(str(item.get("datePublished") or item.get("dateCreated") or ""))
+        if date:
+            return date
+    date = normalize_date(_meta(doc, *DATE_META))
+    if date:
+        return date
+    for element in doc.xpath('//*[@itemprop="datePublished"]|//time[@datetime]'):
+        date = normalize_date(element.get("content") or element.get("datetime") or "")
+        if date:
+            return date
+    match = URL_DATE.search(url or "")
+    if match:
+        return normalize_date("{}-{:0>2}-{:0>2}".format(*match.groups()))
+    # Last resort: a written date in a dateline, or near the top of the page.
+    for element in doc.xpath("//*[@class]"):
+        if DATELINE_CLASS.search(element.get("class")):
+            date = normalize_date(_text(element))
+            if date:
+                return date
+    body = doc.find("body")
+    return normalize_date(_text(body)[:DATELINE_CHARS]) if body is not None else ""
+
+
+def _names(value) -> list[str]:
+    if isinstance(value, list):
+        return [name for item in value for name in _names(item)]
+    if isinstance(value, dict):
+        return _names(value.get("name"))
+    if isinstance(value, str) and value.strip() and "://" not in value:
+        return [value.strip()]
+    return []
+
+
+def _split_byline(text: str) -> list[str]:
+    text = BYLINE.sub("", text).split("|")[0]
+    return [name.strip() for name in re.split(r",\s*|\s+and\s+", text) if name.strip()]
+
+
+def find_authors(doc, ld: list[dict]) -> list[str]:
+    authors = []
+    for item in ld:
+        authors.extend(_names(item.get("author")))
+    if not authors:
+        authors.extend(_names(_meta(doc, "author", "article:author", "parsely-author")))
+    if not authors:
+        for element in doc.xpath(
+            '//*[@rel="author"]|//*[@itemprop="author"]'
+            '|//*[contains(@class, "byline") or contains(@class, "contributor")]'
+        ):
+            authors.extend(_split_byline(_text(element)))
+            if authors:
+                break
+    # Bylines sometimes carry job titles too; keep plausible names, once each.
+    seen, names = set(), []
+    for name in authors:
+        words = name.split()
+        plausible = 1 <= len(words) <= 5 and all(
+            word[0].isupper() or word.lower() in NAME_PARTICLES for word in words
+        )
+        if plausible and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def _absolute(url: str, href: str) -> str:
+    return urljoin(url, href.strip()) if href and href.strip() else ""
+
+
+def find_image(doc, ld: list[dict], url: str) -> str:
+    image = _meta(doc, "og:image", "og:image:url", "twitter:image", "twitter:image:src")
+    if not image:
+        for item in ld:
+            value = item.get("image")
+            if isinstance(value, list) and value:
+                value = value[0]
+            if isinstance(value, dict):
+                value = value.get("url")
+            if isinstance(value, str) and value:
+                image = value
+                break
+    return _absolute(url, image)
+
+
+def find_title(doc, ld: list[dict]) -> str:
+    headings = [_text(h1) for h1 in doc.iter("h1") if _text(h1)]
+    for candidate in [_meta(doc, "og:title", "twitter:title")] + [
+        str(item.get("headline") or "") for item in ld
+    ]:
+        if candidate:
+            return candidate.strip()
+    title = doc.find(".//title")
+    title = _text(title) if title is not None else ""
+    if headings and (not title or headings[0] in title):
+        return headings[0]
+    # Drop the site name from "Headline | Site" and "Site - Headline" titles.
+    return max(re.split(r"\s+[|–—-]\s+", title), key=len) if title else ""
+
+
+# ---------------------------------------------------------------------------
+# Main text
+# ---------------------------------------------------------------------------
+
+
+def _class_weight(element) -> int:
+    weight = 0
+    for value in (element.get("class"), element.get("id")):
+        if value:
+            if NEGATIVE.search(value):
+                weight -= 25
+            if POSITIVE.search(value):
+                weight += 25
+    return weight
+
+
+def _initial_score(element) -> float:
+    tag = element.tag
+    if tag in ("article", "main"):
+        score = 10
+    elif tag == "div":
+        score = 5
+    elif tag in ("pre", "td", "blockquote"):
+        score = 3
+    elif tag in ("address", "ol", "ul", "dl", "dd", "dt", "li", "form"):
+        score = -3
+    elif tag in ("h1", "h2", "h3", "h4", "h5", "h6", "th"):
+        score = -5
+    else:
+        score = 0
+    return score + _class_weight(element)
+
+
+def _link_density(element) -> float:
+    length = len(_text(element))
+    if not length:
+        return 0.0
+    return sum(len(_text(link)) for link in element.iter("a")) / length
+
+
+def _drop_unlikely(doc):
+    for element in list(doc.iter()):
+        if not isinstance(element.tag, str) or element.tag in ("html", "body", "article", "main"):
+            continue
+        if element.getparent() is None:
+            continue
+        marker = f"{element.get('class') or ''} {element.get('id') or ''}"
+        if marker.strip() and UNLIKELY.search(marker) and not MAYBE_CONTENT.search(marker):
+            element.drop_tree()
+
+
+def _score_candidates(doc) -> dict:
+    scores = {}
+    for paragraph in doc.iter("p", "pre", "td"):
+        text = _text(paragraph)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        for node, share in ((parent, 1.0), (parent.getparent() if parent is not None else None, 0.5)):
+            if node is None or not isinstance(node.tag, str):
+                continue
+            if node not in scores:
+                scores[node] = _initial_score(node)
+            scores[node] += score * share
+    return {node: score * (1 - _link_density(node)) for node, score in scores.items()}
+
+
+def _content_nodes(doc) -> list:
+    scores = _score_candidates(doc)
+    body = doc.find("body")
+    if not scores:
+        return [body if body is not None else doc]
+    top = max(scores, key=scores.get)
+    parent = top.getparent()
+    if parent is None:
+        return [top]
+    threshold = max(10.0, scores[top] * 0.2)
+    nodes = []
+    for sibling in parent:
+        if sibling is top or scores.get(sibling, float("-inf")) >= threshold:
+            nodes.append(sibling)
+        elif sibling.tag == "p":
+            text = _text(sibling)
+            if len(text) > 80 and _link_density(sibling) < 0.25:
+                nodes.append(sibling)
+    return nodes
+
+
+def _nested_in_block(element, node) -> bool:
+    for ancestor in element.iterancestors():
+        if ancestor.tag in BLOCK_TAGS:
+            return True
+        if ancestor is node:
+            return False
+    return False
+
+
+def _blocks(node) -> list[str]:
+    """The text blocks under `node`, skipping blocks nested in other blocks."""
+    blocks = []
+    candidates = [node] if node.tag in BLOCK_TAGS else []
+    candidates += [
+        element
+        for element in node.iterdescendants(*BLOCK_TAGS)
+        if not _nested_in_block(element, node)
+    ]
+    for element in candidates:
+        text = _text(element)
+        if not text or BOILERPLATE_LINE.match(text) or _link_density(element) > 0.5:
+            continue
+        if element.tag == "p" and len(text) < MIN_PARAGRAPH_CHARS and text[-1] not in ".!?\"'":
+            continue
+        blocks.append(text)
+    if not blocks:
+        # Old layouts separate paragraphs with <br><br> instead of <p>.
+        for br in node.iter("br"):
+            br.tail = "\n" + (br.tail or "")
+        for paragraph in re.split(r"\n\s*\n", node.text_content()):
+            text = " ".join(paragraph.split())
+            if text:
+                blocks.append(text)
+    return blocks
+
+
+def extract_text(doc) -> str:
+    _drop_unlikely(doc)
+    blocks, seen = [], set()
+    for node in _content_nodes(doc):
+        for block in _blocks(node):
+            if block not in seen:
+                seen.add(block)
+                blocks.append(block)
+    return "\n\n".join(blocks)
+
+
+# ---------------------------------------------------------------------------
+# Summary
+# ---------------------------------------------------------------------------
+
+
+def _content_words(text: str) -> list[str]:
+    return [w for w in WORD.findall(text.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def summarize(text: str, title: str = "", sentences: int = SUMMARY_SENTENCES) -> str:
+    """An extractive summary: the best `sentences` sentences, in article order."""
+    candidates = [
+        sentence.strip()
+        for paragraph in text.split("\n")
+        for sentence in SENTENCE.split(paragraph)
+        if len(sentence.split()) >= 6
+    ]
+    if len(candidates) <= sentences:
+        return " ".join(candidates)
+    frequency = Counter(w for sentence in candidates for w in set(_content_words(sentence)))
+    most = max(frequency.values(), default=1)
+    title_words = set(_content_words(title))
+    scored = []
+    for index, sentence in enumerate(candidates):
+        words = set(_content_words(sentence))
+        if not words:
+            continue
+        score = sum(frequency[w] for w in words) / most / len(words) ** 0.5
+        if title_words:
+            score += len(words & title_words) / len(title_words)
+        score += 0.5 * (1 - index / len(candidates))
+        scored.append((score, index))
+    best = sorted(index for _, index in sorted(scored, reverse=True)[:sentences])
+    return " ".join(candidates[index] for index in best)
+
+
+# ---------------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------------
+
+
+def parse_html(html: str):
+    # lxml refuses str input that carries an XML encoding declaration.
+    html = re.sub(r"^\s*<\?xml[^>]*\?>", "", html)
+    try:
+        return lxml.html.document_fromstring(html)
+    except (ParserError, ValueError) as e:
+        raise ValueError(f"The page has no parseable HTML: {e}") from e
+
+
+def extract_article(html: str, url: str = "") -> dict:
+    """Extracts the main text, metadata and a summary from a page's HTML."""
+    doc = parse_html(html)
+    ld = _json_ld(doc)
+    title = find_title(doc, ld)
+    canonical = doc.xpath('//link[@rel="canonical"]/@href')
+    article = {
+        "title": title,
+        "published_date": find_published_date(doc, ld, url),
+        "authors": find_authors(doc, ld),
+        "canonical_url": _absolute(url, canonical[0] if canonical else _meta(doc, "og:url"))
+        or url,
+        "image_url": find_image(doc, ld, url),
+    }
+    text = extract_text(cleaner.clean_html(doc))
+    article["text"] = text
+    article["summary"] = summarize(text, title)
+    return article
+
+
+def read_article(url: str) -> dict:
+    """Downloads and extracts an article."""
+    html, final_url = fetch_html(url)
+    return extract_article(html, final_url)
@@ -0,0 +1,211 @@
+"""
+Incremental re-analysis of pages that were already fact-checked.
+
+The last analyzed version of each page is kept in the "analyses" store as a
+list of sentence segments plus the verdicts produced for it. When the page is
+fetched again, the new text is diffed against the stored segments and only the
+changed regions are handed to claim extraction. Stored verdicts are reused for
+claims whose source sentences are unchanged.
+
+Final results are also cached by content hash, so byte-identical content skips
+extraction and everything after it.
+"""
+
+import difflib
+import re
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from shared.blobs import resolve
+from shared.config import env_flag, env_int
+from shared.keys import canonical_url, claim_key, content_hash
+from shared.store import get_store
+
+INCREMENTAL_ANALYSIS = env_flag("INCREMENTAL_ANALYSIS")
+# How long a final result is served for byte-identical page content, in seconds.
+RESULT_CACHE_TTL = env_int("RESULT_CACHE_TTL", 6 * 60 * 60)
+# Minimum share of a claim's words that must appear in a sentence to tie them.
+MIN_CLAIM_OVERLAP = 0.5
+# Unchanged sentences kept around each changed region to give the extractor context.
+CONTEXT_SEGMENTS = 1
+
+SENTENCE_BOUNDARY = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+(?=[\"'(\[]?[A-Z0-9])")
+WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+
+analyses = get_store("analyses")
+results = get_store("results")
+
+
+def split_segments(text: str) -> list[str]:
+    """Splits article text into sentences, respecting paragraph breaks."""
+    segments = []
+    for paragraph in re.split(r"\n\s*\n|\n", text or ""):
+        paragraph = " ".join(paragraph.split())
+        if paragraph:
+            segments.extend(s for s in SENTENCE_BOUNDARY.split(paragraph) if s)
+    return segments
+
+
+def _keywords(text: str) -> set[str]:
+    return {w for w in WORD.findall(text.lower()) if w not in STOPWORDS}
+
+
+def locate_claim(claim: str, segments: list[str]) -> list[int]:
+    """
+    Returns the indices of the segments a claim was most likely taken from,
+    judged by the share of the claim's keywords each segment contains.
+    """
+    words = _keywords(claim)
+    if not words:
+        return []
+    located = []
+    for index, segment in enumerate(segments):
+        if len(words & _keywords(segment)) / len(words) >= MIN_CLAIM_OVERLAP:
+            located.append(index)
+    return located
+
+
+def diff_segments(old: list[str], new: list[str]) -> tuple[dict[int, int], list[int]]:
+    """
+    Diffs two segment lists.
+
+    Returns a mapping of unchanged old indices to their new indices, and the
+    sorted indices of new segments that were added or modified.
+    """
+    matcher = difflib.SequenceMatcher(
+        None, [claim_key(s) for s in old], [claim_key(s) for s in new], autojunk=False
+    )
+    unchanged, changed = {}, []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            unchanged.update(zip(range(i1, i2), range(j1, j2)))
+        else:
+            changed.extend(range(j1, j2))
+    return unchanged, changed
+
+
+def changed_regions(segments: list[str], changed: list[int]) -> str:
+    """Joins the changed segments, with a little surrounding context, into text."""
+    keep = set()
+    for index in changed:
+        keep.update(
+            range(max(0, index - CONTEXT_SEGMENTS), min(len(segments), index + CONTEXT_SEGMENTS + 1))
+        )
+    return " ".join(segments[i] for i in sorted(keep))
+
+
+def load_analysis(url: str) -> dict | None:
+    return analyses.get(canonical_url(url))
+
+
+def save_analysis(url: str, text: str, claims: list[dict]):
+    """Stores the analyzed text and its verdicts as the page's latest version."""
+    segments = split_segments(text)
+    analyses.set(
+        canonical_url(url),
+        {
+            "content_hash": content_hash(text),
+            "segments": segments,
+            "claims": [
+                {**claim, "segments": locate_claim(claim["claim_text"], segments)}
+                for claim in claims
+            ],
+        },
+    )
+
+
+def plan_incremental_analysis(record: dict, text: str) -> dict:
+    """
+    Compares a page's new text to its stored analysis.
+
+    Returns the text that still needs claim extraction, the stored claims that
+    can be reused as-is, and counts describing how much of the page changed.
+    """
+    new_segments = split_segments(text)
+    identical = record["content_hash"] == content_hash(text)
+    if identical:
+        unchanged, changed = {i: i for i in range(len(new_segments))}, []
+    else:
+        unchanged, changed = diff_segments(record["segments"], new_segments)
+
+    reused, recheck = [], []
+    for claim in record["claims"]:
+        verdict = {key: value for key, value in claim.items() if key != "segments"}
+        if identical or (claim["segments"] and all(i in unchanged for i in claim["segments"])):
+            reused.append(verdict)
+        elif not claim["segments"]:
+            # We can't tell where the claim came from, so it is checked again.
+            recheck.append(claim["claim_text"])
+    return {
+        "changed_text": changed_regions(new_segments, changed),
+        "reused_claims": reused,
+        "recheck_claims": recheck,
+        "stats": {
+            "total_segments": len(new_segments),
+            "changed_segments": len(changed),
+            "reused_claims": len(reused),
+        },
+    }
+
+
+def prepare_incremental_extraction(callback_context: CallbackContext):
+    """
+    Runs after the fetcher. If the page was analyzed before, narrows
+    `fetched_content` down to the changed regions and stashes the reusable
+    verdicts; the full text is always kept in `article_text`.
+    """
+    state = callback_context.state
+    # Sessions can be reused across pages, so clear the previous run's plan.
+    state["reused_claims"] = []
+    state["recheck_claims"] = []
+    state["incremental_stats"] = None
+    if not INCREMENTAL_ANALYSIS:
+        return None
+    url = state.get("source_url")
+    text = resolve(state.get("fetched_content")) or ""
+    state["source_url"] = url
+    state["article_text"] = text
+    record = load_analysis(url) if url else None
+    if record is None:
+        return None
+
+    plan = plan_incremental_analysis(record, text)
+    state["fetched_content"] = plan["changed_text"]
+    state["reused_claims"] = plan["reused_claims"]
+    state["recheck_claims"] = plan["recheck_claims"]
+    state["incremental_stats"] = plan["stats"]
+    return None
+
+
+def skip_redundant_extraction(callback_context: CallbackContext):
+    """
+    Skips claim extraction when the page couldn't be fetched, when the exact
+    same content already has a cached result, or when an incremental re-check
+    found nothing new. A caller that asks for specific claims to be checked,
+    in `requested_claims`, gets those instead of extracted ones.
+    """
+    state = callback_context.state
+    requested = [claim for claim in state.get("requested_claims") or [] if isinstance(claim, str)]
+    if requested and not state.get("fetch_error"):
+        state["cached_result"] = None
+        state["claims"] = {"claims": requested}
+        return types.Content(role="model", parts=[types.Part(text="Checking the requested claims.")])
+    cached = results.get(state.get("content_hash") or "")
+    state["cached_result"] = cached
+    if state.get("fetch_error") or cached is not None or (
+        state.get("incremental_stats") and not state.get("fetched_content")
+    ):
+        state["claims"] = {"claims": []}
+        return types.Content(role="model", parts=[types.Part(text='{"claims": []}')])
+    return None
+
+
+def save_result(content_hash_: str, result: dict):
+    """Caches the final `ClaimsOutput` for a page's exact content."""
+    if content_hash_:
+        results.set(content_hash_, result, ttl=RESULT_CACHE_TTL)
@@ -0,0 +1,118 @@
+"""
+Check-worthiness ranking of extracted claims.
+
+A long article can yield dozens of claims, and retrieval, evaluation and
+fact-checking all grow with the claim count. Claims are scored locally from
+lexical features of check-worthy statements (figures, named entities,
+attribution, causal and comparative language) against those of opinion,
+speculation and questions. Near-duplicates are merged, keeping the
+higher-scoring wording, and only the top MAX_CHECKED_CLAIMS go on to be
+checked. The rest are returned as `unchecked_claims`, most check-worthy
+first; a caller can check them in a later run by putting them in the
+session's `requested_claims`.
+"""
+
+import re
+
+from shared.config import env_int
+
+# Claims checked per run; 0 checks every claim.
+MAX_CHECKED_CLAIMS = env_int("MAX_CHECKED_CLAIMS", 8)
+# Minimum keyword overlap (Jaccard) for two claims to count as duplicates.
+DUPLICATE_OVERLAP = 0.6
+
+WORD = re.compile(r"[A-Za-z0-9][\w'%.-]*")
+NUMBER = re.compile(r"\d")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+
+# Feature weights, applied per matching word unless noted.
+WEIGHTS = {
+    "number": 1.5,  # figures, percentages, years
+    "entity": 0.6,  # capitalized words past the first
+    "attribution": 1.0,
+    "causal": 0.8,
+    "comparative": 0.6,
+    "hedge": -1.0,
+    "opinion": -1.2,
+    "question": -2.0,  # once, for a claim ending in "?"
+    "short": -1.5,  # once, for fewer than MIN_WORDS words
+}
+MAX_ENTITY_WORDS = 4
+MIN_WORDS = 5
+ATTRIBUTION = frozenset(
+    "according said says reported reports announced confirmed found shows showed "
+    "data study survey census official officials statistics".split()
+)
+CAUSAL = frozenset("because caused causes cause led leads due result resulted linked".split())
+COMPARATIVE = frozenset(
+    "most least more less highest lowest largest smallest first only record "
+    "increased decreased doubled tripled rose fell".split()
+)
+HEDGE = frozenset("may might could perhaps possibly maybe likely seems appears".split())
+OPINION = frozenset(
+    "believe think feel should must great terrible best worst amazing awful "
+    "disgraceful wonderful opinion".split()
+)
+
+
+def keywords(text: str) -> set[str]:
+    return {w.lower() for w in WORD.findall(text) if w.lower() not in STOPWORDS}
+
+
+def check_worthiness(claim: str) -> float:
+    """Scores how worth checking a claim is; higher is more check-worthy."""
+    words = WORD.findall(claim)
+    lowered = [w.lower().strip(".") for w in words]
+    features = {
+        "number": sum(bool(NUMBER.search(w)) for w in words),
+        "entity": min(
+            sum(w[0].isupper() and w.lower() not in STOPWORDS for w in words[1:]),
+            MAX_ENTITY_WORDS,
+        ),
+        "attribution": sum(w in ATTRIBUTION for w in lowered),
+        "causal": sum(w in CAUSAL for w in lowered),
+        "comparative": sum(w in COMPARATIVE for w in lowered),
+        "hedge": sum(w in HEDGE for w in lowered),
+        "opinion": sum(w in OPINION for w in lowered),
+        "question": claim.rstrip().endswith("?"),
+        "short": len(words) < MIN_WORDS,
+    }
+    return sum(WEIGHTS[name] * value for name, value in features.items())
+
+
+def _overlap(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+
+def rank_claims(claims: list[str]) -> list[str]:
+    """
+    Returns the claims most check-worthy first, with near-duplicates merged
+    into their highest-scoring wording. Ties keep the extraction order.
+    """
+    scored = sorted(
+        ((check_worthiness(claim), index, claim) for index, claim in enumerate(claims)),
+        key=lambda item: (-item[0], item[1]),
+    )
+    kept = []
+    for _, _, claim in scored:
+        words = keywords(claim)
+        if all(_overlap(words, other) < DUPLICATE_OVERLAP for _, other in kept):
+            kept.append((claim, words))
+    return [claim for claim, _ in kept]
+
+
+def select_claims(claims: list[str], limit: int = MAX_CHECKED_CLAIMS) -> tuple[list[str], list[str]]:
+    """
+    Splits claims into those to check, in their original order, and the
+    unchecked rest, most check-worthy first.
+    """
+    ranked = rank_claims(claims)
+    if not limit or len(ranked) <= limit:
+        selected, rest = ranked, []
+    else:
+        selected, rest = ranked[:limit], ranked[limit:]
+    order = {claim: index for index, claim in enumerate(claims)}
+    return sorted(selected, key=order.__getitem__), rest
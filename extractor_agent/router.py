@@ -0,0 +1,126 @@
+"""
+Deterministic fetching of the page behind a URL.
+
+The URL is classified by its host and path, and the matching backend is
+called directly. Whatever the backend returns is written to `fetched_content`
+exactly, without a model call in between to pick a tool or echo the text.
+Articles also get their metadata (title, published date, authors, canonical
+URL, lead image) in `article_metadata`. Kinds of content no backend can read
+(PDF documents) are reported in `fetch_error` without being downloaded.
+"""
+
+import asyncio
+from typing import AsyncGenerator
+from urllib.parse import urlsplit
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from evaluator_agent.reputation import source_db
+from extractor_agent.article_reader import article_read_tool
+from extractor_agent.x_post_reader import x_post_fetcher_tool
+from shared.cancellation import check_cancelled
+from shared.state import extract_url
+
+X_HOSTS = ("x.com", "twitter.com", "mobile.twitter.com", "mobile.x.com")
+# Kinds of content that can't be fetched, and what to tell the user instead.
+UNSUPPORTED_KINDS = {
+    "pdf": "PDF documents aren't supported. Open the document as a web page instead.",
+}
+
+
+class UnsupportedContentError(ValueError):
+    """Raised for a URL whose kind of content no backend can read."""
+
+
+def known_news_domain(host: str) -> str | None:
+    """Returns the source dataset domain that `host` belongs to, if any."""
+    dataset = source_db.current()
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        domain = ".".join(labels[i:])
+        if domain in dataset:
+            return domain
+    return None
+
+
+def classify_url(url: str) -> str:
+    """
+    Returns the kind of page a URL points to: "x_post", "pdf" (unsupported),
+    "news" for domains in the source database, or "web" for everything else.
+    """
+    parts = urlsplit(url)
+    host = parts.netloc.lower().split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+    if host in X_HOSTS and "/status/" in parts.path:
+        return "x_post"
+    if parts.path.lower().endswith(".pdf"):
+        return "pdf"
+    if known_news_domain(host):
+        return "news"
+    return "web"
+
+
+def fetch_article(url: str) -> tuple[str, dict]:
+    article = article_read_tool(url)
+    metadata = {key: value for key, value in article.items() if key != "article_full_text"}
+    return article["article_full_text"], metadata
+
+
+def fetch_x_post(url: str) -> tuple[str, dict]:
+    result = x_post_fetcher_tool(url)
+    if result["status"] != "success":
+        raise RuntimeError(result.get("error", "Could not fetch the post."))
+    post = result["content"]
+    text = post["text"] or ""
+    if post["media_urls"]:
+        text += "\n\nImages on the page:\n" + "\n".join(post["media_urls"])
+    return text, {}
+
+
+FETCHERS = {
+    "x_post": fetch_x_post,
+    "news": fetch_article,
+    "web": fetch_article,
+}
+
+
+class FetchRouterAgent(BaseAgent):
+    """Fetches the URL in the user's message with the backend for its kind."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        url = extract_url(ctx.user_content)
+        kind = classify_url(url) if url else None
+        state_delta = {
+            "source_kind": kind,
+            "fetch_error": None,
+            "fetched_content": "",
+            "article_metadata": {},
+        }
+        try:
+            if url is None:
+                raise ValueError("No URL found in the request.")
+            if kind in UNSUPPORTED_KINDS:
+                raise UnsupportedContentError(UNSUPPORTED_KINDS[kind])
+            check_cancelled()
+            # The backends block on network I/O, so keep them off the event loop.
+            text, metadata = await asyncio.to_thread(FETCHERS[kind], url)
+            state_delta["fetched_content"] = text
+            state_delta["article_metadata"] = metadata
+            message = f"Fetched {len(state_delta['fetched_content'])} characters ({kind})."
+        except Exception as e:
+            state_delta["fetch_error"] = f"{type(e).__name__}: {e}"
+            message = f"Could not fetch {url}: {state_delta['fetch_error']}"
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=message)]),
+            actions=EventActions(state_delta=state_delta),
+        )
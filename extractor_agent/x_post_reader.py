@@ -0,0 +1,52 @@
+import os
+import re
+
+import tweepy
+
+
+def x_post_fetcher_tool(url: str):
+    # We use this as a simple tool, not multimodal, for the SequentialAgent to pass text
+    match = re.search(r"status/(\d+)", url)
+    post_id = None
+    if match:
+        post_id = match.group(1)
+    else:
+        raise ValueError("Invalid X URL provided.")
+
+    bearer_token = os.environ.get("X_BEARER_TOKEN")
+    if not bearer_token:
+        raise EnvironmentError("X_BEARER_TOKEN not found in environment variables.")
+
+    client = tweepy.Client(bearer_token)
+    post_data = {}
+    try:
+        response = client.get_tweet(
+            id=post_id,
+            tweet_fields=["text"],
+            expansions=["attachments.media_keys"],
+            media_fields=["url"],
+        )
+
+        post_data = {"text": None, "media_urls": []}
+
+        if response.data:
+            post_data["text"] = response.data["text"]
+
+        if "media" in response.includes:
+            for media in response.includes["media"]:
+                if "url" in media:
+                    post_data["media_urls"].append(media["url"])
+
+    except Exception as e:
+        return {"status": "error", "error": f"An error occurred: {e}"}
+
+    if "error" in post_data:
+        return {
+            "status": "error",
+        }
+
+    content_parts = []
+    return {
+        "status": "success",
+        "content": post_data,
+    }
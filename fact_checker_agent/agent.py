@@ -3,9 +3,21 @@ from google.adk.agents import LoopAgent, Agent, SequentialAgent
 # Make sure these imports point to your actual project structure
 from .subagents.analyst_agent.agent import analyst_agent
 from .subagents.review_agent.agent import root_agent as review_agent
+from .revision import RevisionTracker, salvage_timed_out_pass
+from .synthesis import ClaimsSynthesisAgent
 from typing import List
 from pydantic import BaseModel, Field
 
+from shared.config import env_int
+from shared.deadlines import ITERATION_DEADLINE_SECONDS, DeadlineAgent
+
+
+class ClaimSpan(BaseModel):
+    start: int = Field(..., description="Offset of the first character of the span in the page text.")
+    end: int = Field(..., description="Offset just past the last character of the span.")
+    text: str = Field(..., description="The page text the claim was taken from.")
+    score: float = Field(..., description="How closely the claim matches the span, from 0 to 1.")
+
 
 class Claim(BaseModel):
     claim_text: str = Field(..., description="The detected claim text.")
@@ -25,6 +37,14 @@ class Claim(BaseModel):
         ...,
         description="A list of sources that are USED to JUDGE OR VERIFY the claim. This shall NEVER be the original claim's sources.",
     )
+    partial_evidence: bool = Field(
+        False,
+        description="True if a stage timed out and the verdict rests on only part of the evidence or an unreviewed analysis.",
+    )
+    spans: List[ClaimSpan] = Field(
+        default_factory=list,
+        description="Where the claim appears in the page text, for highlighting.",
+    )
 
 
 class ClaimsOutput(BaseModel):
@@ -33,45 +53,40 @@ class ClaimsOutput(BaseModel):
 
 # --- Constants ---
 GEMINI_MODEL = "gemini-2.0-flash"
-MAX_ITERATIONS = 2
+MAX_ITERATIONS = env_int("FACT_CHECK_MAX_ITERATIONS", 2)
 
 # --- Fact Checking Loop ---
+fact_checking_pass = SequentialAgent(
+    name="FactCheckingPass",
+    sub_agents=[
+        analyst_agent,  # analyzes every claim, then only the ones sent back
+        review_agent,  # approves or rejects each claim's analysis
+        RevisionTracker(name="revision_tracker"),  # ends the loop once all are approved
+    ],
+)
+
 fact_checker_loop = LoopAgent(
     name="FactCheckingLoop",
     sub_agents=[
-        analyst_agent,  # evaluates sources and updates STATE_EVALUATED_SOURCES
-        review_agent,  # reviews and refines the original claim if needed
+        # A pass that misses its deadline keeps what the analyst finished,
+        # unreviewed, and ends the loop.
+        DeadlineAgent(
+            name="FactCheckingPassDeadline",
+            agent=fact_checking_pass,
+            stage="fact_checking_pass",
+            seconds=ITERATION_DEADLINE_SECONDS,
+            on_timeout=salvage_timed_out_pass,
+            escalate_on_timeout=True,
+        ),
     ],
     max_iterations=MAX_ITERATIONS,
     description="Loop that repeatedly analyzes evidence, reviews, and increases confidence until threshold is met.",
 )
 
 
-SYNTHESIS_AGENT_PROMPT = """
-You are a synthesis agent. Your sole task is to combine multiple pieces of evidence and the scores given by the analyst agent into a coherent final report. You must evaluate each claim and:
-
-- assign a "confidence_score" between 0 and 1, where 1 means you are absolutely certain the claim is true, and 0 means you are absolutely certain the claim is false.
-- assign a "bias_score" between left, lean left, neutral, lean right, and right, where left means the claim is extremely left-leaning, and right means the claim is extremely right-leaning.
-- provide a brief "justification" (1-2 sentences) explaining your reasoning for the
-- cite sources used for your judgement from the provided list of sources. You should NOT use the original claim's sources.
-
-## List of claims
-The claims you are to verify is listed in a JSON array as follows: {claims}
-
-## List of sources
-The sources you are to use to verify the claims is listed in a JSON array as follows: {evidence_packets}
-
-## Analyst comments
-The comments left by the Final Adjudicator, if any, are as follows: {final_report}
-"""
-
-synthesis_agent = Agent(
-    name="synthesis_agent",
-    model=GEMINI_MODEL,
-    instruction=SYNTHESIS_AGENT_PROMPT,
-    output_key="synthesis_report",
-    output_schema=ClaimsOutput,  # pass into ui
-)
+# The analyst's structured report already holds everything `ClaimsOutput`
+# needs; see `synthesis.py`.
+synthesis_agent = ClaimsSynthesisAgent(name="synthesis_agent")
 
 root_agent = SequentialAgent(
     name="FactCheckerRootAgent",
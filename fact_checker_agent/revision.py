@@ -0,0 +1,146 @@
+"""
+Per-claim revision in the fact-checking loop.
+
+The adjudicator approves or rejects each claim's analysis separately. Only
+the rejected claims go back to the analyst, with the adjudicator's feedback
+for each; approved analyses are kept as they are. State used by the loop:
+
+    claims_to_analyze   the claims the analyst works on in this pass
+    revision_feedback   the adjudicator's feedback on those claims, if any
+    claim_analyses      the latest analysis of every claim, by claim text
+    pending_revisions   rejected claims and their feedback
+    partial_claims      claims whose pass was cut off by its deadline
+    revision_skipped    whether this pass was skipped to save the budget
+
+A skipped pass skips the adjudicator too, and `RevisionTracker` ends the loop.
+"""
+
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from shared.budget import skip_revision_when_low
+from shared.keys import claim_key
+from shared.schemas import ExtractedClaims, dumps
+from shared.state import parse_json_state, read_state
+
+NO_FEEDBACK = "None, this is the first analysis."
+
+
+def prepare_analyst_pass(callback_context: CallbackContext):
+    """
+    Runs before each analyst pass. The first pass of a run analyzes every
+    claim; later passes only the claims the adjudicator sent back.
+    """
+    state = callback_context.state
+    skipped = skip_revision_when_low(callback_context)
+    state["revision_skipped"] = skipped is not None
+    if skipped is not None:
+        return skipped
+
+    if state.get("revision_invocation") != callback_context.invocation_id:
+        # First pass of this run: forget the previous run's analyses.
+        state["revision_invocation"] = callback_context.invocation_id
+        state["claim_analyses"] = {}
+        state["pending_revisions"] = []
+        state["partial_claims"] = []
+        claims = read_state(state.get("claims"), ExtractedClaims, ExtractedClaims([])).claims
+        state["claims_to_analyze"] = dumps(claims)
+        state["revision_feedback"] = NO_FEEDBACK
+    else:
+        pending = state.get("pending_revisions") or []
+        state["claims_to_analyze"] = dumps([item["claim_text"] for item in pending])
+        state["revision_feedback"] = dumps(pending)
+    # So a pass cut off before the analyst finished doesn't pick up an old report.
+    state["final_report"] = None
+    return None
+
+
+def skip_review_when_revision_skipped(callback_context: CallbackContext):
+    """Runs before the adjudicator: there is nothing to review in a skipped pass."""
+    if callback_context.state.get("revision_skipped"):
+        return types.Content(
+            role="model", parts=[types.Part(text="Review skipped with the revision pass.")]
+        )
+    return None
+
+
+def merge_analyses(state) -> tuple[dict, list[str]]:
+    """The stored analyses updated with this pass's report, and the claims it covered."""
+    analyses = dict(state.get("claim_analyses") or {})
+    report = parse_json_state(state.get("final_report"), {})
+    analyzed = []
+    for analysis in (report or {}).get("claims", []) if isinstance(report, dict) else []:
+        if isinstance(analysis, dict) and analysis.get("claim_text"):
+            analyses[claim_key(analysis["claim_text"])] = analysis
+            analyzed.append(claim_key(analysis["claim_text"]))
+    return analyses, analyzed
+
+
+def salvage_timed_out_pass(state) -> dict:
+    """
+    State delta for a pass that missed its deadline: keeps whatever analyses
+    the analyst finished, unreviewed, and marks the pass's claims as partial.
+    """
+    analyses, _ = merge_analyses(state)
+    claims = parse_json_state(state.get("claims_to_analyze"), [])
+    partial = list(state.get("partial_claims") or [])
+    partial += [claim for claim in claims if claim not in partial]
+    return {"claim_analyses": analyses, "pending_revisions": [], "partial_claims": partial}
+
+
+class RevisionTracker(BaseAgent):
+    """
+    Runs after the adjudicator: records the pass's analyses, keeps the claims
+    that were sent back, and ends the loop once none are.
+    """
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        if state.get("revision_skipped"):
+            # The claims sent back keep their last analyses.
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part(text="Revision skipped: the request budget is running low.")],
+                ),
+                actions=EventActions(state_delta={"pending_revisions": []}, escalate=True),
+            )
+            return
+
+        analyses, analyzed = merge_analyses(state)
+
+        review = parse_json_state(state.get("adjudicator_review"), {})
+        rejected = {}
+        for item in (review or {}).get("reviews", []) if isinstance(review, dict) else []:
+            if isinstance(item, dict) and item.get("status") == "Revision Needed":
+                rejected[claim_key(item.get("claim_text", ""))] = item.get("feedback") or ""
+        # Claims the adjudicator didn't mention stand approved.
+        pending = [
+            {"claim_text": analyses[key]["claim_text"], "feedback": rejected[key]}
+            for key in analyzed
+            if key in rejected
+        ]
+        summary = (
+            f"{len(analyzed) - len(pending)} claim analyses approved, "
+            f"{len(pending)} sent back for revision."
+        )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=summary)]),
+            actions=EventActions(
+                state_delta={"claim_analyses": analyses, "pending_revisions": pending},
+                escalate=not pending,
+            ),
+        )
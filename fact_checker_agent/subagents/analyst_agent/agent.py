@@ -1,31 +1,44 @@
 from google.adk.agents import Agent
 from pydantic import BaseModel, Field
-from typing import Literal
-
-
-# class ChiefAnalystOutput(BaseModel):
-#     """
-#     The final, synthesized report produced by the Chief Analyst.
-#     """
-
-#     verdict: Literal[
-#         "Accurate",
-#         "Mostly Accurate",
-#         "Mixed",
-#         "Misleading",
-#         "Inaccurate",
-#         "Unverifiable",
-#     ] = Field(..., description="The final verdict on the claim's factuality.")
-#     confidence_score: float = Field(
-#         ...,
-#         ge=0.0,
-#         le=1.0,
-#         description="A score from 0.0 to 1.0 indicating the confidence in the verdict.",
-#     )
-#     justification: str = Field(
-#         ...,
-#         description="A detailed narrative explaining the reasoning for the verdict, citing the strongest evidence.",
-#     )
+from typing import List, Literal
+
+from fact_checker_agent.revision import prepare_analyst_pass
+
+
+class ClaimAnalysis(BaseModel):
+    """The Chief Analyst's finding on a single claim."""
+
+    claim_text: str = Field(..., description="The claim, exactly as it was given.")
+    verdict: Literal[
+        "Accurate",
+        "Mostly Accurate",
+        "Mixed",
+        "Misleading",
+        "Inaccurate",
+        "Unverifiable",
+    ] = Field(..., description="The final verdict on the claim's factuality.")
+    confidence_score: float = Field(
+        ...,
+        ge=0.0,
+        le=1.0,
+        description="A score from 0.0 to 1.0 indicating the confidence in the verdict.",
+    )
+    justification: str = Field(
+        ...,
+        description="A brief narrative explaining the reasoning for the verdict, citing the strongest evidence.",
+    )
+    sources: List[str] = Field(
+        ...,
+        description="The `source_url` values of the evidence packets the verdict relies on.",
+    )
+
+
+class ChiefAnalystOutput(BaseModel):
+    """
+    The final, synthesized report produced by the Chief Analyst.
+    """
+
+    claims: List[ClaimAnalysis] = Field(..., description="One analysis per claim.")
 
 
 # --------------------------------------------------------------------------
@@ -40,6 +53,8 @@ Your evidence packets are as follows:
 
 TASK: Go over each individual claim and evaluate it against the provided evidence packets. Follow the procedure for each claim. Keep outputs short.
 
+Each packet's `claims` lists the claims it is evidence for. Weigh a claim against its own packets first; packets listed for other claims are context only.
+
 #### Your Cognitive Workflow:
 1.  **Triage and Weigh Evidence**: 
 Given a list of claims and a list of resources, rigorously evaluate the claims against the resources.
@@ -74,11 +89,14 @@ For each claim, choose one of the following verdicts:
     * Directly use the `retrieved_quote` attribute from the most credible sources to support your analysis. For example, write "According to [High Credibility Source], '[retrieved_quote]', which contradicts the claim."
     * If the verdict is "Mixed", your justification must explain the nature of the disagreement between sources.
 
-If there are comments left by the Final Adjudicator, consider them while writing your decision.
+6.  **Cite Your Sources**: List the `source_url` of every evidence packet your verdict relies on, exactly as it appears in the packets.
+
+If there are comments left by the Final Adjudicator, they are about your previous analysis of these claims. Address each one in your revised analysis.
+
+list of claims: {claims_to_analyze}
+Final Adjudicator comments: {revision_feedback}
 
-list of claims: state['claims']
-list of resources: state['sources_output'].
-Final Adjudicator comments: state['adjudicator_review'].feedback
+Return one entry per claim, with the claim text exactly as given.
 """
 
 
@@ -86,7 +104,9 @@ analyst_agent = Agent(
     name="chief_analyst_agent",
     model="gemini-2.0-flash",
     instruction=CHIEF_ANALYST_PROMPT,
+    output_schema=ChiefAnalystOutput,
     output_key="final_report",
+    before_agent_callback=prepare_analyst_pass,
 )
 
 root_agent = analyst_agent
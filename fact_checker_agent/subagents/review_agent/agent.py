@@ -2,16 +2,15 @@ from google.adk.agents import Agent
 from pydantic import BaseModel, Field
 from typing import List, Literal, Optional
 
-from .tools import exit_loop
+from fact_checker_agent.revision import skip_review_when_revision_skipped
 
 
-class AdjudicatorOutput(BaseModel):  # MAYBE FIX THIS OUTPUT_SCHEMA
-    """
-    The output of the Adjudicator, which controls the loop.
-    """
+class ClaimReview(BaseModel):
+    """The Adjudicator's decision on one claim's analysis."""
 
+    claim_text: str = Field(..., description="The claim, exactly as it appears in the report.")
     status: Literal["Approved", "Revision Needed"] = Field(
-        ..., description="The final decision on the report's quality."
+        ..., description="The decision on this claim's analysis."
     )
     feedback: Optional[str] = Field(
         None,
@@ -19,15 +18,24 @@ class AdjudicatorOutput(BaseModel):  # MAYBE FIX THIS OUTPUT_SCHEMA
     )
 
 
+class AdjudicatorOutput(BaseModel):
+    """
+    The output of the Adjudicator, which controls the loop: claims whose
+    analysis needs revision go back to the Analyst.
+    """
+
+    reviews: List[ClaimReview] = Field(..., description="One review per claim in the report.")
+
+
 # --------------------------------------------------------------------------
 # The Final Adjudicator Agent Definition
 # --------------------------------------------------------------------------
 
 ADJUDICATOR_PROMPT = """
-You are the Final Adjudicator, the last line of defense for quality and accuracy. Your mission is to review the draft final_report from the Analyst agent, and decide if it has provided sufficient information on each of the claims' factuality. You are ruthlessly logical and impartial.
+You are the Final Adjudicator, the last line of defense for quality and accuracy. Your mission is to review the draft final_report from the Analyst agent, and decide for each claim whether its analysis provides sufficient information on the claim's factuality. You are ruthlessly logical and impartial.
 
 #### Your Review Checklist:
-You MUST evaluate the draft report against these four critical checks:
+You MUST evaluate each claim's analysis in the draft report against these four critical checks:
 
 1.  **Justification-Evidence Alignment**: Does the `justification` accurately represent the evidence in the evidence_packets? Does it prioritize the quotes from "Very High" and "High" credibility sources? Does it ignore or appropriately downplay the "Low" credibility sources?
 
@@ -38,11 +46,12 @@ You MUST evaluate the draft report against these four critical checks:
     * A score **< 0.7** is necessary if the evidence is "Mixed", conflicting, or relies on sources with less than "High" credibility.
     * The score must directly reflect the strength of the evidence cited in the justification.
 
-4.  Completeness: Has the report addressed all claims provided? Is there any missing information or unanswered questions?
+4.  Completeness: Does the analysis fully address the claim? Is there any missing information or unanswered questions?
 
 #### Your Decision Logic:
-* **If the report passes ALL four checks**: Call the exit_loop function and set the `status` to "Approved"."
-* **If the report fails ANY of the four checks**: The `feedback` field **MUST** contain specific, actionable instructions explaining exactly what to fix. Do not be vague.
+Write one review per claim in the report, with the claim text exactly as it appears there.
+* **If a claim's analysis passes ALL four checks**: set its `status` to "Approved".
+* **If a claim's analysis fails ANY of the four checks**: set its `status` to "Revision Needed". Its `feedback` field **MUST** contain specific, actionable instructions explaining exactly what to fix. Do not be vague.
     * *Bad Feedback:* "The justification is weak."
     * *Good Feedback:* "The confidence score is too high (0.9) given that the only refuting evidence comes from a single source with 'Mixed' credibility. Lower the score to ~0.6 and explicitly state the weakness of the evidence in the justification."
 
@@ -54,8 +63,9 @@ FinalAdjudicatorAgent = Agent(
     name="final_adjudicator_agent",
     model="gemini-2.0-flash",
     instruction=ADJUDICATOR_PROMPT,
-    tools=[exit_loop],
+    output_schema=AdjudicatorOutput,
     output_key="adjudicator_review",
+    before_agent_callback=skip_review_when_revision_skipped,
 )
 
 root_agent = FinalAdjudicatorAgent
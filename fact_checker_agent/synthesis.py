@@ -0,0 +1,172 @@
+"""
+Deterministic assembly of the final `ClaimsOutput`.
+
+The Chief Analyst already writes a verdict, confidence, justification and
+cited sources per claim (`ChiefAnalystOutput`), so the final report needs no
+further model call:
+
+- `confidence` (how likely the claim is true) is the verdict's position on a
+  true/false scale, pulled towards 0.5 as the analyst's confidence drops,
+- `bias_score` is the mean `bias_label` of the cited sources in the source
+  reputation dataset, on the same scale the evaluator uses,
+- claims the analyst left out are reported as unverifiable,
+- `partial_evidence` flags claims checked after a search branch or the
+  evaluation timed out, or whose fact-checking pass was cut off (see
+  `shared/deadlines.py`).
+"""
+
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from evaluator_agent.profiles import bias_rating, lookup_domain
+from evaluator_agent.reputation import source_db
+from shared.deadlines import evidence_timed_out
+from shared.keys import claim_key
+from shared.schemas import Claim, ClaimsOutput, ExtractedClaims, dumps, to_builtins
+from shared.state import parse_json_state, read_state
+
+# Where each verdict puts a claim between false (0.0) and true (1.0).
+VERDICT_TRUTH = {
+    "Accurate": 1.0,
+    "Mostly Accurate": 0.75,
+    "Mixed": 0.5,
+    "Misleading": 0.3,
+    "Inaccurate": 0.0,
+    "Unverifiable": 0.5,
+}
+BIAS_SCORES = {
+    "Left": "left",
+    "Leans Left": "lean left",
+    "Center": "neutral",
+    "Leans Right": "lean right",
+    "Right": "right",
+}
+NOT_ANALYZED = "Unverifiable: the analysis did not cover this claim."
+
+
+# Minimum word overlap for an analysis with reworded claim text to count.
+MIN_REWORDED_OVERLAP = 0.5
+
+
+def _pop_analysis(analyses: dict, claim: str) -> dict:
+    """Takes the analysis of `claim` out of `analyses`, allowing for rewording."""
+    key = claim_key(claim)
+    if key in analyses:
+        return {**analyses.pop(key), "claim_text": claim}
+    words = set(key.split())
+    best, best_overlap = None, MIN_REWORDED_OVERLAP
+    for other in analyses:
+        other_words = set(other.split())
+        overlap = len(words & other_words) / len(words | other_words) if words else 0.0
+        if overlap >= best_overlap:
+            best, best_overlap = other, overlap
+    if best is None:
+        return {"claim_text": claim}
+    return {**analyses.pop(best), "claim_text": claim}
+
+
+def claim_confidence(verdict: str, verdict_confidence: float) -> float:
+    """Converts a verdict and the confidence in it into P(claim is true)."""
+    truth = VERDICT_TRUTH.get(verdict, 0.5)
+    verdict_confidence = min(max(float(verdict_confidence), 0.0), 1.0)
+    return round(0.5 + (truth - 0.5) * verdict_confidence, 2)
+
+
+def sources_bias_score(sources: list[str]) -> str:
+    """The bias of the cited sources listed in the dataset; "neutral" if none are."""
+    labels = []
+    for source in sources:
+        key = lookup_domain(source)
+        entry = source_db.get(key) if key else None
+        if entry is not None:
+            labels.append(entry["bias_label"])
+    if not labels:
+        return "neutral"
+    return BIAS_SCORES[bias_rating(sum(labels) / len(labels))]
+
+
+def assemble_claims(
+    claims: list[str],
+    report: dict,
+    partial_evidence: bool = False,
+    partial_claims: list[str] = (),
+) -> ClaimsOutput:
+    """
+    Builds `ClaimsOutput` from the extracted claims and the analyst's report.
+    `partial_evidence` marks every claim; `partial_claims` only those listed.
+    """
+    partial = {claim_key(claim) for claim in partial_claims}
+    analyses = {}
+    for analysis in report.get("claims", []):
+        if isinstance(analysis, dict) and analysis.get("claim_text"):
+            analyses.setdefault(claim_key(analysis["claim_text"]), analysis)
+    # Report on every extracted claim, in extraction order, then anything the
+    # analyst added that doesn't match one.
+    ordered = [_pop_analysis(analyses, claim) for claim in claims]
+    ordered += analyses.values()
+
+    output = []
+    for analysis in ordered:
+        is_partial = partial_evidence or claim_key(analysis["claim_text"]) in partial
+        if "verdict" not in analysis:
+            output.append(
+                Claim(
+                    claim_text=analysis["claim_text"],
+                    confidence=0.5,
+                    bias_score="neutral",
+                    justification=NOT_ANALYZED,
+                    sources=[],
+                    partial_evidence=is_partial,
+                )
+            )
+            continue
+        sources = [str(source) for source in analysis.get("sources") or []]
+        output.append(
+            Claim(
+                claim_text=analysis["claim_text"],
+                confidence=claim_confidence(
+                    analysis["verdict"], analysis.get("confidence_score", 0.5)
+                ),
+                bias_score=sources_bias_score(sources),
+                justification=f"{analysis['verdict']}: {analysis.get('justification', '')}",
+                sources=sources,
+                partial_evidence=is_partial,
+            )
+        )
+    return ClaimsOutput(output)
+
+
+class ClaimsSynthesisAgent(BaseAgent):
+    """Writes `synthesis_report` from the analyst's `final_report`, without a model call."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        claims = read_state(state.get("claims"), ExtractedClaims, ExtractedClaims([])).claims
+        partial_claims = []
+        if state.get("revision_invocation") == ctx.invocation_id:
+            # Approved analyses from earlier passes plus the latest revisions.
+            report = {"claims": list((state.get("claim_analyses") or {}).values())}
+            partial_claims = state.get("partial_claims") or []
+        else:
+            report = parse_json_state(state.get("final_report"), {})
+        if not isinstance(report, dict):
+            report = {}
+        output = assemble_claims(
+            claims,
+            report,
+            partial_evidence=evidence_timed_out(ctx.invocation_id),
+            partial_claims=partial_claims,
+        )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=dumps(output))]),
+            actions=EventActions(state_delta={"synthesis_report": to_builtins(output)}),
+        )
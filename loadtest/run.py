@@ -0,0 +1,352 @@
+"""
+Load generator for the API server.
+
+Drives the same session-create plus `/run` flow as `request.py` with N
+concurrent synthetic users, against fixture article pages served locally, and
+reports throughput, latency percentiles, event-loop lag and RSS over time.
+
+By default it starts its own server (`uvicorn server:app`) with the stand-in
+model and search fixtures from `loadtest/standins.py`, so runs need no API keys
+and measure the server rather than Gemini:
+
+    python -m loadtest.run --users 20 --duration 60
+
+Point it at a server that is already running with --host instead; start that
+one with DEBUG_ENDPOINTS=1. Lag and RSS come from the server's
+`/debug/runtime` endpoint. With --workers N the server
+runs N processes sharing a SQLite session database and store; each sample then
+comes from whichever worker answered, and RSS is summed over the workers seen.
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(REPO_DIR, "loadtest", "fixtures", "pages")
+AGENT_NAME = "master_agent"
+REQUEST_TIMEOUT = 300
+
+
+class FixtureHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves the fixture pages, optionally after a delay like a slow site."""
+
+    delay = 0.0
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(port: int, delay: float) -> http.server.ThreadingHTTPServer:
+    handler = functools.partial(FixtureHandler, directory=PAGES_DIR)
+    FixtureHandler.delay = delay
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fixture_urls(port: int) -> list[str]:
+    return [
+        f"http://127.0.0.1:{port}/{name}"
+        for name in sorted(os.listdir(PAGES_DIR))
+        if name.endswith(".html")
+    ]
+
+
+def _request(url: str, data: dict | None = None, timeout: float = REQUEST_TIMEOUT):
+    body = json.dumps(data).encode("utf-8") if data is not None else None
+    request = urllib.request.Request(
+        url,
+        data=body,
+        method="POST" if data is not None else "GET",
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8") or "null")
+
+
+def start_api_server(port: int, env: dict, workers: int = 1) -> subprocess.Popen:
+    """Starts `uvicorn server:app` with the stand-ins and waits until it answers."""
+    if workers > 1:
+        shared_dir = tempfile.mkdtemp(prefix="loadtest-")
+        env = {
+            "STORE_BACKEND": "sqlite",
+            "STORE_PATH": os.path.join(shared_dir, "store.sqlite3"),
+            "SESSION_DB_URL": "sqlite:///" + os.path.join(shared_dir, "sessions.db"),
+            **env,
+        }
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "server:app", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=REPO_DIR,
+        env={**os.environ, "LOADTEST_STANDINS": "1", **env},
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The API server exited with status {process.returncode}.")
+        try:
+            _request(f"http://127.0.0.1:{port}/debug/runtime", timeout=2)
+            return process
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("The API server did not start within 60 seconds.")
+
+
+class LoadRun:
+    """Runs the synthetic users and the runtime sampler, and collects results."""
+
+    def __init__(self, host: str, urls: list[str], users: int, duration: float,
+                 ramp: float, sample_interval: float, client_content: bool):
+        self.host = host
+        self.urls = urls
+        self.users = users
+        self.duration = duration
+        self.ramp = ramp
+        self.sample_interval = sample_interval
+        self.client_content = client_content
+        self.results = []  # (finished_at, latency_seconds, error or None)
+        self.samples = []  # runtime snapshots with the elapsed time added
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.started_at = 0.0
+
+    def _elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def _analyze(self, user_id: str, url: str):
+        session_id = uuid.uuid4().hex
+        state = {}
+        if self.client_content:
+            with open(os.path.join(PAGES_DIR, url.rsplit("/", 1)[-1]), encoding="utf-8") as f:
+                text = " ".join(re.sub(r"<[^>]+>", " ", f.read()).split())
+            state["client_content"] = {"url": url, "text": text, "image_urls": []}
+        _request(
+            f"{self.host}/apps/{AGENT_NAME}/users/{user_id}/sessions/{session_id}", state
+        )
+        events = _request(
+            f"{self.host}/run",
+            {
+                "app_name": AGENT_NAME,
+                "user_id": user_id,
+                "session_id": session_id,
+                "new_message": {"role": "user", "parts": [{"text": url}]},
+            },
+        )
+        if not events:
+            raise RuntimeError("The run returned no events.")
+
+    def _user(self, index: int):
+        time.sleep(self.ramp * index / max(self.users, 1))
+        user_id = f"loadtest-{index}"
+        iteration = 0
+        while not self._stop.is_set():
+            url = self.urls[(index + iteration) % len(self.urls)]
+            iteration += 1
+            started = time.monotonic()
+            error = None
+            try:
+                self._analyze(user_id, url)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            with self._lock:
+                self.results.append((self._elapsed(), time.monotonic() - started, error))
+
+    def _sample(self):
+        while not self._stop.is_set():
+            try:
+                snapshot = _request(f"{self.host}/debug/runtime", timeout=10)
+                snapshot["elapsed"] = round(self._elapsed(), 1)
+                with self._lock:
+                    snapshot["completed"] = len(self.results)
+                self.samples.append(snapshot)
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                pass
+            self._stop.wait(self.sample_interval)
+
+    def run(self) -> dict:
+        self.started_at = time.monotonic()
+        threads = [threading.Thread(target=self._sample, daemon=True)]
+        threads += [
+            threading.Thread(target=self._user, args=(i,), daemon=True)
+            for i in range(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+        self._stop.wait(self.duration)
+        self._stop.set()
+        # Let in-flight requests finish so their latencies are counted.
+        for thread in threads:
+            thread.join(REQUEST_TIMEOUT)
+        return self.report()
+
+    def report(self) -> dict:
+        elapsed = self._elapsed()
+        latencies = [latency for _, latency, error in self.results if error is None]
+        errors = [error for _, _, error in self.results if error is not None]
+        first_rss, last_rss, peak_total = {}, {}, 0
+        for sample in self.samples:
+            first_rss.setdefault(sample["pid"], sample["rss_bytes"])
+            last_rss[sample["pid"]] = sample["rss_bytes"]
+            peak_total = max(peak_total, sum(last_rss.values()))
+        lag_p99 = [sample["loop_lag"]["p99_ms"] for sample in self.samples]
+        return {
+            "users": self.users,
+            "duration_seconds": round(elapsed, 1),
+            "requests": len(self.results),
+            "succeeded": len(latencies),
+            "failed": len(errors),
+            "error_kinds": sorted(set(error.split(":")[0] for error in errors)),
+            "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+            "latency_seconds": latency_summary(latencies),
+            "loop_lag_ms": {
+                "p99_median": round(statistics.median(lag_p99), 2) if lag_p99 else 0.0,
+                "p99_worst": max(lag_p99, default=0.0),
+                "max": max((s["loop_lag"]["max_ms"] for s in self.samples), default=0.0),
+            },
+            "workers_seen": len(first_rss),
+            "rss_mb": {
+                "start": _mb(sum(first_rss.values())),
+                "end": _mb(sum(last_rss.values())),
+                "peak": _mb(peak_total),
+                "growth": _mb(sum(last_rss.values()) - sum(first_rss.values())),
+            },
+            "timeline": [
+                {
+                    "elapsed": sample["elapsed"],
+                    "pid": sample["pid"],
+                    "completed": sample["completed"],
+                    "rss_mb": _mb(sample["rss_bytes"]),
+                    "lag_p99_ms": sample["loop_lag"]["p99_ms"],
+                    "lag_max_ms": sample["loop_lag"]["window_max_ms"],
+                }
+                for sample in self.samples
+            ],
+        }
+
+
+def _mb(value: int) -> float:
+    return round(value / (1024 * 1024), 1)
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "p50": percentile(0.5),
+        "p90": percentile(0.9),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": round(ordered[-1], 3),
+        "mean": round(statistics.mean(ordered), 3),
+    }
+
+
+def print_report(report: dict):
+    latency = report["latency_seconds"]
+    print(
+        f"Users:       {report['users']} for {report['duration_seconds']}s "
+        f"({report['workers_seen']} server process(es) seen)"
+    )
+    print(f"Requests:    {report['requests']} ({report['failed']} failed {report['error_kinds']})")
+    print(f"Throughput:  {report['throughput_rps']} analyses/s")
+    if latency:
+        print(
+            f"Latency:     p50 {latency['p50']}s  p90 {latency['p90']}s  "
+            f"p99 {latency['p99']}s  max {latency['max']}s"
+        )
+    lag = report["loop_lag_ms"]
+    print(f"Loop lag:    p99 {lag['p99_median']}ms typical, {lag['p99_worst']}ms worst, max {lag['max']}ms")
+    rss = report["rss_mb"]
+    print(f"RSS:         {rss['start']} -> {rss['end']} MB (peak {rss['peak']}, growth {rss['growth']})")
+    print()
+    print(f"{'t (s)':>7} {'pid':>8} {'done':>6} {'RSS MB':>8} {'lag p99':>9} {'lag max':>9}")
+    for row in report["timeline"]:
+        print(
+            f"{row['elapsed']:>7} {row['pid']:>8} {row['completed']:>6} {row['rss_mb']:>8} "
+            f"{row['lag_p99_ms']:>9} {row['lag_max_ms']:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="concurrent synthetic users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to generate load")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which users start")
+    parser.add_argument("--host", help="existing server to test, e.g. http://localhost:8000")
+    parser.add_argument("--port", type=int, default=8765, help="port for the server this starts")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="server processes for the server this starts")
+    parser.add_argument("--fixture-port", type=int, default=8766)
+    parser.add_argument("--page-delay", type=float, default=0.0,
+                        help="seconds the fixture site takes to answer")
+    parser.add_argument("--model-latency", type=float,
+                        help="seconds the stand-in model takes per call")
+    parser.add_argument("--client-content", action="store_true",
+                        help="send the page text like the extension does, skipping the fetch")
+    parser.add_argument("--warm-cache", action="store_true",
+                        help="keep the result cache on, so repeat pages skip the pipeline")
+    parser.add_argument("--sample-interval", type=float, default=2.0)
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    fixtures = start_fixture_server(args.fixture_port, args.page_delay)
+    server = None
+    host = args.host
+    if host is None:
+        # Every user cycles through the same few pages; without this, all
+        # but the first analysis of each would come from the result cache.
+        env = {} if args.warm_cache else {"RESULT_CACHE_TTL": "0"}
+        if args.model_latency is not None:
+            env["STANDIN_MODEL_LATENCY"] = str(args.model_latency)
+        server = start_api_server(args.port, env, args.workers)
+        host = f"http://127.0.0.1:{args.port}"
+    try:
+        report = LoadRun(
+            host.rstrip("/"),
+            fixture_urls(args.fixture_port),
+            users=args.users,
+            duration=args.duration,
+            ramp=args.ramp,
+            sample_interval=args.sample_interval,
+            client_content=args.client_content,
+        ).run()
+    finally:
+        fixtures.shutdown()
+        if server is not None:
+            server.terminate()
+            server.wait(10)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
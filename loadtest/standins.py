@@ -0,0 +1,146 @@
+"""
+Stand-ins for the Gemini model and the search backend, for load runs.
+
+`install()` registers `StandInLlm` for every `gemini-*` model name and points
+the search layer at the local fixtures, so the whole pipeline runs without
+network access or API keys. The stand-in answers after a configurable delay
+(STANDIN_MODEL_LATENCY seconds, +/- half of it at random) and:
+
+- calls the first function tool it is offered, once per turn,
+- fills in a response schema with placeholder values when one is set,
+- otherwise writes a few source blocks in the search agents' format.
+
+The server installs it when LOADTEST_STANDINS is set; it has to happen before
+any agent module is imported.
+"""
+
+import asyncio
+import json
+import os
+import random
+import typing
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+from pydantic import BaseModel
+
+from shared.config import env_float
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+STANDIN_MODEL_LATENCY = env_float("STANDIN_MODEL_LATENCY", 0.3)
+# Rough characters per token, for the usage numbers the budget counts.
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_CHARS = 40
+
+STANDIN_SOURCES = (
+    ("https://www.reuters.com", "2024-03-12", "Reuters reports the figures match the official release.", "supporting"),
+    ("https://apnews.com", "2024-03-11", "AP found no record of the event described.", "refuting"),
+    ("https://www.bbc.com", "2023-11-02", "BBC background on the policy in question.", "neutral"),
+)
+
+
+def _placeholder(annotation, name: str = "", index: int = 0):
+    """Builds a placeholder value for a type annotation from a response schema."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Literal:
+        return args[0]
+    if origin is typing.Union:
+        return _placeholder(next(a for a in args if a is not type(None)), name, index)
+    if origin in (list, typing.List):
+        return [_placeholder(args[0] if args else str, name, i) for i in range(3)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return {
+            field: _placeholder(info.annotation, field, index)
+            for field, info in annotation.model_fields.items()
+        }
+    if annotation is float:
+        return round(random.uniform(0.2, 0.9), 2)
+    if annotation is int:
+        return index
+    if annotation is bool:
+        return False
+    return f"Stand-in {name.replace('_', ' ') or 'value'} {index + 1}"
+
+
+def _source_blocks() -> str:
+    return "\n\n".join(
+        f"Domain: {domain}\nPublished Date: {date}\nVerdict: {verdict}\nStance: {stance}"
+        for domain, date, verdict, stance in STANDIN_SOURCES
+    )
+
+
+def _tool_args(name: str) -> dict:
+    if name == "search_web":
+        return {"queries": [f"stand-in claim {i + 1}" for i in range(3)]}
+    return {}
+
+
+class StandInLlm(BaseLlm):
+    """Answers every `gemini-*` request with canned output after a delay."""
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"gemini-.*"]
+
+    def _answer(self, llm_request: LlmRequest) -> types.Part:
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered_tool = bool(
+            last and any(part.function_response for part in last.parts or [])
+        )
+        if llm_request.tools_dict and not answered_tool:
+            name = next(iter(llm_request.tools_dict))
+            return types.Part(
+                function_call=types.FunctionCall(name=name, args=_tool_args(name))
+            )
+        schema = llm_request.config.response_schema if llm_request.config else None
+        if schema is not None:
+            return types.Part(text=json.dumps(_placeholder(schema)))
+        return types.Part(text=_source_blocks())
+
+    def _usage(self, llm_request: LlmRequest, answer: types.Part):
+        prompt_chars = sum(
+            len(part.text or "")
+            for content in llm_request.contents
+            for part in content.parts or []
+        )
+        prompt_tokens = prompt_chars // CHARS_PER_TOKEN
+        answer_tokens = len(answer.text or "") // CHARS_PER_TOKEN + 1
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=answer_tokens,
+            total_token_count=prompt_tokens + answer_tokens,
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(STANDIN_MODEL_LATENCY * random.uniform(0.5, 1.5))
+        answer = self._answer(llm_request)
+        if stream and answer.text:
+            for start in range(0, len(answer.text), STREAM_CHUNK_CHARS):
+                chunk = answer.text[start : start + STREAM_CHUNK_CHARS]
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+                    partial=True,
+                )
+                await asyncio.sleep(0)
+        response = {"content": types.Content(role="model", parts=[answer])}
+        if "usage_metadata" in LlmResponse.model_fields:
+            # ADK 0.3.0's `LlmResponse` has no usage field; the budget then
+            # estimates tokens itself.
+            response["usage_metadata"] = self._usage(llm_request, answer)
+        yield LlmResponse(**response)
+
+
+def install():
+    """Routes model calls to `StandInLlm` and searches to the local fixtures."""
+    os.environ.setdefault("SEARCH_BACKEND", "local")
+    os.environ.setdefault("SEARCH_FIXTURES", os.path.join(FIXTURES_DIR, "search.json"))
+    LLMRegistry.register(StandInLlm)
+    # Model names resolved before now would still map to Gemini.
+    LLMRegistry.resolve.cache_clear()
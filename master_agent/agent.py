@@ -1,5 +1,3 @@
-from google.adk.agents import SequentialAgent
-
 # from google.adk.tools import google_search
 
 from pydantic import BaseModel, Field
@@ -11,12 +9,16 @@ from extractor_agent.agent import root_agent as fetcher_agent
 from fact_checker_agent.agent import root_agent as fact_checker_agent
 from retrieval_agent.agent import root_agent as retrieval_agent
 from evaluator_agent.agent import root_agent as evaluator_agent
+from master_agent.pipeline import FactCheckPipeline
 
 import dotenv
 
 dotenv.load_dotenv()
 
-root_agent = SequentialAgent(
+root_agent = FactCheckPipeline(
     name="RootAgent",
-    sub_agents=[fetcher_agent, retrieval_agent, evaluator_agent, fact_checker_agent],
+    extractor=fetcher_agent,
+    retrieval=retrieval_agent,
+    evaluator=evaluator_agent,
+    fact_checker=fact_checker_agent,
 )
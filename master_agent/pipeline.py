@@ -0,0 +1,403 @@
+"""
+The fact-checking pipeline that `master_agent` runs.
+
+It runs the extractor, retrieval, evaluator and fact-checker stages in order,
+like a `SequentialAgent`, but gets a say between stages:
+
+- It answers straight from the result cache when the page content was
+  analyzed before.
+- Checks only the MAX_CHECKED_CLAIMS most check-worthy new claims (see
+  `extractor_agent/ranking.py`) and returns the rest as unchecked.
+- INCREMENTAL_ANALYSIS: drops claims whose stored verdicts are being reused,
+  skips the downstream stages when nothing new needs checking, and merges
+  reused and fresh verdicts into the final `ClaimsOutput`.
+- PIPELINED_EXTRACTION: searches for claims while extraction is still
+  streaming, alongside the search agents, and adds what it finds as
+  evidence for each claim (see `streaming.py`).
+- OVERLAPPED_PROFILING: profiles source domains as each search branch
+  finishes and skips the evaluator's model calls (see
+  `evaluator_agent/profiles.py`).
+- EVIDENCE_POOL: pools the sources retrieved for an article across its
+  claims and runs, and only searches again for claims with thin coverage
+  (see `retrieval_agent/evidence.py`).
+- Large state values (article text, raw search results) are kept out of
+  session state in a blob store (see `shared/blobs.py`).
+- Every request runs against a token, model-call and time budget (see
+  `shared/budget.py`) and degrades as it runs low.
+- A run that nobody is waiting for any more is cancelled mid-flight (see
+  `shared/cancellation.py`).
+- Each stage has a deadline (see `shared/deadlines.py`). A stage that misses
+  it is cut off and the run goes on with what it has; an evaluation that
+  times out falls back to database-only source reputation.
+
+The final event carries the `ClaimsOutput`, with the spans of page text each
+claim was taken from (see `extractor_agent/alignment.py`), plus the
+degradations applied, the budget used, any claims that were left unchecked
+and the version of the source reputation dataset used.
+"""
+
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from extractor_agent.alignment import add_claim_spans
+from extractor_agent.incremental import (
+    INCREMENTAL_ANALYSIS,
+    save_analysis,
+    save_result,
+)
+from extractor_agent.ranking import select_claims
+from evaluator_agent.profiles import (
+    SourceProfiler,
+    build_evidence_packets,
+    database_profiles,
+    domains_in_results,
+)
+from evaluator_agent.reputation import source_db
+from master_agent.streaming import ClaimStreamParser, SpeculativeRetriever
+from retrieval_agent.evidence import (
+    EVIDENCE_POOL,
+    load_pool,
+    needs_retrieval,
+    pool_key,
+    save_pool,
+)
+from retrieval_agent.parser import merge_sources
+from shared.blobs import install_blob_callbacks, offload_state_delta, resolve
+from shared.budget import close_budget, install_budget_callbacks, open_budget
+from shared.cancellation import install_cancel_callbacks
+from shared.config import env_flag, env_int
+from shared.deadlines import (
+    EVALUATION_DEADLINE_SECONDS,
+    SEARCH_DEADLINE_SECONDS,
+    Deadline,
+    record_timeout,
+)
+from shared.keys import claim_key
+from shared.models import apply_model_overrides
+from shared.schemas import (
+    ClaimsOutput,
+    ExtractedClaims,
+    SourceItem,
+    SourcesOutput,
+    dumps,
+    to_builtins,
+)
+from shared.state import read_state
+
+PIPELINED_EXTRACTION = env_flag("PIPELINED_EXTRACTION")
+OVERLAPPED_PROFILING = env_flag("OVERLAPPED_PROFILING")
+# Sources kept for evaluation and fact-checking once the budget runs low.
+MAX_SOURCES_WHEN_LOW = env_int("MAX_SOURCES_WHEN_LOW", 6)
+SEARCH_BRANCH_KEYS = (
+    "positive_search_results",
+    "negative_search_results",
+    "neutral_search_results",
+)
+
+
+class FactCheckPipeline(BaseAgent):
+    """Runs extraction, retrieval, evaluation and fact-checking in sequence."""
+
+    extractor: BaseAgent
+    retrieval: BaseAgent
+    evaluator: BaseAgent
+    fact_checker: BaseAgent
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, name: str, extractor, retrieval, evaluator, fact_checker):
+        super().__init__(
+            name=name,
+            extractor=extractor,
+            retrieval=retrieval,
+            evaluator=evaluator,
+            fact_checker=fact_checker,
+            sub_agents=[extractor, retrieval, evaluator, fact_checker],
+        )
+        # Installed first, so a cancelled run's model calls aren't counted.
+        install_cancel_callbacks(self)
+        # Before the budget, so prompts are counted at their resolved size.
+        install_blob_callbacks(self)
+        install_budget_callbacks(self)
+        apply_model_overrides(self)
+
+    def _event(self, ctx: InvocationContext, state_delta: dict, text: str | None = None):
+        content = None
+        if text is not None:
+            content = types.Content(role="model", parts=[types.Part(text=text)])
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=content,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    async def _run_extractor_pipelined(
+        self, ctx: InvocationContext, speculative: SpeculativeRetriever
+    ) -> AsyncGenerator[Event, None]:
+        """
+        Runs extraction with streaming, queueing a search for each claim as it
+        completes, up to the claim cap. The searches go on in the background;
+        `_retrieve` collects them.
+        """
+        streaming_ctx = ctx.model_copy(
+            update={"run_config": RunConfig(streaming_mode=StreamingMode.SSE)}
+        )
+        parser = ClaimStreamParser()
+        streamed = []
+        async for event in self.extractor.run_async(streaming_ctx):
+            if not event.partial:
+                yield event
+            elif event.content and event.content.parts:
+                chunk = "".join(part.text or "" for part in event.content.parts)
+                for claim in parser.feed(chunk):
+                    streamed.append(claim)
+                    await speculative.put(claim)
+        claims = read_state(
+            ctx.session.state.get("claims"), ExtractedClaims, ExtractedClaims([])
+        ).claims
+        if not claims and streamed:
+            # Extraction missed its deadline; go on with the claims it finished.
+            yield self._event(ctx, {"claims": {"claims": streamed}})
+
+    def _sources(self, ctx: InvocationContext, budget) -> list[SourceItem]:
+        sources = read_state(
+            ctx.session.state.get("sources_output"), SourcesOutput, SourcesOutput()
+        ).sources
+        if budget.low and len(sources) > MAX_SOURCES_WHEN_LOW:
+            budget.degrade("capped_sources")
+            sources = sources[:MAX_SOURCES_WHEN_LOW]
+        return sources
+
+    async def _retrieve(
+        self, ctx: InvocationContext, budget, speculative: SpeculativeRetriever | None = None
+    ) -> AsyncGenerator[Event, None]:
+        """
+        Runs retrieval. The per-claim searches of pipelined extraction
+        (`speculative`) keep running alongside the search agents, and what
+        they found joins `sources_output` afterwards, tagged with its claim.
+
+        With EVIDENCE_POOL, goes through the article's evidence pool instead:
+        the search agents only run when most claims have thin coverage, the
+        claims still thin are searched for directly, and `sources_output`
+        becomes the pool's selection for the claims.
+        """
+        state = ctx.session.state
+        claims = read_state(state.get("claims"), ExtractedClaims, ExtractedClaims([])).claims
+        if not EVIDENCE_POOL:
+            async for event in self.retrieval.run_async(ctx):
+                yield event
+            if speculative is not None:
+                await speculative.finish(SEARCH_DEADLINE_SECONDS or None)
+                retrieved = read_state(
+                    ctx.session.state.get("sources_output"), SourcesOutput, SourcesOutput()
+                )
+                sources = merge_sources([retrieved.sources, speculative.sources(claims)])
+                yield self._event(ctx, {"sources_output": to_builtins(SourcesOutput(sources))})
+            return
+        key = pool_key(state)
+        pool = load_pool(key)
+        fresh = set()
+        if needs_retrieval(pool, claims):
+            async for event in self.retrieval.run_async(ctx):
+                yield event
+            retrieved = read_state(
+                ctx.session.state.get("sources_output"), SourcesOutput, SourcesOutput()
+            )
+            fresh = {pool.add(source) for source in retrieved.sources}
+        if speculative is not None:
+            pool.add_results(claims, await speculative.finish(SEARCH_DEADLINE_SECONDS or None))
+        thin = pool.thin_claims(claims)
+        if thin and not budget.low:
+            await pool.search(thin, ctx.invocation_id)
+        save_pool(key, pool)
+        sources = pool.select(claims, fresh=fresh)
+        yield self._event(ctx, {"sources_output": to_builtins(SourcesOutput(sources))})
+
+    async def _run_retrieval_and_profiling(
+        self, ctx: InvocationContext, budget, speculative: SpeculativeRetriever | None
+    ) -> AsyncGenerator[Event, None]:
+        """
+        Runs retrieval while profiling each search branch's domains as soon
+        as the branch finishes, then joins the profiles with the formatted
+        sources into `evidence_packets` in place of the evaluator.
+        """
+        profiler = SourceProfiler()
+        try:
+            async for event in self._retrieve(ctx, budget, speculative):
+                delta = event.actions.state_delta if event.actions else {}
+                for key in SEARCH_BRANCH_KEYS:
+                    if delta.get(key):
+                        if budget.low:
+                            budget.degrade("database_reputation_only")
+                        profiler.add_domains(
+                            domains_in_results(str(delta[key])), research=not budget.low
+                        )
+                yield event
+            sources = self._sources(ctx, budget)
+            profiler.add_domains((source.domain for source in sources), research=not budget.low)
+            try:
+                profiles = await asyncio.wait_for(
+                    profiler.finish(), EVALUATION_DEADLINE_SECONDS or None
+                )
+            except asyncio.TimeoutError:
+                # Domains still being researched get an "unknown" profile.
+                record_timeout(ctx, "evaluation")
+                profiles = profiler.profiles
+        finally:
+            profiler.cancel()
+        yield self._event(
+            ctx,
+            {
+                "sources_output": to_builtins(SourcesOutput(sources)),
+                "domain_profiles": {d: p for d, p in profiles.items() if p},
+                "evidence_packets": to_builtins(build_evidence_packets(sources, profiles)),
+            },
+        )
+
+    async def _check_claims(
+        self, ctx: InvocationContext, budget, speculative: SpeculativeRetriever | None
+    ) -> AsyncGenerator[Event, None]:
+        """
+        Runs retrieval, evaluation and fact-checking on the claims in state,
+        degrading as the budget runs low and stopping once it runs out.
+        """
+        if budget.exhausted:
+            budget.degrade("stopped_before_retrieval")
+            return
+        if OVERLAPPED_PROFILING:
+            async for event in self._run_retrieval_and_profiling(ctx, budget, speculative):
+                yield event
+        else:
+            async for event in self._retrieve(ctx, budget, speculative):
+                yield event
+            sources = self._sources(ctx, budget)
+            evaluated = False
+            if not budget.low:
+                deadline = Deadline(EVALUATION_DEADLINE_SECONDS)
+                async for event in deadline.run(self.evaluator.run_async(ctx)):
+                    yield event
+                if deadline.timed_out:
+                    record_timeout(ctx, "evaluation")
+                evaluated = not deadline.timed_out
+            else:
+                budget.degrade("database_reputation_only")
+            if not evaluated:
+                # Rate the sources from the database alone.
+                profiles = database_profiles(source.domain for source in sources)
+                yield self._event(
+                    ctx,
+                    {
+                        "sources_output": to_builtins(SourcesOutput(sources)),
+                        "evidence_packets": to_builtins(build_evidence_packets(sources, profiles)),
+                    },
+                )
+
+        if budget.exhausted:
+            budget.degrade("stopped_before_fact_checking")
+            return
+        async for event in self.fact_checker.run_async(ctx):
+            yield event
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        budget = open_budget(ctx.invocation_id)
+        speculative = SpeculativeRetriever(ctx.invocation_id) if PIPELINED_EXTRACTION else None
+        try:
+            async for event in self._run_pipeline(ctx, budget, speculative):
+                if event.actions and event.actions.state_delta:
+                    # Keep large values out of session state; see `shared/blobs.py`.
+                    offload_state_delta(event.actions.state_delta)
+                yield event
+        finally:
+            if speculative is not None:
+                speculative.cancel()
+            close_budget(ctx.invocation_id)
+
+    async def _run_pipeline(
+        self, ctx: InvocationContext, budget, speculative: SpeculativeRetriever | None
+    ) -> AsyncGenerator[Event, None]:
+        if speculative is not None:
+            extraction = self._run_extractor_pipelined(ctx, speculative)
+        else:
+            extraction = self.extractor.run_async(ctx)
+        async for event in extraction:
+            yield event
+
+        state = ctx.session.state
+        requested = bool(state.get("requested_claims"))
+        if requested:
+            # Requested claims are checked once, not on every later run.
+            yield self._event(ctx, {"requested_claims": None})
+        if state.get("fetch_error"):
+            yield self._event(ctx, {}, f"Could not fetch the page: {state['fetch_error']}")
+            return
+        if state.get("cached_result") is not None:
+            cached = state["cached_result"]
+            yield self._event(
+                ctx, {"synthesis_report": cached}, dumps({**cached, "result_cache": "hit"})
+            )
+            return
+
+        reused = state.get("reused_claims") or []
+        extracted = read_state(state.get("claims"), ExtractedClaims, ExtractedClaims([])).claims
+        known = {claim_key(claim["claim_text"]) for claim in reused}
+        new_claims = [
+            claim
+            for claim in extracted + (state.get("recheck_claims") or [])
+            if claim_key(claim) not in known
+        ]
+        # Only the most check-worthy claims are checked; see `ranking.py`.
+        new_claims, not_checked = select_claims(new_claims)
+        if speculative is not None:
+            # Checked claims the stream didn't deliver piece by piece, if
+            # there is room left under the cap.
+            for claim in new_claims:
+                await speculative.put(claim)
+
+        checked, unchecked = [], list(not_checked)
+        if new_claims or not INCREMENTAL_ANALYSIS:
+            if new_claims != extracted:
+                yield self._event(ctx, {"claims": {"claims": new_claims}})
+            async for event in self._check_claims(ctx, budget, speculative):
+                yield event
+            if any(d.startswith("stopped_") for d in budget.degradations):
+                unchecked = new_claims + unchecked
+            else:
+                report = read_state(ctx.session.state.get("synthesis_report"), ClaimsOutput)
+                if report is None:
+                    # Nothing trustworthy to cache or merge with.
+                    return
+                checked = to_builtins(report)["claims"]
+
+        # Point each claim at the text it came from, for highlighting on the page.
+        # With incremental analysis, `fetched_content` may hold only the changed regions.
+        page_text = state.get("article_text" if INCREMENTAL_ANALYSIS else "fetched_content")
+        merged = {"claims": add_claim_spans(reused + checked, resolve(page_text) or "")}
+        # Degraded results are still returned, but not kept for reuse, and
+        # neither are results for a caller's own selection of claims.
+        if not budget.degradations and not requested:
+            cached = {**merged, "unchecked_claims": not_checked} if not_checked else merged
+            save_result(state.get("content_hash"), cached)
+            if INCREMENTAL_ANALYSIS and state.get("source_url"):
+                save_analysis(
+                    state["source_url"], resolve(state.get("article_text", "")), merged["claims"]
+                )
+
+        response = {
+            **merged,
+            "unchecked_claims": unchecked,
+            "degradations": budget.degradations,
+            "usage": budget.usage(),
+            "reputation_dataset": source_db.provenance(),
+            "result_cache": "miss",
+        }
+        yield self._event(ctx, {"synthesis_report": merged}, dumps(response))
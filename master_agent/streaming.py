@@ -0,0 +1,143 @@
+"""
+Pipelined claim extraction.
+
+Claim extraction is streamed, and each claim is parsed out of the partial
+`ExtractedClaims` JSON as soon as its string is complete. Completed claims go
+through a bounded queue to a small pool of workers that search for them right
+away, while the model is still writing the remaining claims. At most
+MAX_CHECKED_CLAIMS claims are searched for, as no more are checked. The
+searches keep running alongside the retrieval branches; their results then
+join the retrieved sources as evidence for the claim they were searched for
+only.
+"""
+
+import asyncio
+import json
+import re
+from itertools import chain, zip_longest
+
+from extractor_agent.ranking import MAX_CHECKED_CLAIMS
+from retrieval_agent.parser import sources_from_results
+from retrieval_agent.search import claim_query, search_layer
+from shared.config import env_int
+from shared.schemas import SourceItem
+
+SPECULATIVE_QUEUE_SIZE = env_int("SPECULATIVE_QUEUE_SIZE", 8)
+SPECULATIVE_WORKERS = env_int("SPECULATIVE_WORKERS", 3)
+# The `retrieving_agent` tag of the sources found by the per-claim searches.
+CLAIM_SEARCH_AGENT = "claim_search_agent"
+
+CLAIMS_ARRAY_START = re.compile(r'"claims"\s*:\s*\[')
+
+
+class ClaimStreamParser:
+    """Incrementally pulls completed claim strings out of streamed JSON text."""
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = None  # Index just past the last parsed element.
+        self.done = False
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, chunk: str) -> list[str]:
+        """Adds a chunk of model output and returns the claims it completed."""
+        self.buffer += chunk
+        if self.position is None:
+            match = CLAIMS_ARRAY_START.search(self.buffer)
+            if match is None:
+                return []
+            self.position = match.end()
+
+        claims = []
+        while not self.done:
+            rest = self.buffer[self.position :]
+            stripped = rest.lstrip(" \t\r\n,")
+            if not stripped:
+                break
+            start = self.position + len(rest) - len(stripped)
+            if stripped[0] == "]":
+                self.done = True
+                break
+            try:
+                claim, end = self._decoder.raw_decode(self.buffer, start)
+            except ValueError:
+                break  # The string isn't complete yet.
+            self.position = end
+            if isinstance(claim, str):
+                claims.append(claim)
+        return claims
+
+
+class SpeculativeRetriever:
+    """
+    Searches for claims as they arrive, through a bounded queue; claims past
+    the first `limit` (0 for no limit) aren't searched for.
+    """
+
+    def __init__(self, run_id: str, limit: int = MAX_CHECKED_CLAIMS):
+        self.run_id = run_id
+        self.limit = limit
+        self.queue = asyncio.Queue(maxsize=SPECULATIVE_QUEUE_SIZE)
+        self.results = {}
+        self.queued = set()
+        self.workers = [
+            asyncio.create_task(self._work()) for _ in range(SPECULATIVE_WORKERS)
+        ]
+
+    async def put(self, claim: str):
+        """Queues a claim, waiting if the searchers are falling behind."""
+        query = claim_query(claim)
+        if self.limit and len(self.queued) >= self.limit:
+            return
+        if query and query not in self.queued:
+            self.queued.add(query)
+            await self.queue.put(query)
+
+    async def _work(self):
+        while True:
+            query = await self.queue.get()
+            try:
+                self.results.update(await search_layer.search_many([query], self.run_id))
+            finally:
+                self.queue.task_done()
+
+    async def finish(self, timeout: float | None = None) -> dict:
+        """
+        Waits up to `timeout` seconds for the queued searches, then stops the
+        rest; returns the results so far, by query.
+        """
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.cancel()
+        return self.results
+
+    def sources(self, claims: list[str]) -> list[SourceItem]:
+        """
+        The sources found for `claims`, taken from each claim in turn and
+        tagged with every claim they were found for.
+        """
+        per_claim, by_key = [], {}
+        for claim in claims:
+            found = []
+            for source in sources_from_results(
+                self.results.get(claim_query(claim)), CLAIM_SEARCH_AGENT
+            ):
+                key = (source.domain, source.retrieved_quote)
+                if key in by_key:
+                    by_key[key].claims.append(claim)
+                    continue
+                by_key[key] = source
+                source.claims = [claim]
+                found.append(source)
+            per_claim.append(found)
+        return [
+            source
+            for source in chain.from_iterable(zip_longest(*per_claim))
+            if source is not None
+        ]
+
+    def cancel(self):
+        for worker in self.workers:
+            worker.cancel()
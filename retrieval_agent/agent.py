@@ -6,11 +6,17 @@ Step 2: Format them into {"sources":[{"url","outlet","why_reliable"}]}.
 from typing import List
 from pydantic import BaseModel, Field
 from google.adk.agents import Agent, SequentialAgent
-from google.adk.tools import google_search
 from google.adk.agents import Agent, SequentialAgent, ParallelAgent
 from google.adk.tools import google_search
 
-from retrieval_agent.prompt import FORMATTER_PROMPT, QUERY_AGENT_PROMPT
+from retrieval_agent.parser import SourceParserAgent
+from retrieval_agent.prompt import (
+    BUILTIN_QUERY_AGENT_PROMPT,
+    FORMATTER_PROMPT,
+    QUERY_AGENT_PROMPT,
+)
+from retrieval_agent.search import BUILTIN_SEARCH, search_web
+from shared.deadlines import SEARCH_DEADLINE_SECONDS, DeadlineAgent
 
 # -------------------------------------------------------------------
 # Output schema
@@ -22,6 +28,10 @@ class SourceItem(BaseModel):
     retrieved_quote: str
     published_date: str
     retrieving_agent: str
+    claims: List[str] = Field(
+        default_factory=list,
+        description="The claims the source is evidence for.",
+    )
 
 
 class SourcesOutput(BaseModel):
@@ -34,6 +44,14 @@ class SourcesOutput(BaseModel):
 
 # Assume SourcesOutput is already defined as in your previous prompt
 
+# Without Custom Search keys, the search agents ground themselves with
+# `google_search`, rather than pay for a second model call per search; see
+# `search.py`.
+if BUILTIN_SEARCH:
+    search_tool, search_prompt = google_search, BUILTIN_QUERY_AGENT_PROMPT
+else:
+    search_tool, search_prompt = search_web, QUERY_AGENT_PROMPT
+
 # The agents you already have
 positive_query_agent = Agent(
     name="positive_query_agent",
@@ -60,24 +78,24 @@ information_query_agent = Agent(
 positive_search_agent = Agent(
     name="search_agent",
     model="gemini-2.0-flash",
-    instruction=QUERY_AGENT_PROMPT + "{pos_q}",
-    tools=[google_search],
+    instruction=search_prompt + "{pos_q}",
+    tools=[search_tool],
     output_key="positive_search_results",
 )
 
 negative_search_agent = Agent(
     name="search_agent",
     model="gemini-2.0-flash",
-    instruction=QUERY_AGENT_PROMPT + "{neg_q}",
-    tools=[google_search],
+    instruction=search_prompt + "{neg_q}",
+    tools=[search_tool],
     output_key="negative_search_results",
 )
 
 neutral_search_agent = Agent(
     name="search_agent",
     model="gemini-2.0-flash",
-    instruction=QUERY_AGENT_PROMPT + "{info_q}",
-    tools=[google_search],
+    instruction=search_prompt + "{info_q}",
+    tools=[search_tool],
     output_key="neutral_search_results",
 )
 
@@ -100,20 +118,41 @@ neutral_agent = SequentialAgent(
 parallel_search_agent = ParallelAgent(
     name="query_generator_agent",
     description="Generates both positive and negative search queries in parallel.",
-    sub_agents=[pos_agent, neg_agent, neutral_agent],
+    sub_agents=[
+        # A branch that misses its deadline contributes no sources; the
+        # others go ahead without it.
+        DeadlineAgent(
+            name=f"{branch.name}_deadline",
+            agent=branch,
+            stage=stage,
+            seconds=SEARCH_DEADLINE_SECONDS,
+            fallback_state={output_key: ""},
+        )
+        for branch, stage, output_key in (
+            (pos_agent, "positive_search", "positive_search_results"),
+            (neg_agent, "negative_search", "negative_search_results"),
+            (neutral_agent, "neutral_search", "neutral_search_results"),
+        )
+    ],
 )
 
 formatter_agent = Agent(
     name="formatter_agent",
     model="gemini-2.0-flash",
-    instruction=FORMATTER_PROMPT
-    + " ### Positive Query Results\n {positive_search_results}  \n"
-    + "### Negative Query Results\n{negative_search_results} \n"
-    + "### Informational Query Results\n{neutral_search_results} \n",
+    # Only the branches the parser couldn't read; see `parser.py`.
+    instruction=FORMATTER_PROMPT + "{unparsed_search_results}\n",
     output_schema=SourcesOutput,
     output_key="sources_output",
 )
 
+# Parses the branches' source lists in Python; the LLM formatter above only
+# runs for the branches whose output can't be parsed.
+source_parser_agent = SourceParserAgent(
+    name="source_parser_agent",
+    fallback=formatter_agent,
+    description="Turns the search branches' source lists into SourcesOutput.",
+)
+
 # Step 2: Combine all agents into a single SequentialAgent
 # This agent takes the output from the previous step and passes it to the next
 # in a sequential flow.
@@ -122,7 +161,7 @@ full_analysis_agent = SequentialAgent(
     description="A complete pipeline for generating opposing views and compiling them into a final report.",
     sub_agents=[
         parallel_search_agent,
-        formatter_agent,
+        source_parser_agent,
     ],
 )
 
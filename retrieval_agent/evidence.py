@@ -0,0 +1,260 @@
+"""
+A shared evidence pool per article.
+
+Claims from one article usually share entities and topics, so a source found
+for one claim is often evidence for others too. With EVIDENCE_POOL on, every
+source retrieved for an article goes into one pool (kept for
+EVIDENCE_POOL_TTL seconds, by article URL), indexed in a small inverted index
+by its terms: keyword stems and figures, plus the named entities (runs of
+capitalized words) in its quote.
+
+A source belongs to a claim when it was searched for that claim (the
+per-claim searches of pipelined extraction and of the pool itself), or when
+the claim's terms turn up in its quote: the IDF-weighted share of the claim's
+terms it contains is at least MIN_EVIDENCE_MATCH. Claims with fewer than
+MIN_CLAIM_SOURCES sources have thin coverage. The search agents only run
+when most of the checked claims are thin (on an article's first run, all of
+them); otherwise, and for claims still thin after them, each thin claim is
+searched for directly, without a model call. `select` picks the sources
+handed on, round-robin across claims, each tagged with the claims it is
+evidence for.
+"""
+
+import math
+import re
+import threading
+from collections import defaultdict
+
+from retrieval_agent.parser import MAX_SOURCES, sources_from_results
+from retrieval_agent.search import claim_query, search_layer
+from shared.config import env_flag, env_float, env_int
+from shared.keys import canonical_url, claim_key
+from shared.schemas import SourceItem, validate
+from shared.store import get_store
+
+EVIDENCE_POOL = env_flag("EVIDENCE_POOL")
+EVIDENCE_POOL_TTL = env_int("EVIDENCE_POOL_TTL", 6 * 60 * 60)
+MIN_CLAIM_SOURCES = env_int("MIN_CLAIM_SOURCES", 3)
+# IDF-weighted share of a claim's terms a source must contain to count for it.
+MIN_EVIDENCE_MATCH = env_float("MIN_EVIDENCE_MATCH", 0.35)
+# The search agents run when more than this share of the claims is thin.
+MAX_THIN_SHARE = 0.5
+# Oldest sources are dropped past this many per article.
+MAX_POOL_SOURCES = 200
+POOL_AGENT = "evidence_pool_agent"
+
+WORD = re.compile(r"[A-Za-z0-9][\w'%.-]*")
+# Runs of capitalized words ("Department of Health") are entities.
+ENTITY = re.compile(r"\b[A-Z][\w'-]*(?:\s+(?:of\s+|the\s+)?[A-Z][\w'-]*)+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his in is it its of on or "
+    "said says she that the their they this to was were will with".split()
+)
+STEM_CHARS = 6
+
+pools = get_store("evidence")
+_stats = {
+    "runs": 0,
+    "claims": 0,
+    "claims_covered_on_arrival": 0,
+    "retrieval_runs": 0,
+    "retrieval_runs_skipped": 0,
+    "claim_searches": 0,
+    "sources_shared": 0,
+}
+_lock = threading.Lock()
+
+
+def _count(key: str, amount: int = 1):
+    with _lock:
+        _stats[key] += amount
+
+
+def terms(text: str) -> frozenset[str]:
+    """Keyword stems and entities of `text`, the pool's index terms."""
+    found = set()
+    for word in WORD.findall(text):
+        word = word.lower().strip(".,'")
+        if len(word) > 2 and word not in STOPWORDS:
+            found.add(word[:STEM_CHARS])
+    for match in ENTITY.finditer(text):
+        entity = match.group(0).lower().removeprefix("the ")
+        if " " in entity:
+            found.add("=" + entity)
+    return frozenset(found)
+
+
+class EvidencePool:
+    """The sources retrieved for one article, indexed by claim and by term."""
+
+    def __init__(self):
+        self.sources: list[SourceItem] = []
+        self.source_terms: list[frozenset[str]] = []
+        self.index: dict[str, set[int]] = defaultdict(set)
+        # Sources searched for each claim, by `claim_key`.
+        self.found_for: dict[str, set[int]] = defaultdict(set)
+        self._keys: dict[tuple, int] = {}
+
+    def add(self, source: SourceItem, claim: str | None = None) -> int:
+        """Adds a source (once per domain and quote); returns its id."""
+        key = (source.domain, source.retrieved_quote)
+        position = self._keys.get(key)
+        if position is None:
+            position = len(self.sources)
+            self._keys[key] = position
+            self.sources.append(source)
+            self.source_terms.append(terms(source.retrieved_quote))
+            for term in self.source_terms[position]:
+                self.index[term].add(position)
+        if claim is not None:
+            self.found_for[claim_key(claim)].add(position)
+        return position
+
+    def add_results(self, claims: list[str], results_by_query: dict):
+        """Adds search results gathered per claim, keyed by `claim_query`."""
+        for claim in claims:
+            for source in sources_from_results(results_by_query.get(claim_query(claim)), POOL_AGENT):
+                self.add(source, claim)
+
+    def _idf(self, term: str) -> float:
+        return math.log(1 + (len(self.sources) + 1) / (len(self.index.get(term, ())) + 1))
+
+    def matches(self, claim: str) -> list[int]:
+        """The ids of the sources that are evidence for `claim`, best first."""
+        found = self.found_for.get(claim_key(claim), set())
+        claim_terms = terms(claim)
+        weights = {term: self._idf(term) for term in claim_terms}
+        total = sum(weights.values())
+        scores = defaultdict(float)
+        for term in claim_terms:
+            for position in self.index.get(term, ()):
+                scores[position] += weights[term]
+        ranked = sorted(scores, key=lambda position: (position in found, scores[position]), reverse=True)
+        matched = [
+            position
+            for position in ranked
+            if position in found or scores[position] >= MIN_EVIDENCE_MATCH * total
+        ]
+        # Searched for the claim, but quoted in other words.
+        return matched + sorted(found.difference(scores))
+
+    def thin_claims(self, claims: list[str]) -> list[str]:
+        """The claims with fewer than MIN_CLAIM_SOURCES sources."""
+        return [claim for claim in claims if len(self.matches(claim)) < MIN_CLAIM_SOURCES]
+
+    async def search(self, claims: list[str], run_id: str = ""):
+        """Searches for each claim directly and adds what it finds."""
+        queries = {claim_query(claim) for claim in claims}
+        _count("claim_searches", len(queries))
+        results = await search_layer.search_many(list(queries), run_id)
+        self.add_results(claims, results)
+
+    def select(
+        self, claims: list[str], limit: int = MAX_SOURCES, fresh: set[int] = frozenset()
+    ) -> list[SourceItem]:
+        """
+        Up to `limit` sources for `claims`, taken from each claim's matches in
+        turn and tagged with every claim they are evidence for. `fresh`
+        sources (retrieved in this run) that match no claim fill any room left.
+        """
+        matched = {claim: self.matches(claim) for claim in claims}
+        tagged = defaultdict(list)
+        for claim, positions in matched.items():
+            for position in positions:
+                tagged[position].append(claim)
+        chosen, seen = [], set()
+        queues = [list(positions) for positions in matched.values()]
+        while len(chosen) < limit and any(queues):
+            for queue in queues:
+                while queue and queue[0] in seen:
+                    queue.pop(0)
+                if queue and len(chosen) < limit:
+                    seen.add(queue[0])
+                    chosen.append(queue.pop(0))
+        for position in sorted(fresh):
+            if len(chosen) >= limit:
+                break
+            if position not in seen:
+                seen.add(position)
+                chosen.append(position)
+        _count("sources_shared", sum(len(tagged[position]) > 1 for position in chosen))
+        return [self._tagged(self.sources[position], tagged[position]) for position in chosen]
+
+    @staticmethod
+    def _tagged(source: SourceItem, claims: list[str]) -> SourceItem:
+        return SourceItem(
+            domain=source.domain,
+            retrieved_quote=source.retrieved_quote,
+            published_date=source.published_date,
+            retrieving_agent=source.retrieving_agent,
+            claims=claims,
+        )
+
+    def to_dict(self) -> dict:
+        start = max(len(self.sources) - MAX_POOL_SOURCES, 0)
+        return {
+            "sources": [
+                {
+                    "domain": source.domain,
+                    "retrieved_quote": source.retrieved_quote,
+                    "published_date": source.published_date,
+                    "retrieving_agent": source.retrieving_agent,
+                }
+                for source in self.sources[start:]
+            ],
+            "found_for": {
+                key: [position - start for position in positions if position >= start]
+                for key, positions in self.found_for.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EvidencePool":
+        pool = cls()
+        for item in data.get("sources", []):
+            pool.add(validate(SourceItem, item))
+        for key, positions in data.get("found_for", {}).items():
+            pool.found_for[key] = {p for p in positions if 0 <= p < len(pool.sources)}
+        return pool
+
+
+def pool_key(state) -> str | None:
+    """Pools are kept by article URL, or by page content when there is none."""
+    url = state.get("source_url")
+    return canonical_url(url) if url else state.get("content_hash")
+
+
+def load_pool(key: str | None) -> EvidencePool:
+    data = pools.get(key) if key else None
+    return EvidencePool.from_dict(data) if data else EvidencePool()
+
+
+def save_pool(key: str | None, pool: EvidencePool):
+    if key:
+        pools.set(key, pool.to_dict(), ttl=EVIDENCE_POOL_TTL)
+
+
+def needs_retrieval(pool: EvidencePool, claims: list[str]) -> bool:
+    """Whether the search agents should run, or per-claim searches will do."""
+    thin = pool.thin_claims(claims)
+    with _lock:
+        _stats["runs"] += 1
+        _stats["claims"] += len(claims)
+        _stats["claims_covered_on_arrival"] += len(claims) - len(thin)
+    run = not claims or len(thin) > MAX_THIN_SHARE * len(claims)
+    _count("retrieval_runs" if run else "retrieval_runs_skipped")
+    return run
+
+
+def stats() -> dict:
+    with _lock:
+        counts = dict(_stats)
+    claims = counts["claims"] or 1
+    runs = counts["runs"] or 1
+    return {
+        **counts,
+        "covered_on_arrival_rate": round(counts["claims_covered_on_arrival"] / claims, 3),
+        "retrieval_skip_rate": round(counts["retrieval_runs_skipped"] / runs, 3),
+        "claim_searches_per_run": round(counts["claim_searches"] / runs, 2),
+    }
+
@@ -0,0 +1,266 @@
+"""
+Deterministic parsing of the search branches' source lists.
+
+The search agents write their findings as plain-text blocks in the format
+from `QUERY_AGENT_PROMPT`:
+
+    Domain: https://www.cdc.gov
+    Published Date: 2023-09-15
+    Verdict: The CDC report disproves the claim ...
+    Stance: refuting
+
+`parse_source_blocks` turns those blocks into `SourceItem` records, tolerating
+markdown bullets and bold labels, label variants, wrapped lines and assorted
+date formats.
+`SourceParserAgent` writes the result to `sources_output`. A branch whose
+output can't be parsed goes to the LLM formatter on its own; the branches
+that parsed are kept as they are.
+"""
+
+import datetime
+import re
+from itertools import chain, zip_longest
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from evaluator_agent.profiles import lookup_domain
+from shared.blobs import resolve
+from shared.config import env_int
+from shared.keys import normalize_domain
+from shared.schemas import SourceItem, SourcesOutput, dumps, to_builtins
+from shared.state import read_state
+
+MAX_SOURCES = env_int("MAX_SOURCES", 15)
+# Branch state keys, and the `retrieving_agent` tag their sources get.
+BRANCHES = {
+    "positive_search_results": "positive_search_agent",
+    "negative_search_results": "negative_search_agent",
+    "neutral_search_results": "neutral_search_agent",
+}
+# The headings the LLM formatter gets each branch's output under.
+BRANCH_HEADINGS = {
+    "positive_search_results": "Positive Query Results",
+    "negative_search_results": "Negative Query Results",
+    "neutral_search_results": "Informational Query Results",
+}
+FIELD_ALIASES = {
+    "domain": "domain",
+    "source": "domain",
+    "url": "domain",
+    "website": "domain",
+    "published date": "published_date",
+    "publication date": "published_date",
+    "date": "published_date",
+    "verdict": "retrieved_quote",
+    "verdict summary": "retrieved_quote",
+    "summary": "retrieved_quote",
+    "original claim": "original_claim",
+    "original query": "original_claim",
+    "query": "original_claim",
+    "stance": "stance",
+}
+FIELD_LINE = re.compile(r"^[\s\-*•>\d.)]*\**([A-Za-z ]+?)\**\s*:\**\s*(.*)$")
+# Headings and rules end a field; other lines under it continue it.
+FIELD_BREAK = re.compile(r"^\s*(?:#|[-*_=]{3,}\s*$)")
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%b. %d, %Y",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%m/%d/%Y",
+    "%B %Y",
+    "%b %Y",
+    "%Y-%m",
+    "%Y",
+)
+
+
+def normalize_date(value: str) -> str:
+    """Returns a date as YYYY-MM-DD (or a shorter ISO prefix), or "Unknown"."""
+    value = value.strip().strip("*`").strip()
+    iso = re.match(r"\d{4}-\d{2}-\d{2}", value)
+    if iso:
+        return iso.group(0)
+    value = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", value)
+    value = re.sub(r"\bSept\b", "Sep", value)
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if fmt in ("%B %Y", "%b %Y", "%Y-%m"):
+            return parsed.strftime("%Y-%m")
+        if fmt == "%Y":
+            return parsed.strftime("%Y")
+        return parsed.strftime("%Y-%m-%d")
+    return "Unknown"
+
+
+def clean_domain(value: str) -> str:
+    domain = normalize_domain(value)
+    return lookup_domain(domain) or domain
+
+
+def parse_source_blocks(text: str, retrieving_agent: str) -> list[SourceItem]:
+    """
+    Parses one branch's output into `SourceItem` records. A label seen twice
+    starts the next block. Within a block, a second label for the same field
+    adds to the quote ("Verdict" and "Summary") or is ignored. Unlabelled or
+    further indented lines continue the field above them; other labels end it.
+    """
+    blocks, current, labels = [], {}, set()
+    last, last_indent = None, 0
+    for line in (text or "").splitlines():
+        if not line.strip() or FIELD_BREAK.match(line):
+            last = None
+            continue
+        indent = len(line) - len(line.lstrip())
+        match = FIELD_LINE.match(line)
+        label = match.group(1).strip().lower() if match else ""
+        field = FIELD_ALIASES.get(label)
+        if last is not None and (match is None or indent > last_indent):
+            current[last] = f"{current[last]} {line.strip()}".strip()
+            continue
+        if field is None:
+            # Labels we don't read ("Author:") end the field above.
+            last = None
+            continue
+        if label in labels:
+            blocks.append(current)
+            current, labels = {}, set()
+        labels.add(label)
+        value = match.group(2).strip().strip("*`").strip()
+        if field not in current:
+            current[field] = value
+        elif field == "retrieved_quote":
+            current[field] = f"{current[field]} {value}".strip()
+        else:
+            last = None
+            continue
+        last, last_indent = field, indent
+    if current:
+        blocks.append(current)
+
+    sources = []
+    for block in blocks:
+        if not block.get("domain") or not block.get("retrieved_quote"):
+            continue
+        sources.append(
+            SourceItem(
+                domain=clean_domain(block["domain"]),
+                retrieved_quote=block["retrieved_quote"],
+                published_date=normalize_date(block.get("published_date", "")),
+                retrieving_agent=retrieving_agent,
+            )
+        )
+    return sources
+
+
+def sources_from_results(results, retrieving_agent: str) -> list[SourceItem]:
+    """Turns one query's `search_layer` results into `SourceItem` records."""
+    sources = []
+    for result in results if isinstance(results, list) else []:
+        if not isinstance(result, dict):
+            continue
+        if "text" in result:
+            # Grounded search answers in the search agents' block format.
+            sources += parse_source_blocks(result["text"], retrieving_agent)
+            continue
+        quote = result.get("snippet") or result.get("title")
+        if result.get("domain") and quote:
+            sources.append(
+                SourceItem(
+                    domain=clean_domain(result["domain"]),
+                    retrieved_quote=quote,
+                    published_date=normalize_date(result.get("published_date", "")),
+                    retrieving_agent=retrieving_agent,
+                )
+            )
+    return sources
+
+
+def merge_sources(source_lists, limit: int = MAX_SOURCES) -> list[SourceItem]:
+    """Takes sources from each list in turn, once per domain and quote, up to `limit`."""
+    merged, seen = [], set()
+    for source in chain.from_iterable(zip_longest(*source_lists)):
+        if source is None:
+            continue
+        key = (source.domain, source.retrieved_quote)
+        if key not in seen:
+            seen.add(key)
+            merged.append(source)
+    return merged[:limit]
+
+
+def parse_sources(state) -> tuple[dict[str, list[SourceItem]], list[str]]:
+    """
+    Parses every branch in `state`. Returns the sources of each branch that
+    parsed, by state key, and the keys of the branches that produced output
+    but no parseable sources.
+    """
+    parsed, unparsed = {}, []
+    for key, agent in BRANCHES.items():
+        text = str(resolve(state.get(key)) or "")
+        sources = parse_source_blocks(text, agent)
+        if text.strip() and not sources:
+            unparsed.append(key)
+        else:
+            parsed[key] = sources
+    return parsed, unparsed
+
+
+class SourceParserAgent(BaseAgent):
+    """
+    Formats the search branches' output. The branches that can't be parsed
+    go to the LLM formatter, in one call, as `unparsed_search_results`; its
+    sources are merged with the parsed ones.
+    """
+
+    fallback: BaseAgent
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, name: str, fallback: BaseAgent, **kwargs):
+        super().__init__(name=name, fallback=fallback, sub_agents=[fallback], **kwargs)
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        parsed, unparsed = parse_sources(state)
+        per_branch = list(parsed.values())
+        if unparsed:
+            # Blob references stay as they are; the prompt resolves them.
+            sections = [f"### {BRANCH_HEADINGS[key]}\n{state.get(key)}" for key in unparsed]
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(
+                    state_delta={"unparsed_search_results": "\n\n".join(sections)}
+                ),
+            )
+            async for event in self.fallback.run_async(ctx):
+                yield event
+            formatted = read_state(
+                ctx.session.state.get("sources_output"), SourcesOutput, SourcesOutput()
+            ).sources
+            if len(unparsed) == 1:
+                for source in formatted:
+                    source.retrieving_agent = BRANCHES[unparsed[0]]
+            per_branch.append(formatted)
+        sources = SourcesOutput(merge_sources(per_branch))
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=dumps(sources))]),
+            actions=EventActions(state_delta={"sources_output": to_builtins(sources)}),
+        )
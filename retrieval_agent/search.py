@@ -0,0 +1,375 @@
+"""
+Shared, cached web search for the retrieval branches.
+
+The positive, negative and informational search agents call `search_web`
+instead of searching on their own. Queries that differ only in case and
+spacing collapse into one, identical queries from concurrent branches share a
+single backend call, and results are cached across runs. Queries about
+developing news are cached for much less time than evergreen ones.
+
+The backend is chosen with SEARCH_BACKEND:
+    custom_search  Google Programmable Search JSON API (GOOGLE_SEARCH_API_KEY,
+                   GOOGLE_SEARCH_ENGINE_ID). Default when both are set.
+    builtin        The search agents keep the built-in `google_search` tool,
+                   without dedupe or caching. Default otherwise.
+    grounded       A small Gemini agent with the `google_search` tool, one call
+                   per batch of queries (a branch's `search_web` call). Adds
+                   that model call in front of each branch's uncached
+                   searches, in exchange for the dedupe and cache.
+    local          Canned results from the JSON file at SEARCH_FIXTURES, for
+                   tests and load runs.
+
+The per-claim searches (pipelined extraction, the evidence pool) always go
+through the search layer; with `builtin`, they use the grounded backend.
+"""
+
+import asyncio
+import datetime
+import json
+import os
+import re
+import threading
+import urllib.parse
+import urllib.request
+
+from google.adk.agents import Agent
+from google.adk.tools import google_search
+from google.adk.tools.tool_context import ToolContext
+
+from shared.budget import install_budget_callbacks
+from shared.cancellation import check_cancelled, install_cancel_callbacks
+from shared.config import env_int
+from shared.one_shot import OneShotAgent
+from shared.store import get_store
+
+SEARCH_TTL = env_int("SEARCH_TTL", 24 * 60 * 60)
+SEARCH_FRESH_TTL = env_int("SEARCH_FRESH_TTL", 15 * 60)
+MAX_RESULTS_PER_QUERY = 5
+# Search engines ignore words past a certain query length.
+MAX_QUERY_WORDS = 32
+# Results published this recently mark a developing story.
+FRESH_RESULT_DAYS = 2
+
+RECENCY_TERMS = frozenset(
+    "today yesterday tonight latest breaking live now current currently "
+    "new update updates week recent recently developing".split()
+)
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercases a query and collapses its whitespace; word order is kept."""
+    return " ".join(query.lower().split())
+
+
+def claim_query(claim: str) -> str:
+    """Searches for a claim by its own words."""
+    return " ".join(claim.split()[:MAX_QUERY_WORDS])
+
+
+def _is_recent(published_date: str) -> bool:
+    try:
+        published = datetime.date.fromisoformat((published_date or "")[:10])
+    except ValueError:
+        return False
+    return (datetime.date.today() - published).days <= FRESH_RESULT_DAYS
+
+
+def cache_ttl(query: str, results: list[dict]) -> int:
+    """Returns how long results stay cached: short for developing news."""
+    words = set(TOKEN.findall(query.lower()))
+    this_year = str(datetime.date.today().year)
+    if words & RECENCY_TERMS or this_year in words:
+        return SEARCH_FRESH_TTL
+    if any(_is_recent(result.get("published_date", "")) for result in results):
+        return SEARCH_FRESH_TTL
+    return SEARCH_TTL
+
+
+class CustomSearchBackend:
+    """Google Programmable Search JSON API."""
+
+    URL = "https://www.googleapis.com/customsearch/v1"
+
+    def __init__(self, api_key: str, engine_id: str):
+        self.api_key = api_key
+        self.engine_id = engine_id
+
+    def _search(self, query: str) -> list[dict]:
+        params = urllib.parse.urlencode(
+            {"key": self.api_key, "cx": self.engine_id, "q": query, "num": MAX_RESULTS_PER_QUERY}
+        )
+        with urllib.request.urlopen(f"{self.URL}?{params}", timeout=10) as response:
+            items = json.loads(response.read().decode("utf-8")).get("items", [])
+        results = []
+        for item in items:
+            metatags = (item.get("pagemap", {}).get("metatags") or [{}])[0]
+            results.append(
+                {
+                    "title": item.get("title", ""),
+                    "url": item.get("link", ""),
+                    "domain": item.get("displayLink", ""),
+                    "snippet": item.get("snippet", ""),
+                    "published_date": metatags.get("article:published_time", ""),
+                }
+            )
+        return results
+
+    async def search(self, query: str) -> list[dict]:
+        return await asyncio.to_thread(self._search, query)
+
+
+GROUNDED_SEARCH_PROMPT = """
+Use the google_search tool to search for each of the queries you are given, one per line. For each query, list up to 5 relevant, reputable results, giving each result's domain, published date and a one-sentence summary. Start each query's results with the query itself, exactly as given, in this format:
+
+Query: the query
+Domain: https://www.example.com
+Published Date: 2023-10-01
+Summary: What the page says about the query.
+"""
+QUERY_LINE = re.compile(r"^[\s\-*#>]*\**Query\**\s*:\**\s*(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+def split_by_query(text: str, queries: list[str]) -> dict:
+    """Splits a grounded answer into each query's results, by its "Query:" lines."""
+    by_key = {normalize_query(query): query for query in queries}
+    found = {}
+    matches = list(QUERY_LINE.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        query = by_key.get(normalize_query(match.group(1).strip("*`\"'")))
+        section = text[match.end() : following.start() if following else len(text)].strip()
+        if query is not None and section:
+            found[query] = [{"text": section}]
+    if not matches and len(queries) == 1 and text.strip():
+        found[queries[0]] = [{"text": text}]
+    return found
+
+
+class GroundedSearchBackend:
+    """
+    Runs queries through a small Gemini agent that has `google_search`, a
+    batch at a time. Its model calls count against the run's budget and stop
+    when the run is cancelled, like the pipeline's own.
+    """
+
+    def __init__(self):
+        agent = Agent(
+            name="grounded_search_agent",
+            model="gemini-2.0-flash",
+            instruction=GROUNDED_SEARCH_PROMPT,
+            tools=[google_search],
+        )
+        install_cancel_callbacks(agent)
+        install_budget_callbacks(agent)
+        self.agent = OneShotAgent(agent)
+
+    async def search(self, query: str) -> list[dict]:
+        return (await self.search_batch([query])).get(query, [])
+
+    async def search_batch(self, queries: list[str]) -> dict:
+        """Searches for every query in one model call; returns the results by query."""
+        text = await self.agent.run("\n".join(queries))
+        return split_by_query(text or "", queries)
+
+
+class LocalSearchBackend:
+    """
+    Canned results for tests. The fixture file maps queries to lists of
+    results; lookups go by normalized query, so case and spacing don't matter.
+    A "*" entry, if present, answers every query that has no entry of its own.
+    """
+
+    def __init__(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            fixtures = json.load(f)
+        self.default = fixtures.pop("*", [])
+        self.results = {normalize_query(query): results for query, results in fixtures.items()}
+        self.calls = 0
+
+    async def search(self, query: str) -> list[dict]:
+        self.calls += 1
+        return self.results.get(normalize_query(query), self.default)
+
+
+def search_backend_name() -> str:
+    backend = os.environ.get("SEARCH_BACKEND")
+    if backend:
+        return backend
+    if os.environ.get("GOOGLE_SEARCH_API_KEY") and os.environ.get("GOOGLE_SEARCH_ENGINE_ID"):
+        return "custom_search"
+    return "builtin"
+
+
+# Whether the search agents use the built-in `google_search` tool directly.
+BUILTIN_SEARCH = search_backend_name() == "builtin"
+
+
+def default_backend():
+    backend = search_backend_name()
+    if backend == "local":
+        return LocalSearchBackend(os.environ["SEARCH_FIXTURES"])
+    if backend == "custom_search":
+        return CustomSearchBackend(
+            os.environ.get("GOOGLE_SEARCH_API_KEY"), os.environ.get("GOOGLE_SEARCH_ENGINE_ID")
+        )
+    return GroundedSearchBackend()
+
+
+class SearchLayer:
+    """
+    Normalizes, dedupes and caches queries in front of a search backend.
+
+    Counts every query it sees: duplicates (repeated within one run, by any
+    branch), cache hits (answered from an earlier run) and backend calls, and
+    the backend calls cancelled because every run waiting on them was.
+    """
+
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache if cache is not None else get_store("search")
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._waiters: dict[str, int] = {}
+        self._seen_by_run: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self.counts = {
+            "queries": 0,
+            "duplicates": 0,
+            "cache_hits": 0,
+            "backend_calls": 0,
+            "cancelled": 0,
+        }
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _first_in_run(self, run_id: str, key: str) -> bool:
+        with self._lock:
+            if len(self._seen_by_run) > 1000:
+                self._seen_by_run.clear()
+            seen = self._seen_by_run.setdefault(run_id, set())
+            first = key not in seen
+            seen.add(key)
+            return first
+
+    async def search(self, query: str, run_id: str = "") -> list[dict]:
+        key = normalize_query(query)
+        self._count("queries")
+        if not self._first_in_run(run_id, key):
+            self._count("duplicates")
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count("cache_hits")
+            return cached
+
+        # Concurrent branches asking the same thing wait on one backend call,
+        # which runs until the last of them stops waiting.
+        pending = self._in_flight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._search_backend(key, query))
+            self._in_flight[key] = pending
+            self._waiters[key] = 0
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(pending)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                if self._in_flight.get(key) is pending:
+                    del self._in_flight[key]
+                if not pending.done():
+                    self._count("cancelled")
+                    pending.cancel()
+
+    async def _search_backend(self, key: str, query: str) -> list[dict]:
+        self._count("backend_calls")
+        results = await self.backend.search(query)
+        self.cache.set(key, results, ttl=cache_ttl(query, results))
+        return results
+
+    def _start_batch(self, queries: list[str]):
+        """
+        Starts one backend call for the queries that are neither cached nor
+        in flight, for backends that search in batches. Each query gets its
+        own in-flight future, so `search` waits on it like on a single call;
+        the batch is cancelled once nobody waits on any of its queries.
+        """
+        batch = {}
+        for query in queries:
+            key = normalize_query(query)
+            if key not in batch and key not in self._in_flight and self.cache.get(key) is None:
+                batch[key] = query
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in batch}
+        task = asyncio.ensure_future(self._search_backend_batch(batch, futures))
+
+        def cancel_when_unwanted(_):
+            if all(future.cancelled() for future in futures.values()):
+                task.cancel()
+
+        for key, future in futures.items():
+            future.add_done_callback(cancel_when_unwanted)
+            self._in_flight[key] = future
+            self._waiters[key] = 0
+
+    async def _search_backend_batch(self, batch: dict, futures: dict):
+        self._count("backend_calls")
+        try:
+            found = await self.backend.search_batch(list(batch.values()))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, query in batch.items():
+            results = found.get(query, [])
+            if results:
+                # A query the answer skipped is searched for again next time.
+                self.cache.set(key, results, ttl=cache_ttl(query, results))
+            if not futures[key].done():
+                futures[key].set_result(results)
+
+    async def search_many(self, queries: list[str], run_id: str = "") -> dict:
+        unique = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+        if hasattr(self.backend, "search_batch"):
+            self._start_batch(unique)
+        results = await asyncio.gather(
+            *(self.search(query, run_id) for query in unique), return_exceptions=True
+        )
+        return {
+            query: (
+                {"error": f"{type(result).__name__}: {result}"}
+                if isinstance(result, Exception)
+                else result
+            )
+            for query, result in zip(unique, results)
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        queries = counts["queries"] or 1
+        return {
+            **counts,
+            "duplicate_rate": round(counts["duplicates"] / queries, 3),
+            "cache_hit_rate": round(counts["cache_hits"] / queries, 3),
+        }
+
+
+search_layer = SearchLayer(default_backend())
+
+
+async def search_web(queries: list[str], tool_context: ToolContext) -> dict:
+    """
+    Searches the web for every query in `queries` at once.
+
+    Params:
+    queries : list[str] All of the search queries to run, in a single call.
+
+    Returns a dictionary mapping each query to its list of results.
+    """
+    check_cancelled()
+    return await search_layer.search_many(queries, run_id=tool_context.invocation_id)
@@ -0,0 +1,379 @@
+"""
+API server for the fact-checking pipeline.
+
+Serves the standard ADK API (`/run`, sessions, ...) for every agent in this
+directory, plus an asynchronous job API for `master_agent`:
+
+    POST /jobs                  submit {"url", "text"?, "image_urls"?, "claims"?} -> job
+    POST /analyze               the same request, answered with just the result once
+                                the job is done (result-only mode, see below)
+    GET  /jobs/stats            queue depth, running jobs, oldest queued age
+    GET  /jobs/{job_id}         poll a job's status and result
+    DELETE /jobs/{job_id}       withdraw a request for a job (cancels it once
+                                every request that joined it is withdrawn)
+    GET  /jobs/{job_id}/stream  server-sent events with every status update
+    GET  /jobs/{job_id}/result  the job's result alone; 202 with its status until done
+    GET  /search/stats          search query duplicate and cache-hit rates
+    GET  /reputation/stats      domain research batching and cache-hit rates
+    GET  /evidence/stats        claims covered by the evidence pool and searches skipped
+    GET  /cancellation/stats    runs cancelled and the work that saved
+    GET  /debug/runtime         event-loop lag and RSS of this process
+
+The result-only responses (`shared/responses.py`) carry the final
+`ClaimsOutput` and a little metadata instead of every event of the run. They
+are gzipped for clients that accept it and have an ETag: send it back in
+If-None-Match and an unchanged result is answered with an empty 304.
+
+Run it with `uvicorn server:app --port 8000`. To run several worker processes,
+give them a shared session database and store:
+
+    STORE_BACKEND=sqlite SESSION_DB_URL=sqlite:///sessions.db \
+        uvicorn server:app --port 8000 --workers 4
+
+Any worker can then continue any session and answer for any job. Jobs that
+nobody polls or streams for JOB_ABANDON_SECONDS are cancelled, and so are
+`/run` and `/run_sse` requests whose client disconnects. With
+LOADTEST_STANDINS set, the model and search are replaced by the stand-ins in
+`loadtest/standins.py`. GET /debug/runtime (event-loop lag and RSS, for the
+load tester) is only served with LOADTEST_STANDINS or DEBUG_ENDPOINTS set.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from typing import List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from google.adk.cli.fast_api import get_fast_api_app
+from google.adk.runners import Runner
+from google.adk.sessions import DatabaseSessionService, InMemorySessionService
+from google.genai import types
+from pydantic import BaseModel
+
+from shared.config import env_flag, env_int
+
+if env_flag("LOADTEST_STANDINS"):
+    # Must run before the agents are imported.
+    from loadtest import standins
+
+    standins.install()
+
+from evaluator_agent.profiles import reputation_batcher
+from master_agent.agent import root_agent
+from retrieval_agent import evidence
+from retrieval_agent.search import search_layer
+from shared import cancellation
+from shared.cancellation import CancelScope
+from shared.jobs import CANCELLED, DONE, FAILED, Job, JobManager, QueueFullError
+from shared.responses import compact_result, json_response, result_etag
+from shared.runtime import LoopLagMonitor
+from shared.schemas import dumps
+from shared.state import parse_json_state
+from shared.store import STORE_BACKEND, enable_wal, get_store
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_NAME = "master_agent"
+JOB_USER_ID = "jobs"
+JOB_WORKERS = env_int("JOB_WORKERS", 4)
+JOB_QUEUE_SIZE = env_int("JOB_QUEUE_SIZE", 100)
+JOB_RETENTION = env_int("JOB_RETENTION", 600)
+# The extension polls every 1.5 seconds; 0 keeps unpolled jobs running.
+JOB_ABANDON_SECONDS = env_int("JOB_ABANDON_SECONDS", 30)
+# ADK endpoints whose runs are cancelled when the client disconnects.
+RUN_PATHS = ("/run", "/run_sse")
+# How often a waiting `/analyze` request checks that its client is still there.
+DISCONNECT_CHECK_SECONDS = 1.0
+# Shared by all worker processes; sessions stay in memory when unset.
+SESSION_DB_URL = os.environ.get("SESSION_DB_URL", "")
+SQLITE_URL_PREFIX = "sqlite:///"
+# How often a job stream polls the store for a job another worker is running.
+REMOTE_JOB_POLL_SECONDS = 1.0
+# Process internals are only exposed for load runs and local debugging.
+DEBUG_ENDPOINTS = env_flag("DEBUG_ENDPOINTS") or env_flag("LOADTEST_STANDINS")
+
+if SESSION_DB_URL.startswith(SQLITE_URL_PREFIX):
+    # Lets workers read sessions while another one is writing.
+    enable_wal(SESSION_DB_URL[len(SQLITE_URL_PREFIX) :])
+
+app = get_fast_api_app(
+    agent_dir=AGENT_DIR, session_db_url=SESSION_DB_URL, allow_origins=["*"], web=False
+)
+
+if SESSION_DB_URL:
+    session_service = DatabaseSessionService(db_url=SESSION_DB_URL)
+else:
+    session_service = InMemorySessionService()
+runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=session_service)
+loop_monitor = LoopLagMonitor()
+
+if DEBUG_ENDPOINTS:
+
+    @app.middleware("http")
+    async def start_loop_monitor(request, call_next):
+        loop_monitor.start()
+        return await call_next(request)
+
+    @app.get("/debug/runtime")
+    async def runtime_stats():
+        return loop_monitor.snapshot()
+
+
+class CancelOnDisconnect:
+    """
+    ASGI middleware that runs `/run` and `/run_sse` requests in a cancel scope
+    and cancels it when the client disconnects, so the pipeline stops instead
+    of finishing a run nobody will read.
+    """
+
+    def __init__(self, app, paths=RUN_PATHS):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Read the body first, so `receive` is free to watch for the disconnect.
+        body = []
+        while not body or body[-1].get("more_body"):
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.append(message)
+        disconnected = asyncio.Event()
+        cancel_scope = CancelScope()
+
+        async def watch():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+            cancel_scope.cancel()
+
+        async def replay():
+            if body:
+                return body.pop(0)
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        watcher = asyncio.create_task(watch())
+        cancel_scope.enter()
+        try:
+            await self.app(scope, replay, send)
+            cancel_scope.finish()
+        except asyncio.CancelledError:
+            if not cancel_scope.cancelled:
+                raise
+            asyncio.current_task().uncancel()
+        finally:
+            watcher.cancel()
+
+
+app.add_middleware(CancelOnDisconnect)
+
+
+class JobRequest(BaseModel):
+    url: str
+    text: Optional[str] = None
+    image_urls: List[str] = []
+    # Claims to check instead of extracting them, e.g. a previous result's
+    # `unchecked_claims`.
+    claims: List[str] = []
+
+
+async def run_pipeline(job: Job) -> dict:
+    """Runs `master_agent` for a job in a fresh session and returns its result."""
+    session_id = uuid.uuid4().hex
+    state = {}
+    if job.text:
+        state["client_content"] = {
+            "url": job.url,
+            "text": job.text,
+            "image_urls": job.image_urls,
+        }
+    if job.claims:
+        state["requested_claims"] = job.claims
+    session_service.create_session(
+        app_name=APP_NAME, user_id=JOB_USER_ID, session_id=session_id, state=state
+    )
+    message = types.Content(role="user", parts=[types.Part(text=job.url)])
+
+    final_text = None
+    async for event in runner.run_async(
+        user_id=JOB_USER_ID, session_id=session_id, new_message=message
+    ):
+        if event.author not in job.progress:
+            job.progress.append(event.author)
+            job.notify()
+        if event.content and event.content.parts and event.content.parts[0].text:
+            final_text = event.content.parts[0].text
+
+    result = parse_json_state(final_text)
+    if not isinstance(result, dict):
+        raise RuntimeError(final_text or "The pipeline produced no result.")
+    return result
+
+
+jobs = JobManager(
+    run_pipeline,
+    workers=JOB_WORKERS,
+    max_queue=JOB_QUEUE_SIZE,
+    retention=JOB_RETENTION,
+    abandon_after=JOB_ABANDON_SECONDS,
+    records=get_store("jobs") if STORE_BACKEND != "memory" else None,
+)
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    try:
+        job = jobs.submit(request.url, request.text, request.image_urls, request.claims)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return job.to_dict()
+
+
+def result_response(request: Request, record: dict):
+    """The result-only response for a job snapshot (see `shared/responses.py`)."""
+    if record["status"] == DONE:
+        created_at = record["created_at"]
+        meta = {
+            "job_id": record["job_id"],
+            "seconds": round(record["finished_at"] - created_at, 3),
+            "queued_seconds": round((record["started_at"] or created_at) - created_at, 3),
+            "coalesced": record["coalesced_requests"] > 1,
+        }
+        payload = compact_result(record["result"], meta)
+        return json_response(request, payload, etag=result_etag(payload))
+    summary = {
+        key: record[key] for key in ("job_id", "status", "progress", "error", "cancel_reason")
+    }
+    if record["status"] == CANCELLED:
+        return json_response(request, summary, status_code=409)
+    if record["status"] == FAILED:
+        return json_response(request, summary, status_code=500)
+    return json_response(request, summary, status_code=202)
+
+
+@app.post("/analyze")
+async def analyze(request: Request, body: JobRequest):
+    """Submits a job, waits for it and returns only its result."""
+    try:
+        job = jobs.submit(body.url, body.text, body.image_urls, body.claims)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    # Waiting counts as watching the job, like an open stream.
+    job.streams += 1
+    try:
+        while True:
+            updated = job.updated
+            if job.finished:
+                break
+            try:
+                await asyncio.wait_for(updated.wait(), DISCONNECT_CHECK_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    # Withdraw the request; the job stops unless others want it.
+                    jobs.cancel(job.job_id)
+                    break
+    finally:
+        job.streams -= 1
+        job.last_seen = time.time()
+    return result_response(request, job.to_dict())
+
+
+@app.get("/jobs/stats")
+async def job_stats():
+    return jobs.stats()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    record = jobs.get_record(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    jobs.touch(job_id)
+    return record
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(request: Request, job_id: str):
+    record = jobs.get_record(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    jobs.touch(job_id)
+    return result_response(request, record)
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    record = jobs.cancel(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return record
+
+
+@app.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        if jobs.get_record(job_id) is None:
+            raise HTTPException(status_code=404, detail="Job not found.")
+        return StreamingResponse(
+            remote_job_updates(job_id), media_type="text/event-stream"
+        )
+
+    async def updates():
+        # An open stream keeps the job alive; once the client disconnects,
+        # the job is abandoned unless someone polls it.
+        job.streams += 1
+        try:
+            while True:
+                updated = job.updated
+                yield f"data: {dumps(job.to_dict())}\n\n"
+                if job.finished:
+                    return
+                await updated.wait()
+        finally:
+            job.streams -= 1
+            job.last_seen = time.time()
+
+    return StreamingResponse(updates(), media_type="text/event-stream")
+
+
+async def remote_job_updates(job_id: str):
+    """Streams a job running in another worker process by polling the store."""
+    last = None
+    while True:
+        record = jobs.get_record(job_id)
+        if record is None:
+            return
+        if record != last:
+            yield f"data: {dumps(record)}\n\n"
+            last = record
+        if record["status"] in (DONE, FAILED, CANCELLED):
+            return
+        jobs.touch(job_id)
+        await asyncio.sleep(REMOTE_JOB_POLL_SECONDS)
+
+
+@app.get("/search/stats")
+async def search_stats():
+    return search_layer.stats()
+
+
+@app.get("/reputation/stats")
+async def reputation_stats():
+    return reputation_batcher.stats()
+
+
+@app.get("/evidence/stats")
+async def evidence_stats():
+    return evidence.stats()
+
+
+@app.get("/cancellation/stats")
+async def cancellation_stats():
+    return cancellation.stats()
@@ -0,0 +1,84 @@
+"""
+Out-of-band storage for large session state values.
+
+Article text, raw search results and research dumps used to live inline in
+session state, so every event that touched them carried a copy, every session
+write re-serialized them and `/run` responses sent them to the extension.
+Values of the keys in BLOB_KEYS that are at least BLOB_MIN_CHARS characters
+long are now put in a content-addressed blob store (the "blobs" namespace of
+`shared/store.py`, in memory or in SQLite on disk), and state holds a short
+reference in their place.
+
+References are resolved lazily: in prompts just before each model call (a
+`{fetched_content}` placeholder renders to the reference, which the model
+callback swaps for the text) and by the Python stages that read these keys,
+through `resolve`.
+"""
+
+import hashlib
+import re
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+
+from shared.budget import chain_callbacks
+from shared.config import env_int
+from shared.store import get_store
+
+BLOB_KEYS = frozenset(
+    (
+        "fetched_content",
+        "article_text",
+        "positive_search_results",
+        "negative_search_results",
+        "neutral_search_results",
+        "raw_research_data",
+    )
+)
+BLOB_MIN_CHARS = env_int("BLOB_MIN_CHARS", 2048)
+# Long enough for any session that could still render a prompt from the blob.
+BLOB_TTL = env_int("BLOB_TTL", 24 * 60 * 60)
+BLOB_REF = re.compile(r"\[\[blob:([0-9a-f]{64})\]\]")
+
+blobs = get_store("blobs")
+
+
+def put_blob(text: str) -> str:
+    """Stores text under its hash and returns the reference to it."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    blobs.set(digest, text, ttl=BLOB_TTL)
+    return f"[[blob:{digest}]]"
+
+
+def resolve(value):
+    """Returns `value` with any blob references replaced by their text."""
+    if not isinstance(value, str) or "[[blob:" not in value:
+        return value
+    # An expired blob renders as empty text rather than as its reference.
+    return BLOB_REF.sub(lambda match: blobs.get(match.group(1), ""), value)
+
+
+def offload_state_delta(state_delta: dict):
+    """Moves large values in an event's state delta to the blob store, in place."""
+    for key in BLOB_KEYS & state_delta.keys():
+        value = state_delta[key]
+        if isinstance(value, str) and len(value) >= BLOB_MIN_CHARS:
+            state_delta[key] = put_blob(value)
+
+
+def resolve_prompt(callback_context: CallbackContext, llm_request):
+    """Before-model callback: renders blob references in the system instruction."""
+    config = llm_request.config
+    if config is not None and isinstance(config.system_instruction, str):
+        config.system_instruction = resolve(config.system_instruction)
+    return None
+
+
+def install_blob_callbacks(agent):
+    """Adds the prompt-time blob resolver to every `LlmAgent` under `agent`."""
+    if isinstance(agent, LlmAgent):
+        agent.before_model_callback = chain_callbacks(
+            agent.before_model_callback, resolve_prompt
+        )
+    for sub_agent in agent.sub_agents:
+        install_blob_callbacks(sub_agent)
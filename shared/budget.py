@@ -0,0 +1,192 @@
+"""
+Per-request budgets for tokens, model calls and wall-clock time.
+
+The pipeline opens a budget for each invocation. Model callbacks installed on
+every `LlmAgent` in the tree count calls and tokens against it, and stages
+check it to degrade predictably as it runs low: fewer sources, database-only
+source reputation, no second fact-checking pass. Every degradation applied,
+including stages that missed their deadlines, is recorded so the response can
+report it.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from shared.config import env_float, env_int
+
+MAX_REQUEST_TOKENS = env_int("MAX_REQUEST_TOKENS", 250_000)
+MAX_REQUEST_MODEL_CALLS = env_int("MAX_REQUEST_MODEL_CALLS", 40)
+MAX_REQUEST_SECONDS = env_float("MAX_REQUEST_SECONDS", 120)
+# A budget "runs low" once less than this share of any of its limits is left.
+LOW_BUDGET_FRACTION = env_float("LOW_BUDGET_FRACTION", 0.3)
+# ADK 0.3.0 drops the model's usage metadata from `LlmResponse`; tokens are
+# then estimated from the text sent and received.
+USAGE_REPORTED = "usage_metadata" in LlmResponse.model_fields
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class RequestBudget:
+    max_tokens: int = MAX_REQUEST_TOKENS
+    max_model_calls: int = MAX_REQUEST_MODEL_CALLS
+    max_seconds: float = MAX_REQUEST_SECONDS
+    tokens: int = 0
+    model_calls: int = 0
+    analyst_passes: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    degradations: list[str] = field(default_factory=list)
+    timed_out: list[str] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining_fraction(self) -> float:
+        """Returns the share left of whichever limit is closest to running out."""
+        return min(
+            1 - self.tokens / self.max_tokens,
+            1 - self.model_calls / self.max_model_calls,
+            1 - self.elapsed / self.max_seconds,
+        )
+
+    @property
+    def low(self) -> bool:
+        return self.remaining_fraction() < LOW_BUDGET_FRACTION
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining_fraction() <= 0
+
+    def degrade(self, name: str):
+        if name not in self.degradations:
+            self.degradations.append(name)
+
+    def time_out(self, stage: str):
+        """Records a stage that missed its deadline (see `shared/deadlines.py`)."""
+        if stage not in self.timed_out:
+            self.timed_out.append(stage)
+        self.degrade(f"{stage}_timed_out")
+
+    def usage(self) -> dict:
+        return {
+            "tokens": self.tokens,
+            "model_calls": self.model_calls,
+            "seconds": round(self.elapsed, 3),
+            "limits": {
+                "tokens": self.max_tokens,
+                "model_calls": self.max_model_calls,
+                "seconds": self.max_seconds,
+            },
+        }
+
+
+_budgets: dict[str, RequestBudget] = {}
+_lock = threading.Lock()
+# The run the current task works for, so helper agents that run outside the
+# pipeline's session (see `shared/one_shot.py`) count against its budget.
+current_run: ContextVar[str | None] = ContextVar("budget_run", default=None)
+
+
+def open_budget(invocation_id: str) -> RequestBudget:
+    with _lock:
+        budget = _budgets[invocation_id] = RequestBudget()
+    current_run.set(invocation_id)
+    return budget
+
+
+def get_budget(invocation_id: str) -> RequestBudget | None:
+    with _lock:
+        return _budgets.get(invocation_id)
+
+
+def close_budget(invocation_id: str):
+    with _lock:
+        _budgets.pop(invocation_id, None)
+
+
+def _estimated_tokens(contents) -> int:
+    chars = sum(
+        len(part.text or "")
+        for content in contents
+        if content is not None
+        for part in content.parts or []
+    )
+    return chars // CHARS_PER_TOKEN
+
+
+def _budget_for(callback_context: CallbackContext) -> RequestBudget | None:
+    return get_budget(callback_context.invocation_id) or get_budget(current_run.get())
+
+
+def count_model_call(callback_context: CallbackContext, llm_request):
+    budget = _budget_for(callback_context)
+    if budget is not None:
+        budget.model_calls += 1
+        if not USAGE_REPORTED:
+            instruction = llm_request.config.system_instruction if llm_request.config else None
+            instruction_chars = len(instruction) if isinstance(instruction, str) else 0
+            budget.tokens += (
+                _estimated_tokens(llm_request.contents) + instruction_chars // CHARS_PER_TOKEN
+            )
+    return None
+
+
+def count_tokens(callback_context: CallbackContext, llm_response):
+    budget = _budget_for(callback_context)
+    if budget is None or llm_response.partial:
+        return None
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage is not None:
+        budget.tokens += usage.total_token_count or 0
+    elif not USAGE_REPORTED:
+        budget.tokens += _estimated_tokens([llm_response.content])
+    return None
+
+
+def chain_callbacks(first, second):
+    """Combines two agent callbacks; the first one to return a value wins."""
+    if first is None:
+        return second
+
+    def chained(*args, **kwargs):
+        result = first(*args, **kwargs)
+        return result if result is not None else second(*args, **kwargs)
+
+    return chained
+
+
+def install_budget_callbacks(agent):
+    """Adds the call and token counters to every `LlmAgent` under `agent`."""
+    if isinstance(agent, LlmAgent):
+        agent.before_model_callback = chain_callbacks(
+            agent.before_model_callback, count_model_call
+        )
+        agent.after_model_callback = chain_callbacks(agent.after_model_callback, count_tokens)
+    for sub_agent in agent.sub_agents:
+        install_budget_callbacks(sub_agent)
+
+
+def skip_revision_when_low(callback_context: CallbackContext):
+    """
+    Runs before each pass of the analyst in the fact-checking loop. The first
+    pass always runs; a revision pass is skipped once the request's budget
+    runs low. The caller ends the loop (see `fact_checker_agent/revision.py`).
+    """
+    budget = get_budget(callback_context.invocation_id)
+    if budget is None:
+        return None
+    budget.analyst_passes += 1
+    if budget.analyst_passes > 1 and budget.low:
+        budget.degrade("skipped_revision_pass")
+        return types.Content(
+            role="model",
+            parts=[types.Part(text="Revision skipped: the request budget is running low.")],
+        )
+    return None
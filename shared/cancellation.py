@@ -0,0 +1,145 @@
+"""
+Cancelling pipeline runs nobody is waiting for.
+
+A run executes in a `CancelScope`, held in a context variable, so the tasks
+it spawns (ADK's parallel branches, deadline producers, speculative searches)
+see the same scope. Model calls, web searches and page fetches register the
+task they run in with it. Cancelling the scope cancels those tasks along with
+the run's own task, which unwinds the Sequential, Parallel and Loop agents
+from wherever they are; a model call started after that is refused.
+
+Job scopes are cancelled when every request for the job is withdrawn or its
+client stops polling (`shared/jobs.py`), and `/run` scopes when the client
+disconnects (`server.py`). `stats()` reports the runs cancelled and an
+estimate of the model calls and seconds that saved, against the average
+completed run.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+
+from shared.budget import chain_callbacks
+
+current_scope: ContextVar["CancelScope | None"] = ContextVar("cancel_scope", default=None)
+
+_stats = {
+    "completed_runs": 0,
+    "completed_model_calls": 0,
+    "completed_seconds": 0.0,
+    "cancelled_runs": 0,
+    "cancelled_before_start": 0,
+    "tasks_cancelled": 0,
+    "model_calls_saved": 0.0,
+    "seconds_saved": 0.0,
+}
+_lock = threading.Lock()
+
+
+class CancelScope:
+    """The tasks of one run, and whether it has been cancelled."""
+
+    def __init__(self):
+        self.cancelled = False
+        self.model_calls = 0
+        self.started_at: float | None = None
+        self._tasks = weakref.WeakSet()
+
+    def enter(self):
+        """Makes this the scope of the current task and the tasks it spawns."""
+        current_scope.set(self)
+        self.started_at = time.monotonic()
+        self.track()
+
+    def track(self):
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks.add(task)
+
+    def check(self):
+        """Raises `CancelledError` once cancelled; otherwise tracks the current task."""
+        if self.cancelled:
+            raise asyncio.CancelledError()
+        self.track()
+
+    def cancel(self) -> int:
+        """Cancels the run's tasks; returns how many were still running."""
+        if self.cancelled:
+            return 0
+        self.cancelled = True
+        current = asyncio.current_task()
+        cancelled = 0
+        for task in list(self._tasks):
+            if task is not current and not task.done():
+                task.cancel()
+                cancelled += 1
+        _record_cancelled(self, cancelled)
+        return cancelled
+
+    def finish(self):
+        """Records a run that completed, as the baseline for the work saved."""
+        if self.cancelled or self.started_at is None:
+            return
+        with _lock:
+            _stats["completed_runs"] += 1
+            _stats["completed_model_calls"] += self.model_calls
+            _stats["completed_seconds"] += time.monotonic() - self.started_at
+
+
+def _record_cancelled(scope: CancelScope, tasks_cancelled: int):
+    with _lock:
+        runs = _stats["completed_runs"]
+        mean_calls = _stats["completed_model_calls"] / runs if runs else 0.0
+        mean_seconds = _stats["completed_seconds"] / runs if runs else 0.0
+        elapsed = 0.0 if scope.started_at is None else time.monotonic() - scope.started_at
+        _stats["cancelled_runs"] += 1
+        _stats["cancelled_before_start"] += scope.started_at is None
+        _stats["tasks_cancelled"] += tasks_cancelled
+        _stats["model_calls_saved"] += max(mean_calls - scope.model_calls, 0.0)
+        _stats["seconds_saved"] += max(mean_seconds - elapsed, 0.0)
+
+
+def check_cancelled():
+    """Stops the current task if its run was cancelled; see `CancelScope.check`."""
+    scope = current_scope.get()
+    if scope is not None:
+        scope.check()
+
+
+def refuse_cancelled_model_call(callback_context: CallbackContext, llm_request):
+    """Before-model callback: tracks the calling task and counts the call."""
+    scope = current_scope.get()
+    if scope is not None:
+        scope.check()
+        scope.model_calls += 1
+    return None
+
+
+def install_cancel_callbacks(agent):
+    """Adds the cancellation check to every `LlmAgent` under `agent`."""
+    if isinstance(agent, LlmAgent):
+        agent.before_model_callback = chain_callbacks(
+            agent.before_model_callback, refuse_cancelled_model_call
+        )
+    for sub_agent in agent.sub_agents:
+        install_cancel_callbacks(sub_agent)
+
+
+def stats() -> dict:
+    with _lock:
+        counts = dict(_stats)
+    runs = counts["completed_runs"]
+    return {
+        "completed_runs": runs,
+        "cancelled_runs": counts["cancelled_runs"],
+        "cancelled_before_start": counts["cancelled_before_start"],
+        "tasks_cancelled": counts["tasks_cancelled"],
+        "mean_model_calls_per_run": round(counts["completed_model_calls"] / runs, 2) if runs else 0.0,
+        "model_calls_saved": round(counts["model_calls_saved"], 1),
+        "seconds_saved": round(counts["seconds_saved"], 1),
+    }
@@ -0,0 +1,23 @@
+"""Environment-driven settings shared by the agents.
+
+Importing this module loads `.env` first, so flags read at import time see the
+same values as the agents' own `dotenv.load_dotenv()` calls.
+"""
+
+import os
+
+import dotenv
+
+dotenv.load_dotenv()
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    return os.environ.get(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
@@ -0,0 +1,154 @@
+"""
+Per-stage deadlines.
+
+A hung search or model call used to hang the whole run. Each stage now gets a
+deadline, and a stage that misses it is cut off: the pipeline goes on with
+whatever the stage produced, or with a fallback, and records the timeout on
+the request's budget. Stages and their settings (seconds, 0 for no deadline):
+
+    fetch               FETCH_DEADLINE_SECONDS       page download
+    extraction          EXTRACTION_DEADLINE_SECONDS  claim extraction
+    <branch>_search     SEARCH_DEADLINE_SECONDS      each search branch
+    evaluation          EVALUATION_DEADLINE_SECONDS  source evaluation
+    fact_checking_pass  ITERATION_DEADLINE_SECONDS   each analyst/adjudicator pass
+
+Claims checked after a search branch or the evaluation timed out, and claims
+whose fact-checking pass was cut off, are marked as resting on partial
+evidence in the final `ClaimsOutput`.
+"""
+
+import asyncio
+from typing import AsyncGenerator, Callable, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from shared.budget import get_budget
+from shared.config import env_float
+
+FETCH_DEADLINE_SECONDS = env_float("FETCH_DEADLINE_SECONDS", 20)
+EXTRACTION_DEADLINE_SECONDS = env_float("EXTRACTION_DEADLINE_SECONDS", 45)
+SEARCH_DEADLINE_SECONDS = env_float("SEARCH_DEADLINE_SECONDS", 45)
+EVALUATION_DEADLINE_SECONDS = env_float("EVALUATION_DEADLINE_SECONDS", 30)
+ITERATION_DEADLINE_SECONDS = env_float("ITERATION_DEADLINE_SECONDS", 45)
+# Stages that gather evidence: if one timed out, every claim checked in the
+# run rests on partial evidence.
+EVIDENCE_STAGES = ("positive_search", "negative_search", "neutral_search", "evaluation")
+
+_DONE = object()
+
+
+class Deadline:
+    """
+    Runs an event stream until a deadline. The stream runs in its own task,
+    in lockstep with the consumer, so each event reaches the session before
+    the stage carries on; the task is cancelled when the deadline passes.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.timed_out = False
+
+    async def run(self, events: AsyncGenerator) -> AsyncGenerator:
+        if not self.seconds:
+            async for event in events:
+                yield event
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.seconds
+        # Holds at most one event (the producer waits for `resume`), plus
+        # the end marker.
+        handoff = asyncio.Queue()
+        resume = asyncio.Event()
+
+        async def produce():
+            try:
+                async for event in events:
+                    resume.clear()
+                    handoff.put_nowait(event)
+                    await resume.wait()
+                handoff.put_nowait(_DONE)
+            except asyncio.CancelledError:
+                # Cancelled with its run (see `shared/cancellation.py`): end
+                # the stream rather than leave the consumer waiting it out.
+                handoff.put_nowait(_DONE)
+                raise
+            except Exception as e:
+                handoff.put_nowait(e)
+
+        task = asyncio.create_task(produce())
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(handoff.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    self.timed_out = True
+                    return
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+                resume.set()
+        finally:
+            task.cancel()
+
+
+def record_timeout(ctx: InvocationContext, stage: str):
+    budget = get_budget(ctx.invocation_id)
+    if budget is not None:
+        budget.time_out(stage)
+
+
+def evidence_timed_out(invocation_id: str) -> bool:
+    budget = get_budget(invocation_id)
+    return budget is not None and any(stage in EVIDENCE_STAGES for stage in budget.timed_out)
+
+
+class DeadlineAgent(BaseAgent):
+    """
+    Runs `agent` under a deadline. If it misses it, writes `fallback_state`
+    plus whatever `on_timeout(state)` returns, so the stages after it find
+    their inputs, and optionally ends the enclosing loop.
+    """
+
+    agent: BaseAgent
+    stage: str
+    seconds: float
+    fallback_state: dict = {}
+    on_timeout: Optional[Callable[[dict], dict]] = None
+    escalate_on_timeout: bool = False
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, name: str, agent: BaseAgent, stage: str, seconds: float, **kwargs):
+        super().__init__(
+            name=name, agent=agent, stage=stage, seconds=seconds, sub_agents=[agent], **kwargs
+        )
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        deadline = Deadline(self.seconds)
+        async for event in deadline.run(self.agent.run_async(ctx)):
+            yield event
+        if not deadline.timed_out:
+            return
+
+        record_timeout(ctx, self.stage)
+        state_delta = dict(self.fallback_state)
+        if self.on_timeout is not None:
+            state_delta.update(self.on_timeout(ctx.session.state))
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(
+                role="model",
+                parts=[types.Part(text=f"{self.stage} timed out after {self.seconds:g}s.")],
+            ),
+            actions=EventActions(state_delta=state_delta, escalate=self.escalate_on_timeout),
+        )
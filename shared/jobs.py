@@ -0,0 +1,304 @@
+"""
+Asynchronous analysis jobs with in-flight request coalescing.
+
+A job is submitted, gets an ID straight away and is run by a bounded pool of
+worker tasks. Submissions that are identical to a job still queued or running
+(same canonical URL and content hash) join that job instead of starting a new
+one, so a burst of requests for the same story runs the pipeline once.
+
+A job is cancelled once every request that joined it has been withdrawn
+(`cancel`), or when nobody has polled or streamed it for `abandon_after`
+seconds. A queued job is dropped; a running one has its cancel scope
+cancelled, which stops its model calls, searches and fetches (see
+`shared/cancellation.py`).
+
+When several server processes share a store (see `shared/store.py`), every
+update to a job is published to it, so any worker can answer status polls for
+jobs another worker is running. Polls and cancellations that reach another
+worker are passed on through the store too. Coalescing stays per worker.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from shared.cancellation import CancelScope
+from shared.keys import canonical_url, content_hash
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+# How often workers look for abandoned jobs and cancellations from other workers.
+SWEEP_SECONDS = 1.0
+
+
+@dataclass
+class Job:
+    url: str
+    text: str | None = None
+    image_urls: list[str] = field(default_factory=list)
+    # Claims to check instead of extracting them, e.g. earlier `unchecked_claims`.
+    claims: list[str] = field(default_factory=list)
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = QUEUED
+    result: dict | None = None
+    error: str | None = None
+    progress: list[str] = field(default_factory=list)
+    coalesced_requests: int = 1
+    cancelled_requests: int = 0
+    cancel_reason: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    # When a requester last polled the job, and how many are streaming it.
+    last_seen: float = field(default_factory=time.time)
+    streams: int = 0
+    scope: CancelScope = field(default_factory=CancelScope, repr=False)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    updated: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    on_update: Optional[Callable[["Job"], None]] = field(default=None, repr=False)
+
+    @property
+    def key(self) -> str:
+        key = f"{canonical_url(self.url)}:{content_hash(self.text) if self.text else ''}"
+        if self.claims:
+            key += ":" + content_hash("\n".join(sorted(self.claims)))
+        return key
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def notify(self):
+        """Wakes everyone waiting on this job's next update."""
+        if self.on_update is not None:
+            self.on_update(self)
+        self.updated.set()
+        self.updated = asyncio.Event()
+
+    def to_dict(self) -> dict:
+        now = self.finished_at or time.time()
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "url": self.url,
+            "progress": self.progress,
+            "coalesced_requests": self.coalesced_requests,
+            "cancelled_requests": self.cancelled_requests,
+            "cancel_reason": self.cancel_reason,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "age_seconds": round(now - self.created_at, 3),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobManager:
+    """Queues jobs, coalesces duplicates and runs them on a fixed worker pool."""
+
+    def __init__(
+        self,
+        run_job: Callable[[Job], Awaitable[dict]],
+        workers: int = 4,
+        max_queue: int = 100,
+        retention: float = 600,
+        abandon_after: float = 0,
+        records=None,
+    ):
+        self.run_job = run_job
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention = retention
+        # Seconds without a poll or an open stream before a job is abandoned; 0 never.
+        self.abandon_after = abandon_after
+        # Job snapshots shared with other server processes, if any.
+        self.records = records
+        self.jobs: dict[str, Job] = {}
+        self.in_flight: dict[str, Job] = {}
+        self.coalesced_total = 0
+        self.completed_total = 0
+        self.failed_total = 0
+        self.cancelled_total = 0
+        self.abandoned_total = 0
+        self.cancelled_queued_total = 0
+        self.tasks_cancelled_total = 0
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def _start(self):
+        # Started lazily so the queue and workers bind to the server's loop.
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self.workers)
+            ]
+            self._tasks.append(asyncio.create_task(self._sweep()))
+
+    def submit(
+        self, url: str, text: str | None = None, image_urls=None, claims=None
+    ) -> Job:
+        """Returns a new queued job, or the in-flight job it duplicates."""
+        self._start()
+        self._evict_finished()
+        job = Job(
+            url=url, text=text, image_urls=list(image_urls or []), claims=list(claims or [])
+        )
+        existing = self.in_flight.get(job.key)
+        if existing is not None:
+            existing.coalesced_requests += 1
+            existing.last_seen = time.time()
+            self.coalesced_total += 1
+            if self.records is not None:
+                self._publish(existing)
+            return existing
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queue} jobs).")
+        self.jobs[job.job_id] = job
+        self.in_flight[job.key] = job
+        if self.records is not None:
+            job.on_update = self._publish
+            self._publish(job)
+        return job
+
+    def _publish(self, job: Job):
+        self.records.set(job.job_id, job.to_dict(), ttl=self.retention)
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    def get_record(self, job_id: str) -> dict | None:
+        """Returns a job's snapshot, whichever worker process is running it."""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.records is not None:
+            return self.records.get(job_id)
+        return None
+
+    def touch(self, job_id: str):
+        """Records that a requester is still waiting for a job."""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.last_seen = time.time()
+        elif self.records is not None:
+            self.records.set(f"{job_id}:seen", time.time(), ttl=self.retention)
+
+    def cancel(self, job_id: str) -> dict | None:
+        """
+        Withdraws one request for a job. The job itself is cancelled once every
+        request that joined it has been withdrawn. Returns the job's snapshot,
+        or None if there is no such job.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            record = self.get_record(job_id)
+            if record is not None and record["status"] in (QUEUED, RUNNING):
+                # The worker running it picks this up on its next sweep.
+                key = f"{job_id}:cancels"
+                self.records.set(key, (self.records.get(key) or 0) + 1, ttl=self.retention)
+            return record
+        if not job.finished and not job.scope.cancelled:
+            job.cancelled_requests += 1
+            if job.cancelled_requests >= job.coalesced_requests:
+                self._abort(job, "cancelled")
+        return job.to_dict()
+
+    def _abort(self, job: Job, reason: str):
+        job.cancel_reason = reason
+        if job.status == QUEUED:
+            # The worker that dequeues it skips it.
+            job.scope.cancel()
+            job.status, job.finished_at = CANCELLED, time.time()
+            self.in_flight.pop(job.key, None)
+            self.cancelled_total += 1
+            self.cancelled_queued_total += 1
+            job.notify()
+        else:
+            # The worker records the cancellation once the run has unwound.
+            self.tasks_cancelled_total += job.scope.cancel()
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(SWEEP_SECONDS)
+            now = time.time()
+            for job in list(self.jobs.values()):
+                if job.finished or job.scope.cancelled:
+                    continue
+                last_seen, remote_cancels = job.last_seen, 0
+                if self.records is not None:
+                    last_seen = max(last_seen, self.records.get(f"{job.job_id}:seen") or 0)
+                    remote_cancels = self.records.get(f"{job.job_id}:cancels") or 0
+                if job.cancelled_requests + remote_cancels >= job.coalesced_requests:
+                    self._abort(job, "cancelled")
+                elif self.abandon_after and not job.streams and now - last_seen > self.abandon_after:
+                    self.abandoned_total += 1
+                    self._abort(job, "abandoned")
+
+    async def _run(self, job: Job) -> dict:
+        job.scope.enter()
+        result = await self.run_job(job)
+        job.scope.finish()
+        return result
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job.finished:
+                # Cancelled while it was queued.
+                self._queue.task_done()
+                continue
+            job.status, job.started_at = RUNNING, time.time()
+            job.notify()
+            job.task = asyncio.create_task(self._run(job))
+            try:
+                job.result = await job.task
+                job.status = DONE
+                self.completed_total += 1
+            except asyncio.CancelledError:
+                if not job.scope.cancelled:
+                    raise
+                job.status = CANCELLED
+                self.cancelled_total += 1
+            except Exception as e:
+                job.status, job.error = FAILED, f"{type(e).__name__}: {e}"
+                self.failed_total += 1
+            finally:
+                job.finished_at = time.time()
+                job.task = None
+                self.in_flight.pop(job.key, None)
+                job.notify()
+                self._queue.task_done()
+
+    def _evict_finished(self):
+        cutoff = time.time() - self.retention
+        for job_id, job in list(self.jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del self.jobs[job_id]
+
+    def stats(self) -> dict:
+        now = time.time()
+        queued = [job for job in self.jobs.values() if job.status == QUEUED]
+        return {
+            "workers": self.workers,
+            "queue_depth": len(queued),
+            "queue_capacity": self.max_queue,
+            "running": sum(job.status == RUNNING for job in self.jobs.values()),
+            "oldest_queued_age_seconds": round(
+                max((now - job.created_at for job in queued), default=0.0), 3
+            ),
+            "completed_total": self.completed_total,
+            "failed_total": self.failed_total,
+            "coalesced_total": self.coalesced_total,
+            "cancelled_total": self.cancelled_total,
+            "cancelled_queued_total": self.cancelled_queued_total,
+            "abandoned_total": self.abandoned_total,
+            "tasks_cancelled_total": self.tasks_cancelled_total,
+        }
@@ -0,0 +1,55 @@
+"""Canonical cache keys for URLs, page content and claims."""
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ref", "smid")
+WORD = re.compile(r"\w+")
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalizes a URL so that trivially different links to the same page share
+    a key: lowercases the host, drops "www.", tracking parameters, fragments
+    and trailing slashes.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, urlencode(sorted(query)), ""))
+
+
+def content_hash(text: str) -> str:
+    """Returns a stable hash of page text, ignoring whitespace differences."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def claim_key(text: str) -> str:
+    """
+    Reduces claim text to its lowercase words, so that the same claim with
+    different case, punctuation or spacing shares a key.
+    """
+    return " ".join(WORD.findall(str(text).lower()))
+
+
+def normalize_domain(value: str) -> str:
+    """
+    Reduces a URL, host or outlet name ("https://www.CDC.gov/x", "cdc.gov",
+    "BBC") to a bare lowercase domain or name, without "www.".
+    """
+    value = value.strip().strip("*`'\"").lower()
+    if "://" in value:
+        value = urlsplit(value).netloc
+    value = value.split("/")[0].split(":")[0]
+    if value.startswith("www."):
+        value = value[4:]
+    return value
@@ -0,0 +1,31 @@
+"""
+Per-agent model overrides.
+
+MODEL_OVERRIDES lists `agent_name=model` pairs, comma-separated, e.g.
+`chief_analyst_agent=gemini-2.0-flash-lite,multimodal_reasoning_agent=gemini-2.5-flash`.
+Every `LlmAgent` with a listed name runs on that model instead of the one it
+was defined with.
+"""
+
+import os
+
+from google.adk.agents import LlmAgent
+
+
+def parse_overrides(value: str) -> dict[str, str]:
+    overrides = {}
+    for pair in value.split(","):
+        name, _, model = pair.partition("=")
+        if name.strip() and model.strip():
+            overrides[name.strip()] = model.strip()
+    return overrides
+
+
+def apply_model_overrides(agent, overrides: dict[str, str] | None = None):
+    """Switches every `LlmAgent` under `agent` named in `overrides` to its model."""
+    if overrides is None:
+        overrides = parse_overrides(os.environ.get("MODEL_OVERRIDES", ""))
+    if isinstance(agent, LlmAgent) and agent.name in overrides:
+        agent.model = overrides[agent.name]
+    for sub_agent in agent.sub_agents:
+        apply_model_overrides(sub_agent, overrides)
@@ -0,0 +1,41 @@
+"""Running a standalone agent once, outside of the main pipeline's session."""
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+
+class OneShotAgent:
+    """
+    Runs an agent on a single message in a throwaway session and returns its
+    final text. Used for helper calls (searches, reputation research) that
+    happen alongside a pipeline run rather than as a step of it.
+    """
+
+    USER_ID = "one_shot"
+
+    def __init__(self, agent):
+        self.app_name = agent.name
+        self.session_service = InMemorySessionService()
+        self.runner = Runner(
+            app_name=self.app_name, agent=agent, session_service=self.session_service
+        )
+
+    async def run(self, text: str) -> str:
+        session = self.session_service.create_session(
+            app_name=self.app_name, user_id=self.USER_ID
+        )
+        final_text = ""
+        try:
+            async for event in self.runner.run_async(
+                user_id=self.USER_ID,
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+            ):
+                if event.content and event.content.parts:
+                    final_text = "".join(part.text or "" for part in event.content.parts)
+        finally:
+            self.session_service.delete_session(
+                app_name=self.app_name, user_id=self.USER_ID, session_id=session.id
+            )
+        return final_text
@@ -0,0 +1,71 @@
+"""
+Compact, cacheable responses for analysis results.
+
+`/run` returns every event of a run, intermediate agent outputs and state
+deltas included, though clients only read the last one. The result-only
+endpoints in `server.py` send just the final `ClaimsOutput` with a little
+metadata (timings, result-cache status, reputation dataset version), gzip it
+when the client accepts gzip, and tag it with an ETag, so a client that
+already holds the same result gets an empty 304 instead.
+"""
+
+import gzip
+import hashlib
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from shared.config import env_int
+from shared.schemas import dumps_bytes
+
+# Bodies smaller than this aren't worth compressing.
+COMPRESS_MIN_BYTES = env_int("COMPRESS_MIN_BYTES", 1024)
+# What a result is made of; the ETag covers these and not the run's timings.
+RESULT_KEYS = ("claims", "unchecked_claims", "degradations")
+
+
+def compact_result(result: dict, meta: dict) -> dict:
+    """The parts of a pipeline result a client renders, plus `meta`."""
+    payload = {key: result.get(key) or [] for key in RESULT_KEYS}
+    payload["meta"] = {
+        **meta,
+        "result_cache": result.get("result_cache", "miss"),
+        "reputation_dataset": (result.get("reputation_dataset") or {}).get("version"),
+    }
+    return payload
+
+
+def result_etag(payload: dict) -> str:
+    canonical = dumps_bytes({key: payload.get(key) for key in RESULT_KEYS}, sort_keys=True)
+    # Weak, as the same result is sent both plain and gzipped.
+    return f'W/"{hashlib.sha256(canonical).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def json_response(
+    request: Request, payload: dict, status_code: int = 200, etag: str | None = None
+) -> Response:
+    """
+    Serializes `payload` compactly, gzipped if the client accepts it, and
+    answers 304 if the client's If-None-Match already has `etag`.
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    if etag is not None:
+        # Clients may keep the result, but must check it's still current.
+        headers["ETag"] = etag
+        headers["Cache-Control"] = "no-cache"
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+    body = dumps_bytes(payload)
+    if len(body) >= COMPRESS_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
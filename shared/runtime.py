@@ -0,0 +1,73 @@
+"""
+Event-loop lag and memory sampling for the API server.
+
+`LoopLagMonitor` wakes up every `interval` seconds and records how late it
+was: a sync call that blocks the loop (a page download, a big JSON parse)
+shows up as lag on every request being served at the time.
+"""
+
+import asyncio
+import collections
+import os
+import time
+
+import psutil
+
+LAG_SAMPLE_INTERVAL = 0.1
+LAG_WINDOW = 600  # samples kept, one minute at the default interval
+
+
+def rss_bytes() -> int:
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs a timer that should fire on time."""
+
+    def __init__(self, interval: float = LAG_SAMPLE_INTERVAL, window: int = LAG_WINDOW):
+        self.interval = interval
+        self.samples = collections.deque(maxlen=window)
+        self.max_lag = 0.0
+        self.started_at = None
+        self._task = None
+
+    def start(self):
+        """Starts sampling on the running loop; later calls do nothing."""
+        if self._task is None:
+            self.started_at = time.monotonic()
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> dict:
+        samples = list(self.samples)
+        return {
+            "p50_ms": round(_percentile(samples, 0.5) * 1000, 2),
+            "p99_ms": round(_percentile(samples, 0.99) * 1000, 2),
+            "window_max_ms": round(max(samples, default=0.0) * 1000, 2),
+            "max_ms": round(self.max_lag * 1000, 2),
+            "samples": len(samples),
+        }
+
+    def snapshot(self) -> dict:
+        uptime = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(uptime, 1),
+            "rss_bytes": rss_bytes(),
+            "loop_lag": self.stats(),
+        }
@@ -0,0 +1,347 @@
+"""
+Fast validation and serialization of the pipeline's structured outputs.
+
+The stages hand each other `ExtractedClaims`, `SourcesOutput`,
+`SourceProfilerOutput` and `ClaimsOutput` as JSON text or plain dicts. The
+Pydantic models in the agent modules describe them to the model (as
+`output_schema`); the pipeline's own code reads and writes them through this
+module instead:
+
+- the records are slotted dataclasses mirroring those models, which are
+  cheaper to build and read than model instances (`tests/test_schemas.py`
+  checks that their fields, required-ness and literal choices agree),
+- `validate` checks plain data against a record type with a validator
+  generated once per type (required fields, types, literal choices, nested
+  lists), coercing numbers, booleans and numeric strings the way Pydantic's
+  lax mode does,
+- `dumps` and `loads` are the one JSON path for every stage, backed by
+  orjson when it is installed (which also serializes the records directly),
+- `to_builtins` turns a record back into dicts and lists for session state.
+
+`benchmarks/schemas/run.py` compares this path with the Pydantic round trips.
+"""
+
+import json
+from dataclasses import MISSING, dataclass, field, fields, is_dataclass
+from functools import cache
+from typing import Literal, get_args, get_origin, get_type_hints
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CREDIBILITY_RATINGS = ("Very High", "High", "Mixed", "Low", "Very Low")
+BIAS_RATINGS = ("Left", "Leans Left", "Center", "Leans Right", "Right", "N/A")
+RETRIEVING_AGENTS = ("Supporting Researcher", "Refuting Researcher", "Contextual Researcher")
+
+
+@dataclass(slots=True)
+class ExtractedClaims:
+    claims: list[str]
+
+
+@dataclass(slots=True)
+class SourceItem:
+    domain: str
+    retrieved_quote: str
+    published_date: str
+    retrieving_agent: str
+    # The claims the source is evidence for (see `retrieval_agent/evidence.py`).
+    claims: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class SourcesOutput:
+    sources: list[SourceItem] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class SourceProfile:
+    source_url: str
+    retrieved_quote: str
+    retrieving_agent: Literal[RETRIEVING_AGENTS]
+    credibility_rating: Literal[CREDIBILITY_RATINGS]
+    bias_rating: Literal[BIAS_RATINGS]
+    claims: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class SourceProfilerOutput:
+    source_profiles: list[SourceProfile]
+
+
+@dataclass(slots=True)
+class ClaimSpan:
+    start: int
+    end: int
+    text: str
+    score: float
+
+
+@dataclass(slots=True)
+class Claim:
+    claim_text: str
+    confidence: float
+    bias_score: str
+    justification: str
+    sources: list[str]
+    partial_evidence: bool = False
+    spans: list[ClaimSpan] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ClaimsOutput:
+    claims: list[Claim]
+
+
+class SchemaError(ValueError):
+    """Data that doesn't fit a record type; `path` names the offending field."""
+
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path}: {message}")
+        self.path = path
+        self.message = message
+
+    def within(self, prefix: str) -> "SchemaError":
+        return SchemaError(prefix + self.path, self.message)
+
+
+# --- JSON ---
+
+
+def _encode_record(value):
+    if is_dataclass(value) and not isinstance(value, type):
+        return to_builtins(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_bytes(value, sort_keys: bool = False) -> bytes:
+    """Compact UTF-8 JSON for `value`, which may contain records."""
+    if orjson is not None:
+        option = orjson.OPT_PASSTHROUGH_DATACLASS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        # orjson's own dataclass support is slower than the generated dumpers.
+        return orjson.dumps(value, default=_encode_record, option=option)
+    if is_dataclass(value):
+        value = to_builtins(value)
+    return json.dumps(
+        value,
+        separators=(",", ":"),
+        sort_keys=sort_keys,
+        default=_encode_record,
+    ).encode("utf-8")
+
+
+def dumps(value, sort_keys: bool = False) -> str:
+    return dumps_bytes(value, sort_keys).decode("utf-8")
+
+
+def loads(text: str | bytes):
+    """Parses JSON text; raises `ValueError` if it isn't valid JSON."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# --- Validation ---
+
+_BOOLEANS = {"true": True, "false": False, "yes": True, "no": False, "1": True, "0": False}
+
+
+def _expected(path: str, what: str, value):
+    return SchemaError(path, f"expected {what}, got {type(value).__name__}")
+
+
+def _as_str(value, path: str) -> str:
+    raise _expected(path, "a string", value)
+
+
+def _as_int(value, path: str) -> int:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise _expected(path, "an integer", value)
+
+
+def _as_float(value, path: str) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise _expected(path, "a number", value)
+
+
+def _as_bool(value, path: str) -> bool:
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in _BOOLEANS:
+        return _BOOLEANS[value.strip().lower()]
+    raise _expected(path, "a boolean", value)
+
+
+_SCALARS = {str: _as_str, int: _as_int, float: _as_float, bool: _as_bool}
+
+
+def _coerce_items(items: list, expected: type, path: str) -> list:
+    convert = _SCALARS[expected]
+    return [
+        item if type(item) is expected else convert(item, f"{path}[{index}]")
+        for index, item in enumerate(items)
+    ]
+
+
+def _index_of_invalid(items: list, validate_item) -> str:
+    for index, item in enumerate(items):
+        try:
+            validate_item(item)
+        except SchemaError:
+            return f"[{index}]"
+    return ""
+
+
+def _check_lines(hint, target: str, path: str, namespace: dict) -> list[str]:
+    """
+    Source lines that check (and coerce) the value in `target` against
+    `hint`; `path` is the field's name in errors. Errors from nested records
+    are raised with paths relative to the record and prefixed on the way out,
+    so valid data never pays for building them.
+    """
+    if hint in _SCALARS:
+        name = f"_as_{hint.__name__}"
+        namespace[name] = _SCALARS[hint]
+        return [f"if type({target}) is not {hint.__name__}:",
+                f"    {target} = {name}({target}, {path!r})"]
+    if get_origin(hint) is Literal:
+        name = f"_choices_{len(namespace)}"
+        namespace[name] = frozenset(get_args(hint))
+        message = "expected one of " + ", ".join(get_args(hint))
+        return [f"if type({target}) is not str or {target} not in {name}:",
+                f"    raise SchemaError({path!r}, {message!r})"]
+    if is_dataclass(hint):
+        name = f"_validate_{hint.__name__}"
+        namespace[name] = _validator(hint)
+        return ["try:",
+                f"    {target} = {name}({target})",
+                "except SchemaError as error:",
+                f"    raise error.within({path!r}) from None"]
+    if get_origin(hint) is list:
+        (item_hint,) = get_args(hint)
+        lines = [f"if type({target}) is not list:",
+                 f"    raise _expected({path!r}, 'a list', {target})"]
+        if item_hint in _SCALARS:
+            return lines + [
+                f"for item in {target}:",
+                f"    if type(item) is not {item_hint.__name__}:",
+                f"        {target} = _coerce_items({target}, {item_hint.__name__}, {path!r})",
+                "        break",
+            ]
+        if is_dataclass(item_hint):
+            name = f"_validate_{item_hint.__name__}"
+            namespace[name] = _validator(item_hint)
+            return lines + [
+                "try:",
+                f"    {target} = [{name}(item) for item in {target}]",
+                "except SchemaError as error:",
+                f"    raise error.within({path!r} + _index_of_invalid({target}, {name})) from None",
+            ]
+    raise TypeError(f"No validator for {hint!r}")
+
+
+@cache
+def _validator(record_type):
+    """Generates the function that validates plain data as `record_type`."""
+    hints = get_type_hints(record_type)
+    namespace = {
+        "SchemaError": SchemaError,
+        "_expected": _expected,
+        "_coerce_items": _coerce_items,
+        "_index_of_invalid": _index_of_invalid,
+        "_MISSING": MISSING,
+        "record_type": record_type,
+    }
+    lines = [
+        "def validate(data):",
+        "    if type(data) is not dict:",
+        "        raise _expected('', 'an object', data)",
+    ]
+    arguments = []
+    for position, record_field in enumerate(fields(record_type)):
+        target, name = f"value_{position}", record_field.name
+        path = f".{name}"
+        if record_field.default is MISSING and record_field.default_factory is MISSING:
+            lines += [
+                "    try:",
+                f"        {target} = data[{name!r}]",
+                "    except KeyError:",
+                f"        raise SchemaError({path!r}, 'field required') from None",
+            ]
+            lines += [f"    {line}" for line in _check_lines(hints[name], target, path, namespace)]
+        else:
+            if record_field.default is not MISSING:
+                namespace[f"_default_{position}"] = lambda default=record_field.default: default
+            else:
+                namespace[f"_default_{position}"] = record_field.default_factory
+            lines += [
+                f"    {target} = data.get({name!r}, _MISSING)",
+                f"    if {target} is _MISSING:",
+                f"        {target} = _default_{position}()",
+                "    else:",
+            ]
+            lines += [f"        {line}" for line in _check_lines(hints[name], target, path, namespace)]
+        arguments.append(target)
+    lines.append(f"    return record_type({', '.join(arguments)})")
+    exec("\n".join(lines), namespace)
+    return namespace["validate"]
+
+
+def validate(record_type, data):
+    """Returns `data` as a `record_type` record; raises `SchemaError` if it doesn't fit."""
+    try:
+        return _validator(record_type)(data)
+    except SchemaError as error:
+        raise error.within(record_type.__name__) from None
+
+
+# --- Back to plain data ---
+
+
+def _dump_expression(hint, target: str, namespace: dict) -> str:
+    if is_dataclass(hint):
+        name = f"_dump_{hint.__name__}"
+        namespace[name] = _dumper(hint)
+        return f"{name}({target})"
+    if get_origin(hint) is list:
+        (item_hint,) = get_args(hint)
+        item = _dump_expression(item_hint, "item", namespace)
+        return f"list({target})" if item == "item" else f"[{item} for item in {target}]"
+    if hint in _SCALARS or get_origin(hint) is Literal:
+        return target
+    raise TypeError(f"No dumper for {hint!r}")
+
+
+@cache
+def _dumper(record_type):
+    hints = get_type_hints(record_type)
+    namespace = {}
+    items = [
+        f"{record_field.name!r}: "
+        + _dump_expression(hints[record_field.name], f"record.{record_field.name}", namespace)
+        for record_field in fields(record_type)
+    ]
+    source = f"def dump(record):\n    return {{{', '.join(items)}}}"
+    exec(source, namespace)
+    return namespace["dump"]
+
+
+def to_builtins(record) -> dict:
+    """The record as dicts and lists, as stored in session state."""
+    return _dumper(type(record))(record)
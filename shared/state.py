@@ -0,0 +1,53 @@
+"""Helpers for reading structured values out of ADK session state."""
+
+import re
+
+from shared.schemas import SchemaError, loads, validate
+
+URL_PATTERN = re.compile(r"https?://[^\s\"'<>]+")
+
+
+def parse_json_state(value, default=None):
+    """
+    Returns a session state value as Python data.
+
+    Agents with an `output_schema` store their output as JSON text, sometimes
+    wrapped in a ```json fence. Values that are already dicts or lists are
+    returned unchanged; anything that doesn't parse yields `default`.
+    """
+    if value is None:
+        return default
+    if isinstance(value, (dict, list)):
+        return value
+    text = str(value).strip()
+    if text.startswith("```"):
+        text = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", text)
+    try:
+        return loads(text)
+    except ValueError:
+        return default
+
+
+def read_state(value, record_type, default=None):
+    """
+    `parse_json_state`, validated as a `shared.schemas` record: returns the
+    record, or `default` if the value is missing or doesn't fit.
+    """
+    data = parse_json_state(value)
+    if data is None:
+        return default
+    try:
+        return validate(record_type, data)
+    except SchemaError:
+        return default
+
+
+def extract_url(content) -> str | None:
+    """Returns the first URL found in a `types.Content` user message."""
+    if content is None or not content.parts:
+        return None
+    for part in content.parts:
+        match = URL_PATTERN.search(part.text or "")
+        if match:
+            return match.group(0).rstrip(".,)")
+    return None
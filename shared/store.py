@@ -0,0 +1,161 @@
+"""Key/value stores shared by the pipeline stages.
+
+Values must be JSON-compatible (dicts, lists, strings, numbers) so a store can
+be swapped for a persistent backend without changing its callers.
+
+STORE_BACKEND picks the backend for every namespace:
+    memory  Process-local dictionaries (default).
+    sqlite  One SQLite file in WAL mode at STORE_PATH, shared by every server
+            worker process on the machine.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from shared.config import env_float
+from shared.schemas import dumps, loads
+
+STORE_BACKEND = os.environ.get("STORE_BACKEND", "memory")
+STORE_PATH = os.environ.get("STORE_PATH", "store.sqlite3")
+# Seconds a writer waits for another process's write lock before failing.
+SQLITE_BUSY_TIMEOUT = env_float("SQLITE_BUSY_TIMEOUT", 10)
+# Expired entries are swept once every this many writes.
+SQLITE_SWEEP_EVERY = 1000
+MEMORY_SWEEP_EVERY = 1000
+
+
+class MemoryStore:
+    """A process-local key/value store with optional per-entry expiry."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: str, value, ttl: float | None = None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._writes += 1
+            if self._writes % MEMORY_SWEEP_EVERY == 0:
+                # Entries that are never read again would otherwise stay forever.
+                now = time.time()
+                expired = [
+                    k for k, (_, exp) in self._data.items() if exp is not None and exp <= now
+                ]
+                for stale in expired:
+                    del self._data[stale]
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+def enable_wal(path: str):
+    """Switches a SQLite database to WAL mode, which persists in the file."""
+    with sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+
+
+class SqliteStore:
+    """
+    A key/value namespace in a SQLite file, safe to share between processes.
+
+    WAL mode lets readers run alongside the single writer, so lookups from
+    other workers aren't blocked by a write. Each thread keeps its own
+    connection.
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+        self._local = threading.local()
+        self._writes = 0
+        enable_wal(path)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " expires_at REAL, PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default=None):
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return default
+        return loads(value)
+
+    def set(self, key: str, value, ttl: float | None = None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (self.namespace, key, dumps(value), expires_at),
+        )
+        self._writes += 1
+        if self._writes % SQLITE_SWEEP_EVERY == 0:
+            conn.execute(
+                "DELETE FROM kv WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time()),
+            )
+
+    def delete(self, key: str):
+        self._connection().execute(
+            "DELETE FROM kv WHERE namespace = ? AND key = ?", (self.namespace, key)
+        )
+
+    def __len__(self):
+        (count,) = self._connection().execute(
+            "SELECT COUNT(*) FROM kv WHERE namespace = ?"
+            " AND (expires_at IS NULL OR expires_at > ?)",
+            (self.namespace, time.time()),
+        ).fetchone()
+        return count
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(namespace: str) -> MemoryStore | SqliteStore:
+    """Returns the store for `namespace`, creating it on first use."""
+    with _STORES_LOCK:
+        if namespace not in _STORES:
+            if STORE_BACKEND == "sqlite":
+                _STORES[namespace] = SqliteStore(STORE_PATH, namespace)
+            else:
+                _STORES[namespace] = MemoryStore()
+        return _STORES[namespace]
@@ -0,0 +1,52 @@
+"""
+Shared test setup.
+
+The tests run the agents against the load-test stand-ins
+(`loadtest/standins.py`), so they need no network access or API keys. The
+stand-ins have to be installed before any agent module is imported, which is
+why it happens here, at collection time.
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("STANDIN_MODEL_LATENCY", "0")
+
+from loadtest import standins  # noqa: E402
+
+standins.install()
+
+from google.adk.runners import Runner  # noqa: E402
+from google.adk.sessions import InMemorySessionService  # noqa: E402
+from google.genai import types  # noqa: E402
+
+APP_NAME = "tests"
+USER_ID = "tester"
+
+
+def run_agent(agent, text: str = "https://example.com/article", state: dict | None = None):
+    """Runs `agent` through a `Runner` in a fresh session; returns its events and final state."""
+    session_service = InMemorySessionService()
+    runner = Runner(app_name=APP_NAME, agent=agent, session_service=session_service)
+    session_id = uuid.uuid4().hex
+    session_service.create_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session_id, state=state or {}
+    )
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+
+    async def collect():
+        return [
+            event
+            async for event in runner.run_async(
+                user_id=USER_ID, session_id=session_id, new_message=message
+            )
+        ]
+
+    events = asyncio.run(collect())
+    session = session_service.get_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session_id
+    )
+    return events, session.state
@@ -0,0 +1,28 @@
+from extractor_agent.alignment import TextIndex, add_claim_spans
+
+TEXT = (
+    "The city council met on Tuesday. Officials said unemployment fell to 3.9% in April, "
+    "the lowest level since 2001. Critics questioned the survey's methods."
+)
+
+
+def test_claim_is_aligned_with_the_sentence_it_came_from():
+    (span,) = TextIndex(TEXT).align("Unemployment fell to 3.9% in April, the lowest level since 2001.")
+    assert TEXT[span["start"] : span["end"]] == span["text"]
+    assert span["text"].startswith("unemployment fell") and span["text"].endswith("2001")
+    assert span["score"] == 1.0
+
+
+def test_reworded_claim_still_finds_its_sentence():
+    (span,) = TextIndex(TEXT).align("Unemployment falls to 3.9 percent in April, lowest since 2001")
+    assert "unemployment fell to 3.9% in April" in span["text"]
+    assert span["score"] >= 0.5
+
+
+def test_unrelated_claims_get_no_spans():
+    claims = add_claim_spans(
+        [{"claim_text": "The moon is made of cheese."}, {"claim_text": "Critics questioned the survey's methods."}],
+        TEXT,
+    )
+    assert claims[0]["spans"] == []
+    assert claims[1]["spans"][0]["text"] == "Critics questioned the survey's methods"
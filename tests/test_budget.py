@@ -0,0 +1,78 @@
+import uuid
+
+from google.adk.agents import LlmAgent
+
+import master_agent.agent  # noqa: F401  Installs the pipeline's callbacks.
+from extractor_agent.agent import multimodal_reasoning_agent
+from shared.blobs import install_blob_callbacks, put_blob
+from shared.budget import (
+    CHARS_PER_TOKEN,
+    chain_callbacks,
+    close_budget,
+    get_budget,
+    install_budget_callbacks,
+    open_budget,
+)
+from shared.cancellation import install_cancel_callbacks
+
+from conftest import run_agent
+
+
+def test_chained_callbacks_take_keyword_arguments():
+    calls = []
+
+    def first(callback_context, llm_request):
+        calls.append(("first", callback_context, llm_request))
+
+    def second(callback_context, llm_request):
+        calls.append(("second", callback_context, llm_request))
+        return "answer"
+
+    chained = chain_callbacks(first, second)
+    assert chained(callback_context="ctx", llm_request="request") == "answer"
+    assert chained("ctx", llm_request="request") == "answer"
+    assert [call[0] for call in calls] == ["first", "second", "first", "second"]
+
+
+def test_first_result_wins():
+    chained = chain_callbacks(lambda **kwargs: "first", lambda **kwargs: "second")
+    assert chained(callback_context=None, llm_request=None) == "first"
+
+
+def test_chained_agent_runs_through_runner():
+    budgets = []
+
+    def open_request_budget(callback_context):
+        budgets.append(open_budget(callback_context.invocation_id))
+
+    agent = LlmAgent(
+        name="chained_agent",
+        model="gemini-2.0-flash",
+        instruction="Answer briefly.",
+        before_agent_callback=open_request_budget,
+    )
+    # The pipeline chains all three onto every model call.
+    install_cancel_callbacks(agent)
+    install_blob_callbacks(agent)
+    install_budget_callbacks(agent)
+
+    events, _ = run_agent(agent)
+
+    assert any(event.content and event.content.parts for event in events)
+    (budget,) = budgets
+    assert budget.model_calls == 1
+    assert budget.tokens > 0
+    assert get_budget(events[-1].invocation_id) is budget
+
+
+def test_blob_backed_prompts_are_charged_at_their_resolved_size():
+    article = f"{uuid.uuid4().hex} " + "The council approved the budget. " * 12_000
+    run_id = uuid.uuid4().hex
+    # Helper runs count against the budget of the run they work for.
+    budget = open_budget(run_id)
+    try:
+        run_agent(multimodal_reasoning_agent, state={"fetched_content": put_blob(article)})
+    finally:
+        close_budget(run_id)
+    assert budget.model_calls == 1
+    assert budget.tokens >= len(article) // CHARS_PER_TOKEN
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from shared.cancellation import CancelScope, check_cancelled, refuse_cancelled_model_call
+
+
+def test_cancelling_a_scope_cancels_the_tasks_it_spawned():
+    async def scenario():
+        scope = CancelScope()
+        reached = asyncio.Event()
+
+        async def search():
+            check_cancelled()
+            reached.set()
+            await asyncio.sleep(10)
+
+        async def run():
+            scope.enter()
+            await asyncio.gather(search(), search())
+
+        task = asyncio.create_task(run())
+        await reached.wait()
+        cancelled = scope.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return cancelled
+
+    # The run's own task and both searches.
+    assert asyncio.run(scenario()) == 3
+
+
+def test_cancelled_scope_refuses_model_calls():
+    async def scenario():
+        scope = CancelScope()
+        scope.enter()
+        refuse_cancelled_model_call(callback_context=None, llm_request=None)
+        scope.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            refuse_cancelled_model_call(callback_context=None, llm_request=None)
+        return scope
+
+    scope = asyncio.run(scenario())
+    assert scope.cancelled and scope.model_calls == 1
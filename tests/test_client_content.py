@@ -0,0 +1,51 @@
+import uuid
+
+import extractor_agent.router as router
+from extractor_agent.agent import fetcher_agent
+from extractor_agent.client_content import MAX_CLIENT_IMAGES, format_client_content
+
+from conftest import run_agent
+
+
+def fetch(url):
+    return f"Server copy of {url}.", {}
+
+
+def test_client_text_skips_the_fetch(monkeypatch):
+    def refuse(url):
+        raise AssertionError("fetched")
+
+    monkeypatch.setattr(router, "FETCHERS", {kind: refuse for kind in router.FETCHERS})
+    url = f"https://example.com/{uuid.uuid4().hex}"
+    _, state = run_agent(
+        fetcher_agent,
+        text=url,
+        state={"client_content": {"url": url, "text": "What the reader saw.", "image_urls": []}},
+    )
+    assert state["fetched_content"] == "What the reader saw."
+    assert state["source_kind"] == "client"
+    assert state["source_url"] == url
+    assert state["content_hash"]
+
+
+def test_client_text_for_another_page_is_not_used(monkeypatch):
+    monkeypatch.setattr(router, "FETCHERS", {kind: fetch for kind in router.FETCHERS})
+    url = f"https://example.com/{uuid.uuid4().hex}"
+    _, state = run_agent(
+        fetcher_agent,
+        text=url,
+        state={"client_content": {"url": "https://example.com/other", "text": "Other page."}},
+    )
+    assert state["fetched_content"] == f"Server copy of {url}."
+    assert state["source_kind"] != "client"
+    assert state["source_url"] == url
+
+
+def test_image_urls_are_filtered_and_capped():
+    image_urls = ["javascript:alert(1)", 7] + [
+        f"https://img.example.com/{i}.jpg" for i in range(MAX_CLIENT_IMAGES + 2)
+    ]
+    text = format_client_content({"text": "  Body.  ", "image_urls": image_urls})
+    lines = text.splitlines()
+    assert lines[:3] == ["Body.", "", "Images on the page:"]
+    assert lines[3:] == [f"https://img.example.com/{i}.jpg" for i in range(MAX_CLIENT_IMAGES)]
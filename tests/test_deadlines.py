@@ -0,0 +1,78 @@
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from shared.deadlines import Deadline, DeadlineAgent
+
+from conftest import run_agent
+
+
+async def events(*items, hang: bool = False):
+    for item in items:
+        yield item
+    if hang:
+        await asyncio.sleep(10)
+
+
+async def collect(deadline: Deadline, stream) -> list:
+    return [item async for item in deadline.run(stream)]
+
+
+def test_deadline_cuts_off_a_hung_stream_and_keeps_its_events():
+    deadline = Deadline(0.05)
+    assert asyncio.run(collect(deadline, events(1, 2, hang=True))) == [1, 2]
+    assert deadline.timed_out
+
+
+def test_stream_that_finishes_in_time_is_not_timed_out():
+    for seconds in (0, 5):
+        deadline = Deadline(seconds)
+        assert asyncio.run(collect(deadline, events(1, 2))) == [1, 2]
+        assert not deadline.timed_out
+
+
+def test_errors_in_the_stream_reach_the_consumer():
+    async def failing():
+        yield 1
+        raise ValueError("boom")
+
+    async def scenario():
+        seen = []
+        try:
+            async for item in Deadline(5).run(failing()):
+                seen.append(item)
+        except ValueError as e:
+            return seen, str(e)
+
+    assert asyncio.run(scenario()) == ([1], "boom")
+
+
+class HangingAgent(BaseAgent):
+    """Writes one state value, then never finishes."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            actions=EventActions(state_delta={"found": "early"}),
+        )
+        await asyncio.sleep(10)
+
+
+def test_deadline_agent_writes_its_fallback_on_timeout():
+    agent = DeadlineAgent(
+        name="deadline_agent",
+        agent=HangingAgent(name="hanging_agent"),
+        stage="positive_search",
+        seconds=0.1,
+        fallback_state={"positive_search_results": "None"},
+        on_timeout=lambda state: {"seen": state.get("found")},
+    )
+    events, state = run_agent(agent)
+    assert state["found"] == "early"
+    assert state["positive_search_results"] == "None"
+    assert state["seen"] == "early"
+    assert "timed out" in events[-1].content.parts[0].text
@@ -0,0 +1,67 @@
+import retrieval_agent.evidence as evidence
+from retrieval_agent.evidence import EvidencePool, needs_retrieval, terms
+from shared.schemas import SourceItem
+
+CLAIMS = [
+    "The Department of Health reported 1,200 measles cases in Texas.",
+    "Vaccination rates in Texas schools fell to 94 percent.",
+]
+
+
+def source(domain: str, quote: str) -> SourceItem:
+    return SourceItem(domain=domain, retrieved_quote=quote, published_date="", retrieving_agent="positive_search_agent")
+
+
+def filled_pool() -> EvidencePool:
+    pool = EvidencePool()
+    pool.add(source("cdc.gov", "The Department of Health confirmed 1,200 measles cases across Texas."))
+    pool.add(source("texastribune.org", "Kindergarten vaccination rates in Texas schools fell to 94 percent."))
+    pool.add(source("weather.com", "Rain is expected across the region on Friday."))
+    return pool
+
+
+def test_terms_include_stems_and_entities():
+    found = terms("The Department of Health reported outbreaks.")
+    assert {"depart", "health", "report", "outbre", "=department of health"} <= found
+    assert "the" not in found
+
+
+def test_sources_match_the_claims_whose_terms_they_quote():
+    pool = filled_pool()
+    assert pool.matches(CLAIMS[0]) == [0]
+    assert pool.matches(CLAIMS[1]) == [1]
+
+
+def test_sources_searched_for_a_claim_count_for_it_whatever_they_say():
+    pool = filled_pool()
+    pool.add(source("apnews.com", "An unrelated quote."), claim=CLAIMS[0].upper())
+    assert pool.matches(CLAIMS[0]) == [0, 3]
+
+
+def test_select_takes_claims_in_turn_and_tags_shared_sources():
+    pool = filled_pool()
+    shared = pool.add(source("reuters.com", "Texas measles cases rose as vaccination rates fell."))
+    pool.found_for.clear()
+    for claim in CLAIMS:
+        pool.add(pool.sources[shared], claim)
+    selected = pool.select(CLAIMS, limit=3, fresh={2})
+    assert [item.domain for item in selected] == ["reuters.com", "texastribune.org", "cdc.gov"]
+    assert selected[0].claims == CLAIMS
+    assert pool.select(CLAIMS, limit=10, fresh={2})[-1].domain == "weather.com"
+
+
+def test_pool_round_trips_through_its_dict():
+    pool = filled_pool()
+    pool.add(source("apnews.com", "An unrelated quote."), claim=CLAIMS[1])
+    restored = EvidencePool.from_dict(pool.to_dict())
+    assert [item.domain for item in restored.sources] == [item.domain for item in pool.sources]
+    assert restored.matches(CLAIMS[1]) == pool.matches(CLAIMS[1])
+
+
+def test_retrieval_runs_only_when_most_claims_are_thin(monkeypatch):
+    monkeypatch.setattr(evidence, "MIN_CLAIM_SOURCES", 1)
+    pool = filled_pool()
+    assert not needs_retrieval(pool, CLAIMS)
+    thin = ["Rents rose 8 percent in Austin.", "Austin added 40,000 jobs.", "The mayor resigned."]
+    assert needs_retrieval(pool, CLAIMS + thin)
+    assert needs_retrieval(EvidencePool(), CLAIMS)
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.extraction.run import CORPUS_PATH, PAGES_DIR, word_f1
+from extractor_agent.extraction import decode_html, extract_article
+
+with open(CORPUS_PATH, encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+
+def saved_page(name: str) -> str:
+    with open(os.path.join(PAGES_DIR, name), "rb") as f:
+        return decode_html(f.read())
+
+
+@pytest.mark.parametrize("item", CORPUS, ids=lambda item: item["file"])
+def test_saved_pages_are_extracted_with_their_metadata(item):
+    article = extract_article(saved_page(item["file"]), item["url"])
+    precision, recall, _ = word_f1(article["text"], item["text"])
+    assert recall >= 0.95 and precision >= 0.85
+    assert article["title"] == item["title"]
+    assert article["published_date"] == item["published_date"]
+    assert sorted(article["authors"]) == sorted(item["authors"])
+    assert article["summary"].strip()
+
+
+def test_boilerplate_is_left_out():
+    html = """
+    <html><head><title>Budget passes | Example News</title></head><body>
+    <nav><a href="/">Home</a> <a href="/world">World</a> <a href="/sport">Sport</a></nav>
+    <article>
+      <h1>Budget passes</h1>
+      <p>The state senate passed the budget on Friday, by a vote of 31 to 19, after a long debate.</p>
+      <p>The plan raises school funding by 4 percent, according to the governor's office, and cuts fees.</p>
+    </article>
+    <div class="share-bar">Share on Facebook, share on X, copy the link</div>
+    <div id="comments"><p>Great article, thanks for writing it, really enjoyed it.</p></div>
+    </body></html>
+    """
+    article = extract_article(html, "https://news.example/budget")
+    assert "senate passed the budget" in article["text"]
+    assert "school funding" in article["text"]
+    for boilerplate in ("World", "Facebook", "Great article"):
+        assert boilerplate not in article["text"]
@@ -0,0 +1,78 @@
+import asyncio
+
+from shared.jobs import CANCELLED, DONE, JobManager, QueueFullError
+
+
+def test_identical_submissions_share_one_run():
+    runs = []
+
+    async def run_job(job):
+        runs.append(job.url)
+        await asyncio.sleep(0.05)
+        return {"claims": []}
+
+    async def scenario():
+        jobs = JobManager(run_job, workers=2)
+        first = jobs.submit("https://www.example.com/story?utm_source=x", text="Body.")
+        second = jobs.submit("https://example.com/story/", text="Body.")
+        other = jobs.submit("https://example.com/story/", text="Other body.")
+        while not (first.finished and other.finished):
+            await asyncio.sleep(0.01)
+        return jobs, first, second, other
+
+    jobs, first, second, other = asyncio.run(scenario())
+    assert second is first and other is not first
+    assert first.coalesced_requests == 2
+    assert first.status == other.status == DONE
+    assert len(runs) == 2
+    assert jobs.stats()["coalesced_total"] == 1
+
+
+def test_job_is_cancelled_once_every_request_withdraws():
+    async def scenario():
+        running = asyncio.Event()
+
+        async def run_job(job):
+            running.set()
+            await asyncio.sleep(10)
+            return {}
+
+        jobs = JobManager(run_job, workers=1)
+        job = jobs.submit("https://example.com/a")
+        jobs.submit("https://example.com/a")
+        await running.wait()
+        jobs.cancel(job.job_id)
+        await asyncio.sleep(0.01)
+        still_running = job.status
+        jobs.cancel(job.job_id)
+        while not job.finished:
+            await asyncio.sleep(0.01)
+        return job, still_running
+
+    job, still_running = asyncio.run(scenario())
+    assert still_running == "running"
+    assert job.status == CANCELLED and job.cancel_reason == "cancelled"
+
+
+def test_queued_job_is_dropped_when_cancelled():
+    async def run_job(job):
+        await asyncio.sleep(10)
+        return {}
+
+    async def scenario():
+        jobs = JobManager(run_job, workers=1, max_queue=1)
+        job = jobs.submit("https://example.com/a")
+        jobs.cancel(job.job_id)
+        try:
+            jobs.submit("https://example.com/b")
+            jobs.submit("https://example.com/c")
+        except QueueFullError:
+            full = True
+        else:
+            full = False
+        return jobs, job, full
+
+    jobs, job, full = asyncio.run(scenario())
+    assert job.status == CANCELLED
+    assert jobs.stats()["cancelled_queued_total"] == 1
+    assert full
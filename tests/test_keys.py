@@ -0,0 +1,23 @@
+from fact_checker_agent.revision import merge_analyses
+from fact_checker_agent.synthesis import _pop_analysis
+from retrieval_agent.evidence import EvidencePool
+from shared.keys import claim_key
+from shared.schemas import SourceItem
+
+
+def test_claim_key_ignores_case_punctuation_and_spacing():
+    assert claim_key("The  Sky is BLUE.") == claim_key("the sky is blue") == "the sky is blue"
+    assert claim_key("Inflation hit 3.2% in 2023") == "inflation hit 3 2 in 2023"
+
+
+def test_claim_keys_agree_across_stages():
+    claim = "Unemployment fell to 3.9% in April, the lowest since 2001."
+    reworded = "unemployment fell to 3.9%  in April -- the lowest since 2001"
+    state = {"final_report": {"claims": [{"claim_text": reworded}]}}
+    analyses, _ = merge_analyses(state)
+    assert _pop_analysis(analyses, claim)["claim_text"] == claim
+
+    pool = EvidencePool()
+    source = SourceItem(domain="bls.gov", retrieved_quote="Payrolls rose.", published_date="", retrieving_agent="x")
+    pool.add(source, reworded)
+    assert pool.matches(claim) == [0]
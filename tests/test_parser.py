@@ -0,0 +1,121 @@
+import pytest
+
+from retrieval_agent.agent import source_parser_agent
+from retrieval_agent.parser import normalize_date, parse_source_blocks
+
+from conftest import run_agent
+
+DOMAIN_BLOCKS = """
+Domain: https://www.cdc.gov
+Published Date: 2023-09-15
+Verdict: The CDC report disproves the claim.
+Stance: refuting
+
+Domain: https://apnews.com/article/x
+Published Date: Sept. 3rd, 2023
+Verdict: AP found no record of the event.
+"""
+
+
+@pytest.mark.parametrize("label", ["Domain", "Source", "URL", "Website", "**Source**"])
+def test_every_block_is_parsed_whatever_the_domain_label(label):
+    text = DOMAIN_BLOCKS.replace("Domain:", f"{label}:")
+    sources = parse_source_blocks(text, "negative_search_agent")
+    assert [source.domain for source in sources] == ["cdc.gov", "apnews.com"]
+    assert [source.published_date for source in sources] == ["2023-09-15", "2023-09-03"]
+    assert {source.retrieving_agent for source in sources} == {"negative_search_agent"}
+
+
+def test_blocks_that_lead_with_another_field_are_split_on_its_repeat():
+    text = """
+    - **Original Claim:** The sky is green.
+    - **Summary:** NASA says the sky is blue.
+    - **Website:** nasa.gov
+    - **Publication Date:** March 2024
+
+    - **Original Claim:** Water is dry.
+    - **Summary:** USGS describes water as wet.
+    - **Website:** www.usgs.gov
+    """
+    sources = parse_source_blocks(text, "positive_search_agent")
+    assert [(source.domain, source.published_date) for source in sources] == [
+        ("nasa.gov", "2024-03"),
+        ("usgs.gov", "Unknown"),
+    ]
+
+
+def test_normalize_date_formats():
+    assert normalize_date("March 5th, 2024") == "2024-03-05"
+    assert normalize_date("2024/03/05") == "2024-03-05"
+    assert normalize_date("last week") == "Unknown"
+
+
+def test_only_the_unparseable_branch_goes_to_the_formatter():
+    state = {
+        "positive_search_results": DOMAIN_BLOCKS,
+        "negative_search_results": "I could not find anything useful, sorry.",
+        "neutral_search_results": "",
+    }
+    events, state = run_agent(source_parser_agent, state=state)
+
+    assert [event.author for event in events].count("formatter_agent") == 1
+    assert "Negative Query Results" in state["unparsed_search_results"]
+    assert "Positive Query Results" not in state["unparsed_search_results"]
+    sources = state["sources_output"]["sources"]
+    agents = {source["domain"]: source["retrieving_agent"] for source in sources}
+    assert agents["cdc.gov"] == "positive_search_agent"
+    # The formatter's sources are tagged with the one branch it formatted.
+    formatted = [source for source in sources if source["domain"] not in ("cdc.gov", "apnews.com")]
+    assert formatted
+    assert {source["retrieving_agent"] for source in formatted} == {"negative_search_agent"}
+
+
+def test_parsed_branches_skip_the_formatter():
+    events, state = run_agent(
+        source_parser_agent, state={"positive_search_results": DOMAIN_BLOCKS}
+    )
+    assert "formatter_agent" not in [event.author for event in events]
+    assert len(state["sources_output"]["sources"]) == 2
+
+
+def test_verdict_and_summary_of_one_source_stay_together():
+    text = """
+    Domain: https://www.cdc.gov
+    Published Date: 2023-09-15
+    Verdict: Refutes the claim.
+    Summary: The CDC report shows the rate fell.
+
+    Domain: https://apnews.com
+    Summary: AP found no record of the event.
+    Verdict: Refutes the claim.
+    """
+    sources = parse_source_blocks(text, "negative_search_agent")
+    assert [(source.domain, source.retrieved_quote) for source in sources] == [
+        ("cdc.gov", "Refutes the claim. The CDC report shows the rate fell."),
+        ("apnews.com", "AP found no record of the event. Refutes the claim."),
+    ]
+
+
+def test_wrapped_lines_continue_their_field():
+    text = """
+- **Domain:** reuters.com
+- **Published Date:** 2024-03-12
+- **Verdict:** Reuters reports the figures match
+  the official release, citing the agency's
+  March bulletin.
+- **Author:** Jane Doe
+  (staff reporter)
+- **Stance:** supporting
+
+Domain: bbc.com
+Verdict: The BBC gives background
+on the policy in question.
+"""
+    sources = parse_source_blocks(text, "positive_search_agent")
+    assert [(source.domain, source.retrieved_quote) for source in sources] == [
+        (
+            "reuters.com",
+            "Reuters reports the figures match the official release, citing the agency's March bulletin.",
+        ),
+        ("bbc.com", "The BBC gives background on the policy in question."),
+    ]
@@ -0,0 +1,25 @@
+import json
+import uuid
+
+from master_agent.agent import root_agent
+from shared.schemas import ClaimsOutput, validate
+
+from conftest import run_agent
+
+
+def test_whole_pipeline_runs_on_the_standins():
+    url = f"https://example.com/{uuid.uuid4().hex}"
+    events, state = run_agent(
+        root_agent,
+        text=url,
+        state={"client_content": {"url": url, "text": f"Page {url}. " * 20, "image_urls": []}},
+    )
+
+    result = json.loads(events[-1].content.parts[0].text)
+    report = validate(ClaimsOutput, result)
+    claims = state["claims"]["claims"]
+    assert claims
+    assert [claim.claim_text for claim in report.claims] == claims
+    assert state["sources_output"]["sources"]
+    assert result["result_cache"] == "miss"
+    assert result["usage"]["model_calls"] > 0
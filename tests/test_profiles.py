@@ -0,0 +1,79 @@
+import asyncio
+import uuid
+
+import pytest
+
+from evaluator_agent.profiles import ReputationBatcher, research_batch
+from shared.budget import close_budget, open_budget
+from shared.cancellation import CancelScope
+
+
+def test_research_counts_against_the_run_budget():
+    run_id = uuid.uuid4().hex
+    budget = open_budget(run_id)
+    try:
+        asyncio.run(research_batch([f"{uuid.uuid4().hex}.com"]))
+    finally:
+        close_budget(run_id)
+    assert budget.model_calls == 1
+    assert budget.tokens > 0
+
+
+def test_research_stops_with_a_cancelled_run():
+    async def scenario():
+        scope = CancelScope()
+        scope.enter()
+        scope.cancel()
+        await research_batch([f"{uuid.uuid4().hex}.com"])
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(scenario())
+
+
+class SlowResearch:
+    """Researches after a delay, recording whether it was cancelled."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.cancelled = False
+
+    async def __call__(self, domains: list[str]) -> dict:
+        self.started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {}
+
+
+def test_shared_batch_outlives_one_cancelled_session_but_not_all():
+    async def scenario():
+        research = SlowResearch()
+        batcher = ReputationBatcher(research=research, window=0.01)
+        domain = f"{uuid.uuid4().hex}.com"
+        first = asyncio.create_task(batcher.research_domains([domain]))
+        second = asyncio.create_task(batcher.research_domains([domain]))
+        await research.started.wait()
+        first.cancel()
+        await asyncio.sleep(0.01)
+        after_one = research.cancelled
+        second.cancel()
+        await asyncio.sleep(0.01)
+        return after_one, research.cancelled, batcher.stats()
+
+    after_one, after_both, stats = asyncio.run(scenario())
+    assert not after_one
+    assert after_both
+    assert stats["batches"] == 1 and stats["cancelled"] == 1
+
+
+def test_batched_research_counts_against_the_run_that_started_it():
+    run_id = uuid.uuid4().hex
+    budget = open_budget(run_id)
+    try:
+        batcher = ReputationBatcher(window=0.01)
+        asyncio.run(batcher.research_domains([f"{uuid.uuid4().hex}.com"]))
+    finally:
+        close_budget(run_id)
+    assert budget.model_calls == 1
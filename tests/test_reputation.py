@@ -0,0 +1,56 @@
+import os
+
+import evaluator_agent.reputation as reputation
+from evaluator_agent.reputation import ReloadingDataset, read_csv, write_dataset
+
+
+def test_a_built_csv_reads_back_by_domain(tmp_path):
+    csv_path = tmp_path / "sources.csv"
+    csv_path.write_text(
+        "domain,bias_label,credibility_score\n"
+        "reuters.com,0,0.9\n"
+        " APNews.com ,-0.5,0.85\n"
+        ",1,0.1\n"
+    )
+    dataset_path = str(tmp_path / "sources.rep")
+    write_dataset(dataset_path, read_csv(csv_path), "v1", source="test")
+
+    dataset = reputation.ReputationDataset(dataset_path)
+    assert len(dataset) == 2
+    assert dataset.get("apnews.com") == {"bias_label": -0.5, "credibility_score": 0.85}
+    assert dataset.get("reuters.com") == {"bias_label": 0.0, "credibility_score": 0.9}
+    assert dataset.get("example.org") is None
+    assert dataset.metadata["source"] == "test"
+
+
+def test_a_replaced_dataset_is_picked_up_without_a_restart(tmp_path, monkeypatch):
+    path = str(tmp_path / "sources.rep")
+    write_dataset(path, {"reuters.com": {"bias_label": 0, "credibility_score": 0.9}}, "v1")
+    source_db = ReloadingDataset(path)
+    assert source_db.provenance()["version"] == "v1"
+    assert "reuters.com" in source_db
+
+    write_dataset(path, {"apnews.com": {"bias_label": 0, "credibility_score": 0.8}}, "v2")
+    # Still within the check interval: the open dataset keeps serving.
+    monkeypatch.setattr(reputation, "RELOAD_CHECK_SECONDS", 3600)
+    assert source_db.current().version == "v1"
+
+    monkeypatch.setattr(reputation, "RELOAD_CHECK_SECONDS", 0)
+    assert source_db.current().version == "v2"
+    assert "reuters.com" not in source_db
+    assert source_db.get("apnews.com") == {"bias_label": 0.0, "credibility_score": 0.8}
+
+
+def test_a_broken_replacement_keeps_the_last_good_dataset(tmp_path, monkeypatch):
+    path = tmp_path / "sources.rep"
+    write_dataset(str(path), {"reuters.com": {"bias_label": 0, "credibility_score": 0.9}}, "v1")
+    source_db = ReloadingDataset(str(path))
+    assert source_db.current().version == "v1"
+
+    # Replaced, not overwritten: the old file stays mapped.
+    broken = tmp_path / "broken.rep"
+    broken.write_bytes(b"not a dataset")
+    os.replace(broken, path)
+    monkeypatch.setattr(reputation, "RELOAD_CHECK_SECONDS", 0)
+    assert source_db.current().version == "v1"
+    assert "reuters.com" in source_db
@@ -0,0 +1,53 @@
+import gzip
+
+from starlette.requests import Request
+
+from shared.responses import compact_result, json_response, result_etag
+
+RESULT = {
+    "claims": [{"claim_text": "The sky is blue.", "confidence": 0.9}],
+    "usage": {"model_calls": 7},
+    "result_cache": "hit",
+    "reputation_dataset": {"version": "2024-05"},
+}
+
+
+def request(**headers) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+        }
+    )
+
+
+def test_compact_result_keeps_only_what_clients_render():
+    payload = compact_result(RESULT, {"elapsed_ms": 12})
+    assert set(payload) == {"claims", "unchecked_claims", "degradations", "meta"}
+    assert payload["meta"] == {"elapsed_ms": 12, "result_cache": "hit", "reputation_dataset": "2024-05"}
+
+
+def test_etag_ignores_metadata_but_not_results():
+    etag = result_etag(compact_result(RESULT, {"elapsed_ms": 12}))
+    assert etag == result_etag(compact_result(RESULT, {"elapsed_ms": 99}))
+    changed = {**RESULT, "claims": [{"claim_text": "The sky is green.", "confidence": 0.1}]}
+    assert etag != result_etag(compact_result(changed, {"elapsed_ms": 12}))
+
+
+def test_matching_if_none_match_gets_an_empty_304():
+    payload = compact_result(RESULT, {})
+    etag = result_etag(payload)
+    for header in (etag, etag.removeprefix("W/"), f'"other", {etag}', "*"):
+        response = json_response(request(if_none_match=header), payload, etag=etag)
+        assert response.status_code == 304 and not response.body
+        assert response.headers["etag"] == etag
+    assert json_response(request(if_none_match='"other"'), payload, etag=etag).status_code == 200
+
+
+def test_large_bodies_are_gzipped_for_clients_that_accept_it():
+    payload = compact_result({"claims": [{"claim_text": "x" * 4000}]}, {})
+    plain = json_response(request(), payload)
+    zipped = json_response(request(accept_encoding="gzip, br"), payload)
+    assert "content-encoding" not in plain.headers
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(zipped.body) == plain.body
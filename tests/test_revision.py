@@ -0,0 +1,35 @@
+import shared.budget
+from fact_checker_agent.agent import fact_checker_loop
+from fact_checker_agent.revision import merge_analyses
+from shared.keys import claim_key
+
+from conftest import run_agent
+
+
+def test_merge_analyses_keys_claims_by_text():
+    state = {
+        "claim_analyses": {"old claim": {"claim_text": "Old claim."}},
+        "final_report": '{"claims": [{"claim_text": "The  Sky is blue."}]}',
+    }
+    analyses, analyzed = merge_analyses(state)
+    assert analyzed == [claim_key("the sky is blue")]
+    assert set(analyses) == {"old claim", claim_key("The sky is blue.")}
+
+
+def test_low_budget_skips_revision_and_review(monkeypatch):
+    budget = shared.budget.RequestBudget(max_model_calls=10, model_calls=9)
+    # The first pass already ran; this one would be a revision.
+    budget.analyst_passes = 1
+    monkeypatch.setattr(shared.budget, "get_budget", lambda invocation_id: budget)
+
+    events, state = run_agent(
+        fact_checker_loop,
+        state={"claims": '{"claims": ["The sky is blue."]}', "pending_revisions": []},
+    )
+
+    authors = [event.author for event in events]
+    assert "skipped_revision_pass" in budget.degradations
+    assert state["revision_skipped"] is True
+    assert "adjudicator_review" not in state
+    assert authors.count("revision_tracker") == 1
+    assert events[-1].actions.escalate
@@ -0,0 +1,31 @@
+import pytest
+
+import extractor_agent.router as router
+from extractor_agent.router import FetchRouterAgent, classify_url
+
+from conftest import run_agent
+
+
+@pytest.mark.parametrize(
+    "url, kind",
+    [
+        ("https://x.com/someone/status/123", "x_post"),
+        ("https://www.twitter.com/someone/status/123?s=20", "x_post"),
+        ("https://example.org/report.PDF", "pdf"),
+        ("https://www.reuters.com/world/story", "news"),
+        ("https://example.org/blog/post", "web"),
+    ],
+)
+def test_urls_are_classified_by_host_and_path(url, kind):
+    assert classify_url(url) == kind
+
+
+def test_pdf_urls_are_reported_as_unsupported_without_fetching(monkeypatch):
+    def fetch(url):
+        raise AssertionError("fetched")
+
+    monkeypatch.setattr(router, "FETCHERS", {kind: fetch for kind in router.FETCHERS})
+    _, state = run_agent(FetchRouterAgent(name="router"), text="https://example.org/report.pdf")
+    assert state["source_kind"] == "pdf"
+    assert state["fetch_error"].startswith("UnsupportedContentError: PDF documents")
+    assert state["fetched_content"] == ""
@@ -0,0 +1,123 @@
+import dataclasses
+import typing
+
+import pytest
+from pydantic import BaseModel
+
+import shared.schemas as records
+from evaluator_agent.agent import SourceProfile, SourceProfilerOutput
+from extractor_agent.agent import ExtractedClaims
+from fact_checker_agent.agent import Claim, ClaimsOutput, ClaimSpan
+from retrieval_agent.agent import SourceItem, SourcesOutput
+
+# Each agent's `output_schema` model and the record the pipeline validates against.
+MODELS = [
+    ExtractedClaims,
+    SourceItem,
+    SourcesOutput,
+    SourceProfile,
+    SourceProfilerOutput,
+    ClaimSpan,
+    Claim,
+    ClaimsOutput,
+]
+
+
+def shape(annotation):
+    """An annotation reduced to what both sides must agree on."""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Literal:
+        return ("literal", frozenset(typing.get_args(annotation)))
+    if origin is list:
+        return ("list", shape(typing.get_args(annotation)[0]))
+    if isinstance(annotation, type) and (
+        issubclass(annotation, BaseModel) or dataclasses.is_dataclass(annotation)
+    ):
+        return ("record", annotation.__name__)
+    return annotation
+
+
+def model_fields(model) -> dict:
+    return {
+        name: (shape(info.annotation), info.is_required())
+        for name, info in model.model_fields.items()
+    }
+
+
+def record_fields(record) -> dict:
+    hints = typing.get_type_hints(record)
+    return {
+        field.name: (
+            shape(hints[field.name]),
+            field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING,
+        )
+        for field in dataclasses.fields(record)
+    }
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: model.__name__)
+def test_output_schemas_match_their_records(model):
+    assert model_fields(model) == record_fields(getattr(records, model.__name__))
+
+
+CLAIM = {
+    "claim_text": "The sky is blue.",
+    "confidence": "0.8",
+    "bias_score": "neutral",
+    "justification": "Accurate.",
+    "sources": ["nasa.gov"],
+    "partial_evidence": "no",
+    "spans": [{"start": 4.0, "end": "12", "text": "sky is b", "score": 1}],
+}
+
+
+def test_validate_coerces_like_pydantic_lax_mode():
+    claim = records.validate(records.Claim, CLAIM)
+    assert claim.confidence == 0.8 and claim.partial_evidence is False
+    assert claim.spans == [records.ClaimSpan(start=4, end=12, text="sky is b", score=1.0)]
+    assert records.to_builtins(claim) == Claim.model_validate(CLAIM).model_dump()
+
+
+def test_validate_fills_defaults():
+    source = records.validate(
+        records.SourceItem,
+        {"domain": "cdc.gov", "retrieved_quote": "Quote.", "published_date": "", "retrieving_agent": "x"},
+    )
+    assert source.claims == []
+
+
+@pytest.mark.parametrize(
+    "data, path",
+    [
+        ({**CLAIM, "confidence": "high"}, "Claim.confidence"),
+        ({key: value for key, value in CLAIM.items() if key != "sources"}, "Claim.sources"),
+        ({**CLAIM, "sources": "nasa.gov"}, "Claim.sources"),
+        ({**CLAIM, "sources": ["nasa.gov", 3]}, "Claim.sources[1]"),
+        ({**CLAIM, "partial_evidence": 2}, "Claim.partial_evidence"),
+        ({**CLAIM, "spans": [CLAIM["spans"][0], {"start": 0}]}, "Claim.spans[1].end"),
+    ],
+)
+def test_validate_errors_name_the_field(data, path):
+    with pytest.raises(records.SchemaError) as raised:
+        records.validate(records.Claim, data)
+    assert raised.value.path == path
+    with pytest.raises(ValueError):
+        Claim.model_validate(data)
+
+
+def test_literal_choices_are_enforced():
+    profile = {
+        "source_url": "cdc.gov",
+        "retrieved_quote": "Quote.",
+        "retrieving_agent": "Supporting Researcher",
+        "credibility_rating": "Very High",
+        "bias_rating": "Center",
+    }
+    assert records.validate(records.SourceProfile, profile).bias_rating == "Center"
+    with pytest.raises(records.SchemaError, match="expected one of"):
+        records.validate(records.SourceProfile, {**profile, "bias_rating": "Centre"})
+
+
+def test_records_round_trip_through_json():
+    output = records.validate(records.ClaimsOutput, {"claims": [CLAIM]})
+    assert records.validate(records.ClaimsOutput, records.loads(records.dumps(output))) == output
@@ -0,0 +1,109 @@
+import asyncio
+
+from retrieval_agent.search import (
+    GroundedSearchBackend,
+    SearchLayer,
+    normalize_query,
+    search_backend_name,
+    split_by_query,
+)
+from shared.budget import close_budget, open_budget
+from shared.store import MemoryStore
+
+
+class BatchBackend:
+    """Answers a batch of queries at once, recording each batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def search(self, query: str) -> list[dict]:
+        return (await self.search_batch([query]))[query]
+
+    async def search_batch(self, queries: list[str]) -> dict:
+        self.batches.append(list(queries))
+        await asyncio.sleep(0.01)
+        return {query: [{"text": f"Results for {query}"}] for query in queries}
+
+
+def test_batching_backend_gets_one_call_per_batch():
+    backend = BatchBackend()
+    layer = SearchLayer(backend, cache=MemoryStore())
+    queries = ["vaccine trial results", "Vaccine  trial results", "trial outcome"]
+
+    async def run():
+        # Two branches at once, sharing one query.
+        return await asyncio.gather(
+            layer.search_many(queries, "run"),
+            layer.search_many(["vaccine trial results", "side effects"], "run"),
+        )
+
+    first, second = asyncio.run(run())
+    assert sorted(map(sorted, backend.batches)) == [
+        ["side effects"],
+        ["trial outcome", "vaccine trial results"],
+    ]
+    assert first["trial outcome"] == [{"text": "Results for trial outcome"}]
+    assert second["vaccine trial results"] == first["vaccine trial results"]
+    assert layer.stats()["backend_calls"] == 2
+
+    asyncio.run(layer.search_many(queries, "next run"))
+    assert len(backend.batches) == 2
+    assert layer.stats()["cache_hits"] == 3
+
+
+def test_normalized_queries_keep_word_order():
+    assert normalize_query("  Dog   bites MAN ") == "dog bites man"
+    assert normalize_query("dog bites man") != normalize_query("man bites dog")
+    assert normalize_query("not guilty") != normalize_query("guilty not")
+
+
+def test_split_by_query_keeps_word_order_apart():
+    text = (
+        "Query: dog bites man\nDomain: a.com\nSummary: A dog bit a man.\n\n"
+        "Query: Man bites dog\nDomain: b.com\nSummary: A man bit a dog.\n"
+    )
+    found = split_by_query(text, ["dog bites man", "man bites dog"])
+    assert found == {
+        "dog bites man": [{"text": "Domain: a.com\nSummary: A dog bit a man."}],
+        "man bites dog": [{"text": "Domain: b.com\nSummary: A man bit a dog."}],
+    }
+
+
+def test_split_by_query_assigns_each_section_to_its_query():
+    text = (
+        "**Query:** dog bites man\nDomain: a.com\nSummary: A dog bit a man.\n\n"
+        "Query: Cat  chases mouse\nDomain: b.com\nSummary: A cat chased a mouse.\n"
+    )
+    found = split_by_query(text, ["dog bites man", "cat chases mouse", "skipped"])
+    assert found == {
+        "dog bites man": [{"text": "Domain: a.com\nSummary: A dog bit a man."}],
+        "cat chases mouse": [{"text": "Domain: b.com\nSummary: A cat chased a mouse."}],
+    }
+
+
+def test_grounded_batch_is_one_model_call_on_the_run_budget():
+    layer = SearchLayer(GroundedSearchBackend(), cache=MemoryStore())
+
+    async def run():
+        budget = open_budget("grounded-run")
+        try:
+            await layer.search_many([f"query {i}" for i in range(5)], "grounded-run")
+        finally:
+            close_budget("grounded-run")
+        return budget
+
+    budget = asyncio.run(run())
+    assert budget.model_calls == 1
+    assert layer.stats()["backend_calls"] == 1
+
+
+def test_search_agents_keep_google_search_without_custom_search_keys(monkeypatch):
+    for name in ("SEARCH_BACKEND", "GOOGLE_SEARCH_API_KEY", "GOOGLE_SEARCH_ENGINE_ID"):
+        monkeypatch.delenv(name, raising=False)
+    assert search_backend_name() == "builtin"
+    monkeypatch.setenv("GOOGLE_SEARCH_API_KEY", "key")
+    monkeypatch.setenv("GOOGLE_SEARCH_ENGINE_ID", "engine")
+    assert search_backend_name() == "custom_search"
+    monkeypatch.setenv("SEARCH_BACKEND", "grounded")
+    assert search_backend_name() == "grounded"
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEBUG_PROBE = """
+from fastapi.testclient import TestClient
+import server
+client = TestClient(server.app)
+print(client.get("/debug/runtime").status_code)
+"""
+
+
+@pytest.mark.parametrize(
+    "env, status",
+    [({}, 404), ({"DEBUG_ENDPOINTS": "1"}, 200), ({"LOADTEST_STANDINS": "1"}, 200)],
+)
+def test_debug_runtime_is_only_served_when_enabled(env, status):
+    clean = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in ("DEBUG_ENDPOINTS", "LOADTEST_STANDINS")
+    }
+    probe = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", DEBUG_PROBE],
+        cwd=REPO_DIR,
+        env={**clean, **env},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert probe.stdout.strip().splitlines()[-1] == str(status), probe.stderr[-2000:]
@@ -0,0 +1,23 @@
+from shared.store import MemoryStore, SqliteStore
+
+
+def test_sqlite_namespaces_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    # Two instances on one file stand in for two worker processes.
+    first, second = SqliteStore(path, "results"), SqliteStore(path, "results")
+    first.set("key", {"claims": ["one"], "score": 0.5})
+    assert second.get("key") == {"claims": ["one"], "score": 0.5}
+    assert SqliteStore(path, "jobs").get("key", "missing") == "missing"
+
+    second.delete("key")
+    assert first.get("key") is None
+    assert len(first) == 0
+
+
+def test_expired_entries_are_not_returned(tmp_path):
+    for store in (MemoryStore(), SqliteStore(str(tmp_path / "store.sqlite3"), "cache")):
+        store.set("fresh", 1, ttl=60)
+        store.set("stale", 2, ttl=-1)
+        assert store.get("fresh") == 1
+        assert store.get("stale", "gone") == "gone"
+        assert len(store) == 1
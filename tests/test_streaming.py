@@ -0,0 +1,113 @@
+import asyncio
+import functools
+import time
+import uuid
+
+import master_agent.pipeline
+from extractor_agent.ranking import select_claims
+from master_agent.agent import root_agent
+from master_agent.streaming import CLAIM_SEARCH_AGENT, ClaimStreamParser, SpeculativeRetriever
+from retrieval_agent.search import search_layer
+from shared.store import MemoryStore
+
+from conftest import run_agent
+
+
+def test_parser_yields_claims_as_their_strings_complete():
+    parser = ClaimStreamParser()
+    assert parser.feed('{"claims": ["The sky') == []
+    assert parser.feed(' is blue.", "Water is') == ["The sky is blue."]
+    assert parser.feed(' wet, \\"mostly\\"."]}') == ['Water is wet, "mostly".']
+    assert parser.done
+
+
+def test_sources_are_tagged_with_every_claim_they_were_found_for(monkeypatch):
+    results = [{"domain": "www.reuters.com", "snippet": "Figures match.", "published_date": "2024-03-12"}]
+
+    async def search_many(queries, run_id=""):
+        return {query: results for query in queries}
+
+    monkeypatch.setattr(search_layer, "search_many", search_many)
+
+    async def run():
+        speculative = SpeculativeRetriever(run_id="run")
+        for claim in ("Claim one.", "Claim two."):
+            await speculative.put(claim)
+        await speculative.finish()
+        return speculative.sources(["Claim one.", "Claim two."])
+
+    (source,) = asyncio.run(run())
+    assert source.domain == "reuters.com"
+    assert source.retrieving_agent == CLAIM_SEARCH_AGENT
+    assert source.claims == ["Claim one.", "Claim two."]
+
+
+class SlowBackend:
+    """Answers every query after a delay, recording when each search ran."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = []
+
+    async def search(self, query: str) -> list[dict]:
+        started = time.monotonic()
+        await asyncio.sleep(self.delay)
+        self.calls.append((query, started, time.monotonic()))
+        return [{"domain": "apnews.com", "snippet": f"Results for {query}.", "published_date": ""}]
+
+
+def test_claim_searches_overlap_the_search_branches(monkeypatch):
+    backend = SlowBackend(delay=0.3)
+    monkeypatch.setattr(master_agent.pipeline, "PIPELINED_EXTRACTION", True)
+    monkeypatch.setattr(search_layer, "backend", backend)
+    monkeypatch.setattr(search_layer, "cache", MemoryStore())
+    url = f"https://example.com/{uuid.uuid4().hex}"
+
+    events, state = run_agent(
+        root_agent,
+        text=url,
+        state={"client_content": {"url": url, "text": f"Page {url}. " * 20, "image_urls": []}},
+    )
+
+    claims = state["claims"]["claims"]
+    claim_searches = [call for call in backend.calls if call[0] in claims]
+    branch_searches = [call for call in backend.calls if call[0] not in claims]
+    assert claim_searches and branch_searches
+    # The branches started searching before the claim searches were done.
+    assert min(started for _, started, _ in branch_searches) < max(
+        ended for _, _, ended in claim_searches
+    )
+    # The branches only see the results of their own queries.
+    for event in events:
+        for response in event.get_function_responses():
+            assert not set(response.response) & set(claims)
+    # Each claim's results reach the sources as evidence for that claim only.
+    tagged = [
+        source for source in state["sources_output"]["sources"]
+        if source["retrieving_agent"] == CLAIM_SEARCH_AGENT
+    ]
+    assert {tuple(source["claims"]) for source in tagged} == {(claim,) for claim in claims}
+
+
+def test_claim_searches_stop_at_the_claim_cap(monkeypatch):
+    backend = SlowBackend(delay=0)
+    monkeypatch.setattr(master_agent.pipeline, "PIPELINED_EXTRACTION", True)
+    # The stand-in extractor writes three claims; only two are checked.
+    monkeypatch.setattr(
+        master_agent.pipeline, "SpeculativeRetriever", functools.partial(SpeculativeRetriever, limit=2)
+    )
+    monkeypatch.setattr(master_agent.pipeline, "select_claims", functools.partial(select_claims, limit=2))
+    monkeypatch.setattr(search_layer, "backend", backend)
+    monkeypatch.setattr(search_layer, "cache", MemoryStore())
+    url = f"https://example.com/{uuid.uuid4().hex}"
+
+    _, state = run_agent(
+        root_agent,
+        text=url,
+        state={"client_content": {"url": url, "text": f"Page {url}. " * 20, "image_urls": []}},
+    )
+
+    extracted = ["Stand-in claims 1", "Stand-in claims 2", "Stand-in claims 3"]
+    searched = {query for query, _, _ in backend.calls if query in extracted}
+    assert len(searched) == 2
+    assert len(state["claims"]["claims"]) == 2
@@ -0,0 +1,71 @@
+import pytest
+
+from evaluator_agent.profiles import bias_rating
+from evaluator_agent.reputation import source_db
+from fact_checker_agent.synthesis import (
+    BIAS_SCORES,
+    NOT_ANALYZED,
+    assemble_claims,
+    claim_confidence,
+)
+
+
+@pytest.mark.parametrize(
+    "verdict, verdict_confidence, expected",
+    [
+        ("Accurate", 1.0, 1.0),
+        ("Accurate", 0.5, 0.75),
+        ("Inaccurate", 0.8, 0.1),
+        ("Inaccurate", 0.0, 0.5),
+        ("Unverifiable", 0.9, 0.5),
+        ("Something else", 1.0, 0.5),
+        ("Accurate", 3, 1.0),
+    ],
+)
+def test_confidence_is_the_verdict_pulled_towards_even_odds(
+    verdict, verdict_confidence, expected
+):
+    assert claim_confidence(verdict, verdict_confidence) == expected
+
+
+def test_every_extracted_claim_is_reported_in_order():
+    report = {
+        "claims": [
+            {"claim_text": "an extra claim", "verdict": "Mixed", "justification": "Unclear."},
+            {
+                "claim_text": "wages ROSE in 2023.",
+                "verdict": "Inaccurate",
+                "confidence_score": 1.0,
+                "justification": "Refuted.",
+                "sources": ["https://unlisted.example"],
+            },
+        ]
+    }
+    claims = ["Prices fell last year.", "Wages rose in 2023."]
+    output = assemble_claims(claims, report, partial_claims=claims[:1])
+    first, second, extra = output.claims
+    assert first.claim_text == "Prices fell last year."
+    assert first.justification == NOT_ANALYZED
+    assert (first.confidence, first.partial_evidence) == (0.5, True)
+    assert second.claim_text == "Wages rose in 2023."
+    assert second.justification == "Inaccurate: Refuted."
+    assert (second.confidence, second.bias_score, second.partial_evidence) == (0.0, "neutral", False)
+    assert extra.claim_text == "an extra claim"
+
+
+def test_bias_is_averaged_over_the_listed_sources():
+    domains = [domain for domain, _ in source_db.current().items()][:2]
+    labels = [source_db.get(domain)["bias_label"] for domain in domains]
+    report = {
+        "claims": [
+            {
+                "claim_text": "A claim.",
+                "verdict": "Accurate",
+                "sources": [f"https://www.{domain}/story" for domain in domains]
+                + ["https://unlisted.example"],
+            }
+        ]
+    }
+    (claim,) = assemble_claims(["A claim."], report, partial_evidence=True).claims
+    assert claim.bias_score == BIAS_SCORES[bias_rating(sum(labels) / len(labels))]
+    assert claim.partial_evidence